@@ -0,0 +1,165 @@
+"""
+Admission control for expensive endpoints.
+
+Each pool admits at most max_concurrent requests at a time and parks up to
+max_queue more in FIFO order; anything beyond that (or a request that waits
+longer than queue_timeout) gets an immediate 503 with Retry-After. Admission
+happens on the event loop before the handler takes a threadpool worker or a
+DB connection, so a spike on one endpoint cannot starve the rest of the API.
+
+Limits are per worker process (multiply by the worker count for the node).
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque
+
+from fastapi import HTTPException, status
+
+from app.core.metrics import (
+    ADMISSION_ACTIVE,
+    ADMISSION_LIMIT,
+    ADMISSION_QUEUED,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT_SECONDS,
+)
+
+
+class AdmissionLimiter:
+    def __init__(self, pool: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.pool = pool
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # waiters may live on different event loops (threads), so state changes
+        # take a lock and wake-ups go through the waiter's own loop
+        self._lock = threading.Lock()
+        self._service_seconds = 0.0  # moving average of slot hold time, for Retry-After
+
+        ADMISSION_LIMIT.set(self.max_concurrent, pool=pool, kind="concurrency")
+        ADMISSION_LIMIT.set(self.max_queue, pool=pool, kind="queue")
+        self._publish()
+
+    def _publish(self) -> None:
+        ADMISSION_ACTIVE.set(self.active, pool=self.pool)
+        ADMISSION_QUEUED.set(len(self._waiters), pool=self.pool)
+
+    def retry_after(self) -> int:
+        # time for the queue ahead of a new request to drain
+        backlog = (len(self._waiters) + 1) / self.max_concurrent
+        return max(1, math.ceil(self._service_seconds * backlog))
+
+    def _reject(self, reason: str) -> HTTPException:
+        ADMISSION_REJECTED.inc(pool=self.pool, reason=reason)
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server busy ({self.pool}), retry later",
+            headers={"Retry-After": str(self.retry_after())},
+        )
+
+    def _forget(self, fut: asyncio.Future) -> None:
+        with self._lock:
+            try:
+                self._waiters.remove(fut)
+            except ValueError:
+                pass  # already popped by release(); _hand_over gives the slot back
+        self._publish()
+
+    async def acquire(self) -> None:
+        with self._lock:
+            if self.active < self.max_concurrent and not self._waiters:
+                self.active += 1
+                fut = None
+            elif len(self._waiters) >= self.max_queue:
+                fut = False
+            else:
+                fut = asyncio.get_running_loop().create_future()
+                self._waiters.append(fut)
+        self._publish()
+        if fut is None:
+            return
+        if fut is False:
+            raise self._reject("queue_full")
+
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._forget(fut)
+            raise self._reject("timeout")
+        except asyncio.CancelledError:  # client went away while queued
+            if fut.done() and not fut.cancelled():
+                self.release()  # the slot was already handed to us
+            else:
+                self._forget(fut)
+            raise
+        finally:
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - t0, pool=self.pool)
+
+    def release(self) -> None:
+        # hand the slot straight to the next live waiter (FIFO), else free it
+        with self._lock:
+            while self._waiters:
+                fut = self._waiters.popleft()
+                if not fut.done():
+                    fut.get_loop().call_soon_threadsafe(self._hand_over, fut)
+                    break
+            else:
+                self.active -= 1
+        self._publish()
+
+    def _hand_over(self, fut: asyncio.Future) -> None:
+        if fut.done():  # timed out or cancelled in the meantime
+            self.release()
+        else:
+            fut.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._service_seconds += 0.2 * ((time.perf_counter() - t0) - self._service_seconds)
+            self.release()
+
+
+def admit(limiter: AdmissionLimiter):
+    """Route dependency holding a slot of `limiter` for the whole request."""
+
+    async def dependency() -> AsyncIterator[None]:
+        async with limiter.slot():
+            yield
+
+    return dependency
+
+
+# ---------------------------
+# Pools
+# ---------------------------
+
+# Assessments run TF-IDF scoring on a threadpool worker; keep well below the
+# threadpool size (40) so cheap sync endpoints always find a free thread.
+assessment_limiter = AdmissionLimiter(
+    "assessment",
+    max_concurrent=int(os.getenv("ASSESSMENT_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("ASSESSMENT_MAX_QUEUE", "32")),
+    queue_timeout=float(os.getenv("ASSESSMENT_QUEUE_TIMEOUT", "5")),
+)
+
+# Live Pasteur.fr scrapes (cold recommendations) hold a worker for a network round trip.
+scrape_limiter = AdmissionLimiter(
+    "scrape",
+    max_concurrent=int(os.getenv("SCRAPE_MAX_CONCURRENCY", "4")),
+    max_queue=int(os.getenv("SCRAPE_MAX_QUEUE", "16")),
+    queue_timeout=float(os.getenv("SCRAPE_QUEUE_TIMEOUT", "10")),
+)
@@ -0,0 +1,280 @@
+"""
+Shared cache abstraction.
+
+Backends:
+  - MemoryCache: per-process LRU with TTLs (default, single node / dev)
+  - RedisCache:  any Redis-protocol server, shared by every node
+
+Select with CACHE_URL ("memory://" or "redis://host:6379/0").
+Callers use a namespaced Cache view (get_cache("scrape"), ...), which handles
+JSON serialization, TTLs and stampede protection (get_or_set).
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+from app.core.responses import dumps
+
+CACHE_URL_ENV = "CACHE_URL"
+CACHE_PREFIX_ENV = "CACHE_PREFIX"
+CACHE_MAX_ENTRIES_ENV = "CACHE_MAX_ENTRIES"
+
+_MISSING = object()
+
+
+class CacheBackend:
+    """Raw bytes key/value store. Keys arrive fully namespaced."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Set only if absent; returns True if the key was written."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        """Atomically increment an integer counter; ttl applies when the key is created."""
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _put(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._put(key, value, ttl)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._put(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            current = self._live(key)
+            if current is None:
+                n = 1
+                self._put(key, b"1", ttl)
+            else:
+                n = int(current) + 1
+                expires_at, _ = self._data[key]
+                self._data[key] = (expires_at, str(n).encode())
+            return n
+
+
+class RedisCache(CacheBackend):
+    def __init__(self, url: Optional[str] = None, client: Any = None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:  # pragma: no cover
+                raise RuntimeError("CACHE_URL points to Redis but the 'redis' package is not installed") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    @staticmethod
+    def _ms(ttl: Optional[float]) -> Optional[int]:
+        return max(1, int(ttl * 1000)) if ttl else None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.client.set(key, value, px=self._ms(ttl))
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return bool(self.client.set(key, value, px=self._ms(ttl), nx=True))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        n = int(self.client.incr(key))
+        if n == 1 and ttl:
+            self.client.pexpire(key, self._ms(ttl))
+        return n
+
+
+class Cache:
+    """
+    Namespaced, JSON-serializing view over a backend.
+
+    get_or_set() protects against stampedes twice: a per-process lock lets only
+    one thread per key run the loader, and a short-lived backend lock (SET NX)
+    does the same across nodes; losers wait for the winner's value.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str, prefix: str = "pasteurhub"):
+        self.backend = backend
+        self.namespace = namespace
+        self.prefix = prefix
+        # key -> [lock, holders]; entries are dropped when the last holder leaves,
+        # so one-off keys (e.g. assessment hashes) don't accumulate
+        self._locks: Dict[str, List[Any]] = {}
+        self._locks_guard = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{self.namespace}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self.backend.get(self._key(key))
+        if raw is None:
+            return default
+        return orjson.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.backend.set(self._key(key), dumps(value), ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(self._key(key))
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        return self.backend.incr(self._key(key), ttl)
+
+    @contextmanager
+    def _local_lock(self, key: str, timeout: float = -1) -> Iterator[bool]:
+        """Per-key process lock; yields whether it was acquired within `timeout`."""
+        with self._locks_guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        acquired = entry[0].acquire(timeout=timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                entry[0].release()
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        lock_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+    ) -> Any:
+        """
+        Cached value, or the loader's result. Waiting for another thread or node
+        to load the key is bounded by `lock_timeout` in total; after that the
+        loader runs here.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        deadline = time.monotonic() + lock_timeout
+        with self._local_lock(key, timeout=max(0.0, lock_timeout)):
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            lock_key = self._key(f"lock:{key}")
+            lock_ttl = max(lock_timeout, poll_interval)
+            owned = self.backend.add(lock_key, b"1", lock_ttl)
+            while not owned:
+                # another node is computing it: wait for its result
+                if time.monotonic() >= deadline:
+                    break  # holder died or is too slow; compute ourselves
+                time.sleep(poll_interval)
+                value = self.get(key, _MISSING)
+                if value is not _MISSING:
+                    return value
+                owned = self.backend.add(lock_key, b"1", lock_ttl)
+
+            try:
+                value = loader()
+                self.set(key, value, ttl)
+                return value
+            finally:
+                if owned:
+                    self.backend.delete(lock_key)
+
+
+_backend: Optional[CacheBackend] = None
+_backend_guard = threading.Lock()
+_caches: Dict[str, Cache] = {}
+
+
+def _make_backend() -> CacheBackend:
+    url = os.getenv(CACHE_URL_ENV, "memory://")
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache(url)
+    try:
+        max_entries = int(os.getenv(CACHE_MAX_ENTRIES_ENV, "10000"))
+    except ValueError:
+        max_entries = 10_000
+    return MemoryCache(max_entries=max_entries)
+
+
+def get_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        with _backend_guard:
+            if _backend is None:
+                _backend = _make_backend()
+    return _backend
+
+
+def set_backend(backend: CacheBackend) -> None:
+    """Swap the process-wide backend (e.g. a fakeredis-backed RedisCache in tests)."""
+    global _backend
+    with _backend_guard:
+        _backend = backend
+        _caches.clear()
+
+
+def get_cache(namespace: str) -> Cache:
+    cache = _caches.get(namespace)
+    if cache is None:
+        cache = Cache(get_backend(), namespace, prefix=os.getenv(CACHE_PREFIX_ENV, "pasteurhub"))
+        _caches[namespace] = cache
+    return cache
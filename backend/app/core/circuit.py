@@ -0,0 +1,120 @@
+"""
+Circuit breaker for slow or failing upstream dependencies.
+
+closed     calls go through; the outcome of the last `window` calls is kept,
+           and once at least `min_calls` are recorded a failure rate at or
+           above `failure_rate` opens the circuit.
+open       calls fail immediately with CircuitOpenError for `open_seconds`.
+half_open  up to `half_open_probes` trial calls go through; a success closes
+           the circuit, a failure opens it again.
+
+State is per worker process.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+from app.core.metrics import CIRCUIT_CALLS, CIRCUIT_STATE
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"circuit {name!r} is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window: int = 20,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        is_failure: Optional[Callable[[Exception], bool]] = None,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = max(1, min_calls)
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self.is_failure = is_failure or (lambda exc: True)
+
+        self._lock = threading.Lock()
+        self._results: Deque[bool] = deque(maxlen=max(self.min_calls, window))  # True = failure
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        CIRCUIT_STATE.set(0, name=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._set_state(HALF_OPEN)
+            self._probes = 0
+        return self._state
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], name=self.name)
+
+    def _open(self) -> None:
+        self._set_state(OPEN)
+        self._opened_at = time.monotonic()
+        self._results.clear()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._set_state(CLOSED)
+            self._results.clear()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return
+            retry_after = max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+        CIRCUIT_CALLS.inc(name=self.name, result="rejected")
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record(self, failed: bool) -> None:
+        CIRCUIT_CALLS.inc(name=self.name, result="failure" if failed else "success")
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    self._set_state(CLOSED)
+                    self._results.clear()
+                return
+            if self._state == OPEN:
+                return  # a call admitted before the circuit opened
+            self._results.append(failed)
+            n = len(self._results)
+            if n >= self.min_calls and sum(self._results) / n >= self.failure_rate:
+                self._open()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record(self.is_failure(e))
+            raise
+        self.record(False)
+        return result
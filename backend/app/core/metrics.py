@@ -0,0 +1,239 @@
+"""
+Minimal in-process Prometheus metrics (text exposition format 0.0.4).
+
+Counters, gauges and histograms live in a module registry and are rendered by
+GET /metrics. Values are per process: with several uvicorn workers, scrape
+each worker (or run one worker per container).
+
+Recording is a dict lookup, a bisect and a lock, so it is cheap enough for
+every request and for the stage timers inside the CBR and scraper code.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(x: float) -> str:
+    if x == float("inf"):
+        return "+Inf"
+    return repr(float(x)) if isinstance(x, float) else str(x)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            s[0][i] += 1
+            s[1] += value
+            s[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(s[0]), s[1], s[2]) for k, s in self._series.items()]
+        out = self.header()
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="' + _num(bound) + '"'
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return out
+
+
+REGISTRY: List[_Metric] = []
+COLLECTORS: List[Callable[[], List[str]]] = []
+
+
+def collector(fn: Callable[[], List[str]]) -> Callable[[], List[str]]:
+    """Register a function returning exposition lines computed at scrape time."""
+    COLLECTORS.append(fn)
+    return fn
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in list(REGISTRY):
+        lines.extend(metric.render())
+    for fn in list(COLLECTORS):
+        lines.extend(fn())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------
+# App metrics
+# ---------------------------
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")
+)
+REQUESTS_TOTAL = Counter("http_requests_total", "HTTP responses by route and status.", ("method", "route", "status"))
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served.", ("method",))
+
+CBR_STAGE_SECONDS = Histogram(
+    "cbr_stage_seconds", "Time spent in each find_similar_cases stage.", ("stage",), STAGE_BUCKETS
+)
+CBR_INDEX_BYTES = Gauge("cbr_index_bytes", "Memory held by this worker's fitted CBR index.", ("part",))
+SCRAPE_STAGE_SECONDS = Histogram(
+    "scrape_stage_seconds", "Time spent in each Pasteur.fr scrape stage.", ("stage",), STAGE_BUCKETS
+)
+
+ADMISSION_LIMIT = Gauge("admission_limit", "Configured admission limits per pool.", ("pool", "kind"))
+ADMISSION_ACTIVE = Gauge("admission_active", "Requests holding an admission slot.", ("pool",))
+ADMISSION_QUEUED = Gauge("admission_queued", "Requests waiting for an admission slot.", ("pool",))
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Requests shed with 503.", ("pool", "reason"))
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds", "Time spent queued before admission.", ("pool",), STAGE_BUCKETS
+)
+
+CIRCUIT_STATE = Gauge("circuit_state", "Circuit breaker state (0 closed, 1 open, 2 half-open).", ("name",))
+CIRCUIT_CALLS = Counter("circuit_calls_total", "Calls through a circuit breaker by outcome.", ("name", "result"))
+
+
+def _route_label(scope: Scope) -> str:
+    # the route template keeps label cardinality bounded (no raw ids or junk paths)
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Per-route latency histogram, status counter and in-flight gauge."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec(method=method)
+            route = _route_label(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, method=method, route=route)
+            REQUESTS_TOTAL.inc(method=method, route=route, status=str(status))
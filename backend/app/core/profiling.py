@@ -0,0 +1,77 @@
+"""
+Wall-clock sampling profiler for one request at a time.
+
+A daemon thread snapshots every thread's stack (sys._current_frames) every
+PROFILE_INTERVAL_MS and counts identical stacks. Sampling all threads covers
+sync endpoints running in the threadpool as well as the event loop; idle
+waits are dropped. On a busy worker, concurrent requests show up too.
+
+Output is the "folded" format (one "frame;frame;frame count" line per stack),
+readable by speedscope or flamegraph.pl.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "pasteurhub-profiles"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+# top-of-stack functions that mean "this thread is parked, not working"
+_IDLE = {"wait", "select", "poll", "_wait_for_tstate_lock"}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = max(0.001, interval_ms / 1000)
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._path: Optional[str] = None
+        self._started = 0.0
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == me or frame.f_code.co_name in _IDLE:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        deadline = self._started + PROFILE_MAX_SECONDS
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            self._sample()
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and write the profile once; returns its path."""
+        if self._path is not None:
+            return self._path
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        fd, self._path = tempfile.mkstemp(prefix=time.strftime("%Y%m%d-%H%M%S-"), suffix=".folded", dir=PROFILE_DIR)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return self._path
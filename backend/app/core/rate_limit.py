@@ -0,0 +1,43 @@
+import time
+from typing import Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.cache import get_cache
+
+
+class FixedWindowLimiter:
+    """
+    Fixed-window counter on top of the shared cache, so limits hold across
+    workers and nodes when CACHE_URL points to Redis.
+    """
+
+    def __init__(self, namespace: str, limit: int, window_seconds: int):
+        self.namespace = namespace
+        self.limit = max(1, limit)
+        self.window = max(1, window_seconds)
+
+    def _bucket(self, key: str) -> Tuple[str, int]:
+        now = time.time()
+        window_id = int(now // self.window)
+        retry_after = int(self.window - (now % self.window)) + 1
+        return f"{key}:{window_id}", retry_after
+
+    def hit(self, key: str) -> Tuple[bool, int]:
+        """Count one attempt; returns (allowed, retry_after_seconds)."""
+        bucket, retry_after = self._bucket(key)
+        n = get_cache(self.namespace).incr(bucket, ttl=self.window + 1)
+        return n <= self.limit, retry_after
+
+    def reset(self, key: str) -> None:
+        bucket, _ = self._bucket(key)
+        get_cache(self.namespace).delete(bucket)
+
+    def check(self, key: str, detail: str = "Too many requests") -> None:
+        allowed, retry_after = self.hit(key)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=detail,
+                headers={"Retry-After": str(retry_after)},
+            )
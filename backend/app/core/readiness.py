@@ -0,0 +1,128 @@
+"""
+Startup warmup and readiness tracking.
+
+warm_up() runs each step once at startup (from the app lifespan) and records
+whether it succeeded and how long it took. Failed steps are retried by a
+background task with exponential backoff (retry_until_ready). GET /ready only
+reports that state, returning 503 until every step is ready, so an
+orchestrator only routes traffic to warm workers and probes never run
+warmup work themselves. /health stays a liveness probe.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+# Connections opened per pool during warmup (capped by DB_POOL_SIZE).
+WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", "2"))
+# Backoff between retries of failed steps: doubles from WARMUP_RETRY_SECONDS up to the max.
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "1"))
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "30"))
+
+
+def _warm_db_pool() -> None:
+    from app.db.session import DB_POOL_SIZE, engine, read_engine
+
+    for eng in filter(None, (engine, read_engine)):
+        conns = []
+        try:
+            for _ in range(max(1, min(WARMUP_POOL_CONNECTIONS, DB_POOL_SIZE))):
+                conn = eng.connect()
+                conns.append(conn)
+                conn.execute(text("SELECT 1"))
+        finally:
+            for conn in conns:
+                conn.close()  # back to the pool, already connected
+
+
+async def _warm_async_db_pool() -> None:
+    from app.db.session import DATABASE_READ_URL, _async_sessionmaker
+
+    for role in ("primary", "read") if DATABASE_READ_URL else ("primary",):
+        async with _async_sessionmaker(role)() as db:
+            await db.execute(text("SELECT 1"))
+
+
+def _warm_catalog() -> None:
+    from app.db.session import SessionLocal
+    from app.services.catalog import catalog
+
+    with SessionLocal() as db:
+        catalog.all(db)
+
+
+def _warm_cbr_index() -> None:
+    from app.db.session import SessionLocal
+    from app.services import cbr
+
+    cbr.load_dependencies()
+    with SessionLocal() as db:
+        index = cbr.get_case_index(db)
+    if len(index):
+        # the first transform/cosine call has one-off setup costs too
+        index.group_for("").semantic("warmup query")
+
+
+def _warm_auth() -> None:
+    from app.core import security
+
+    security._get_jwt_config()
+    security._get_dummy_hash()
+
+
+# name -> sync step; async steps run on the event loop
+STEPS: List[Tuple[str, Callable]] = [
+    ("db_pool", _warm_db_pool),
+    ("async_db_pool", _warm_async_db_pool),
+    ("catalog", _warm_catalog),
+    ("cbr_index", _warm_cbr_index),
+    ("auth", _warm_auth),
+]
+
+_state: Dict[str, dict] = {name: {"ready": False, "seconds": None, "error": None} for name, _ in STEPS}
+_lock = threading.Lock()
+
+
+async def _run_step(name: str, fn: Callable) -> None:
+    t0 = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(fn):
+            await fn()
+        else:
+            await run_in_threadpool(fn)
+    except Exception as e:
+        result = {"ready": False, "error": f"{type(e).__name__}: {e}"}
+    else:
+        result = {"ready": True, "error": None}
+    result["seconds"] = round(time.perf_counter() - t0, 4)
+    with _lock:
+        _state[name] = result
+
+
+async def warm_up(only_failed: bool = False) -> None:
+    for name, fn in STEPS:
+        if only_failed and _state[name]["ready"]:
+            continue
+        await _run_step(name, fn)
+
+
+async def retry_until_ready(delay: float = WARMUP_RETRY_SECONDS) -> None:
+    """Re-run failed steps, backing off between attempts, until every step is ready."""
+    while not status()["ready"]:
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await warm_up(only_failed=True)
+        delay = min(max(2 * delay, WARMUP_RETRY_SECONDS), WARMUP_RETRY_MAX_SECONDS)
+
+
+def status() -> dict:
+    with _lock:
+        components = {name: dict(s) for name, s in _state.items()}
+    return {"ready": all(c["ready"] for c in components.values()), "components": components}
@@ -1,16 +1,23 @@
+import asyncio
 import base64
 import hashlib
 import hmac
 import os
 import secrets
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Dict, Tuple
 
 import jwt
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
+from app.core.cache import get_cache
 from app.db.session import get_db
 from app.models.user import User
 
@@ -27,8 +34,35 @@ _PBKDF2_NAME = "sha256"
 _PBKDF2_ITERS = 210_000
 _SALT_BYTES = 16
 
+# Password hashing runs on its own small executor so a login burst cannot
+# occupy the shared request threadpool (pbkdf2_hmac releases the GIL).
+PASSWORD_HASH_WORKERS = max(1, int(os.getenv("PASSWORD_HASH_WORKERS", "2")))
+PASSWORD_HASH_MAX_PENDING = max(0, int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16")))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "3"))
 
+_hash_executor: ThreadPoolExecutor | None = None
+_hash_init_lock = threading.Lock()
+_dummy_hash: str | None = None
+
+
+class _HashSlots:
+    """Admission state for one event loop (asyncio primitives are bound to their loop)."""
+
+    def __init__(self) -> None:
+        self.semaphore = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+        self.waiting = 0
+
+
+_hash_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _HashSlots]" = weakref.WeakKeyDictionary()
+
+
+# Authenticated principals are cached briefly so protected calls skip the users query.
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+
+
+@lru_cache(maxsize=1)
 def _get_jwt_config() -> Tuple[str, str, int]:
+    """Resolved once per process (a missing secret is not cached, so it is re-checked)."""
     secret = os.getenv(JWT_SECRET_ENV)
     if not secret:
         raise HTTPException(status_code=500, detail="JWT_SECRET_KEY is not configured")
@@ -44,6 +78,10 @@ def _get_jwt_config() -> Tuple[str, str, int]:
     return secret, alg, exp_minutes
 
 
+def jwt_expire_minutes() -> int:
+    return _get_jwt_config()[2]
+
+
 def _b64e(b: bytes) -> str:
     return base64.urlsafe_b64encode(b).decode("utf-8").rstrip("=")
 
@@ -77,15 +115,91 @@ def verify_password(password: str, stored: str) -> bool:
         return False
 
 
+def _get_dummy_hash() -> str:
+    """Hash of a random secret, verified for unknown users so they cost the same time."""
+    global _dummy_hash
+    if _dummy_hash is None:
+        with _hash_init_lock:
+            if _dummy_hash is None:
+                _dummy_hash = hash_password(secrets.token_urlsafe(16))
+    return _dummy_hash
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_init_lock:
+            if _hash_executor is None:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="pwhash"
+                )
+    return _hash_executor
+
+
+def _get_hash_slots() -> _HashSlots:
+    """Slots of the running loop; the executor itself is shared and still caps hashing threads."""
+    loop = asyncio.get_running_loop()
+    slots = _hash_slots.get(loop)
+    if slots is None:
+        slots = _hash_slots[loop] = _HashSlots()
+    return slots
+
+
+async def verify_password_async(password: str, stored: str) -> bool:
+    """
+    verify_password() on the bounded hashing executor.
+
+    At most PASSWORD_HASH_WORKERS run at once and PASSWORD_HASH_MAX_PENDING wait;
+    beyond that, or after PASSWORD_HASH_QUEUE_TIMEOUT seconds of waiting, we
+    answer 503 instead of queueing more work.
+    """
+    executor = _get_hash_executor()
+    slots = _get_hash_slots()
+
+    busy = HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+    if slots.semaphore.locked() and slots.waiting >= PASSWORD_HASH_MAX_PENDING:
+        raise busy
+
+    slots.waiting += 1
+    try:
+        await asyncio.wait_for(slots.semaphore.acquire(), timeout=PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise busy
+    finally:
+        slots.waiting -= 1
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, verify_password, password, stored)
+    finally:
+        slots.semaphore.release()
+
+
 def authenticate_user_db(db: Session, username: str, password: str) -> str | None:
     user = db.query(User).filter(User.username == username).first()
     if not user:
+        verify_password(password, _get_dummy_hash())
         return None
     if not verify_password(password, user.password_hash):
         return None
     return user.role
 
 
+async def authenticate_user_db_async(db: Session, username: str, password: str) -> str | None:
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.username == username).first())
+    if not user:
+        # constant time for unknown users
+        await verify_password_async(password, _get_dummy_hash())
+        return None
+    if not await verify_password_async(password, user.password_hash):
+        return None
+    return user.role
+
+
 def create_access_token(subject: str, role: str = "admin") -> str:
     secret, alg, exp_minutes = _get_jwt_config()
 
@@ -126,6 +240,24 @@ def _normalize_token(token: str) -> str:
     return t
 
 
+def _principal_key(sub: str, iat: Any) -> str:
+    # The per-user generation is bumped by invalidate_principal(), which orphans
+    # every cached entry for that user at once.
+    generation = get_cache("principal").get(f"gen:{sub}", 0)
+    return f"{sub}:{iat}:{generation}"
+
+
+def invalidate_principal(username: str) -> None:
+    """
+    Call after a user's role or password changes (or the user is deleted).
+
+    This only reaches other processes through a shared cache (CACHE_URL=redis://...).
+    With the per-process memory backend, other workers keep serving the old
+    principal until it expires, i.e. for up to PRINCIPAL_CACHE_TTL seconds.
+    """
+    get_cache("principal").incr(f"gen:{username}")
+
+
 def get_current_user(
     creds: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
     db: Session = Depends(get_db),
@@ -137,12 +269,22 @@ def get_current_user(
     token = _normalize_token(creds.credentials)
     claims = decode_token(token)
 
+    cache_key = None
+    if PRINCIPAL_CACHE_TTL > 0:
+        cache_key = _principal_key(claims["sub"], claims.get("iat"))
+        principal = get_cache("principal").get(cache_key)
+        if principal is not None:
+            return principal
+
     # Ensure user still exists; take role from DB (not just token)
     user = db.query(User).filter(User.username == claims["sub"]).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
-    return {"sub": user.username, "role": user.role}
+    principal = {"sub": user.username, "role": user.role}
+    if cache_key is not None:
+        get_cache("principal").set(cache_key, principal, ttl=PRINCIPAL_CACHE_TTL)
+    return principal
 
 
 def require_admin_user(user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
@@ -0,0 +1,142 @@
+"""
+Per-request timing breakdown, sent back as a Server-Timing header.
+
+Code adds to named buckets ("db", "scrape", "cbr") for the current request via
+a contextvar; the dict is shared by reference, so time spent in threadpool
+workers and in SQLAlchemy's async greenlets lands in the same request.
+
+  Server-Timing: db;dur=12.4, scrape;dur=840.1, cbr;dur=35.0, app;dur=901.7
+
+Admins can also profile a single request: send "X-Profile: 1" (or ?profile=1)
+with an admin bearer token. The folded-stack profile is written to
+PROFILE_DIR and its path returned in X-Profile-Path.
+"""
+from __future__ import annotations
+
+import functools
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "1") == "1"
+
+_current: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timing", default=None)
+
+
+def add(name: str, seconds: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, time.perf_counter() - t0)
+
+
+def timed_as(name: str):
+    """Decorator form of timed()."""
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with timed(name):
+                return fn(*args, **kwargs)
+
+        return inner
+
+    return wrap
+
+
+def header_value(timings: Dict[str, float], total: float, queries: Optional[int] = None) -> str:
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    if queries is not None:
+        parts.append(f'queries;desc="{queries} statements"')
+    parts.append(f"app;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def _wants_profile(scope: Scope) -> bool:
+    if Headers(scope=scope).get("x-profile") == "1":
+        return True
+    return QueryParams(scope.get("query_string", b"")).get("profile") == "1"
+
+
+def _check_admin(scope: Scope) -> None:
+    """Same checks as the require_admin_user dependency; raises HTTPException."""
+    from app.core.security import get_current_user, require_admin_user
+    from app.db.session import SessionLocal
+
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    creds = HTTPAuthorizationCredentials(scheme=scheme, credentials=token)
+    with SessionLocal() as db:
+        require_admin_user(get_current_user(creds, db))
+
+
+class ServerTimingMiddleware:
+    """
+    Adds Server-Timing; with SQL_QUERY_TRACKING=1 it also counts each request's
+    statements (reported as "queries") and logs N+1 warnings.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        from app.db.session import SQL_QUERY_TRACKING, track_queries
+
+        self.app = app
+        self.track_queries = track_queries if SQL_QUERY_TRACKING else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not SERVER_TIMING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        profiler = None
+        if _wants_profile(scope):
+            try:
+                await run_in_threadpool(_check_admin, scope)
+            except HTTPException as e:
+                await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+                return
+            from app.core.profiling import SamplingProfiler
+
+            profiler = SamplingProfiler()
+
+        timings: Dict[str, float] = {}
+        token = _current.set(timings)
+        t0 = time.perf_counter()
+        stats = None
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                queries = stats.count if stats is not None else None
+                headers.append("Server-Timing", header_value(timings, time.perf_counter() - t0, queries))
+                if profiler is not None:
+                    headers["X-Profile-Path"] = profiler.stop()
+            await send(message)
+
+        tracking = self.track_queries(f"{scope['method']} {scope['path']}") if self.track_queries else nullcontext()
+        if profiler is not None:
+            profiler.start()
+        try:
+            with tracking as stats:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            _current.reset(token)
@@ -0,0 +1,54 @@
+"""
+Idempotent schema migrations for databases created before a model change.
+
+create_all() only creates missing tables, so columns/indexes added to existing
+tables are applied here. Every statement must be safe to run repeatedly.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# (name, postgres DDL, generic DDL or None)
+MIGRATIONS = [
+    # derived Case columns; SQLite has no ADD COLUMN IF NOT EXISTS (recreate dev DBs instead)
+    ("cases.scenario_norm", "ALTER TABLE cases ADD COLUMN IF NOT EXISTS scenario_norm VARCHAR(50)", None),
+    ("cases.scenario_inferred", "ALTER TABLE cases ADD COLUMN IF NOT EXISTS scenario_inferred VARCHAR(50)", None),
+    ("cases.text_tokens", "ALTER TABLE cases ADD COLUMN IF NOT EXISTS text_tokens TEXT", None),
+    (
+        "ix_cases_scenario_type",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cases_scenario_type ON cases (scenario_type)",
+        "CREATE INDEX IF NOT EXISTS ix_cases_scenario_type ON cases (scenario_type)",
+    ),
+    (
+        "ix_cases_vaccine_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cases_vaccine_id ON cases (vaccine_id)",
+        "CREATE INDEX IF NOT EXISTS ix_cases_vaccine_id ON cases (vaccine_id)",
+    ),
+    (
+        "ix_cases_problem_text_hash",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cases_problem_text_hash ON cases USING hash (problem_text)",
+        "CREATE INDEX IF NOT EXISTS ix_cases_problem_text_hash ON cases (problem_text)",
+    ),
+    (
+        "ix_destination_vaccines_vaccine_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_destination_vaccines_vaccine_id "
+        "ON destination_vaccines (vaccine_id)",
+        "CREATE INDEX IF NOT EXISTS ix_destination_vaccines_vaccine_id ON destination_vaccines (vaccine_id)",
+    ),
+    (
+        "ix_destinations_source_url",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_destinations_source_url ON destinations (source_url)",
+        "CREATE INDEX IF NOT EXISTS ix_destinations_source_url ON destinations (source_url)",
+    ),
+]
+
+
+def run_migrations(engine: Engine) -> None:
+    is_pg = engine.dialect.name == "postgresql"
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name, pg_ddl, generic_ddl in MIGRATIONS:
+            ddl = pg_ddl if is_pg else generic_ddl
+            if ddl is None:
+                continue
+            conn.execute(text(ddl))
+            print(f"  migration ok: {name}")
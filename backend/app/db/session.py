@@ -1,16 +1,434 @@
+import logging
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import re
+import secrets
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import timing
+from app.core.cache import get_cache
 
 DATABASE_URL = os.getenv("DATABASE_URL", "")
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Optional read replica for public reads. After a client commits a write, its
+# reads stay on the primary for READ_AFTER_WRITE_SECONDS (replication lag).
+# Clients are told apart by their authenticated user, else by a cookie.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+READ_AFTER_WRITE_SECONDS = float(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
+READ_AFTER_WRITE_COOKIE = os.getenv("READ_AFTER_WRITE_COOKIE", "pasteurhub_rw")
+
+# Pool sizing: tune per worker count (total connections = workers * (size + overflow)).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 disables
+
+# Query tracking: per-request statement counts and N+1 warnings (see track_queries)
+SQL_QUERY_TRACKING = os.getenv("SQL_QUERY_TRACKING", "0") == "1"
+SQL_REPEAT_WARN_THRESHOLD = int(os.getenv("SQL_REPEAT_WARN_THRESHOLD", "10"))
+
+logger = logging.getLogger(__name__)
+
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class _PoolStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.timeouts = 0
+        self.buckets = [0] * len(CHECKOUT_BUCKETS)
+
+    def observe(self, seconds: float) -> None:
+        with self.lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            for i, bound in enumerate(CHECKOUT_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[i] += 1
+
+
+_stats = _PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with _stats.lock:
+                _stats.timeouts += 1
+            raise
+        finally:
+            _stats.observe(time.perf_counter() - t0)
+
+
+def _engine_kwargs(url: str) -> dict:
+    kwargs = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if url.startswith("sqlite"):
+        return kwargs
+
+    kwargs.update(
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if DB_STATEMENT_TIMEOUT_MS > 0 and url.startswith("postgresql"):
+        # applied to every pooled connection, i.e. to every session
+        kwargs["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return kwargs
+
+
+engine = create_engine(DATABASE_URL, **_engine_kwargs(DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
+read_engine = create_engine(DATABASE_READ_URL, **_engine_kwargs(DATABASE_READ_URL)) if DATABASE_READ_URL else None
+
+ReadSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine is not None else SessionLocal
+)
+
+
+def _gauges(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+        "checked_in": pool.checkedin(),
+    }
+
+
+def pool_stats() -> dict:
+    """Gauges and checkout latency for the primary pool (plus async/read pools when in use)."""
+    out = {
+        "size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": 0,
+        "overflow": 0,
+        "checked_in": 0,
+    }
+    if isinstance(engine.pool, QueuePool):
+        out.update(_gauges(engine.pool))
+    for name, eng in (("read", read_engine), *((f"async_{k}", v[0]) for k, v in _async.items())):
+        if eng is not None and isinstance(eng.pool, QueuePool):
+            out[name] = _gauges(eng.pool)
+    with _stats.lock:
+        out["checkout"] = {
+            "count": _stats.count,
+            "timeouts": _stats.timeouts,
+            "seconds_total": round(_stats.total_seconds, 6),
+            "seconds_max": round(_stats.max_seconds, 6),
+            "buckets": dict(zip(CHECKOUT_BUCKETS, _stats.buckets)),
+        }
+    return out
+
+
+# ---------------------------
+# Per-request DB time (Server-Timing "db") and query tracking; covers every
+# engine, sync and async
+# ---------------------------
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace collapsed and IN lists folded, for grouping."""
+    return _IN_LIST.sub("(?...)", _SPACES.sub(" ", statement).strip())
+
+
+class QueryStats:
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+        self._warned: set = set()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if self.shapes[shape] > SQL_REPEAT_WARN_THRESHOLD and shape not in self._warned:
+            self._warned.add(shape)
+            logger.warning(
+                "possible N+1 in %s: statement repeated more than %d times: %s",
+                self.label or "block",
+                SQL_REPEAT_WARN_THRESHOLD,
+                shape[:300],
+            )
+
+    def repeated(self, threshold: int = SQL_REPEAT_WARN_THRESHOLD) -> dict:
+        return {shape: n for shape, n in self.shapes.items() if n > threshold}
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# trackers that see every statement in the process (TestClient runs the app in
+# another thread and context, so tests cannot rely on the contextvar)
+_global_stats: list = []
+
+
+@contextmanager
+def track_queries(label: str = "", all_threads: bool = False) -> Iterator[QueryStats]:
+    """
+    Count statements (and DB time) run in this context, threadpool work included;
+    with all_threads=True, count every statement the process runs meanwhile.
+    """
+    stats = QueryStats(label)
+    if all_threads:
+        _global_stats.append(stats)
+        try:
+            yield stats
+        finally:
+            _global_stats.remove(stats)
+        return
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, max_repeats: Optional[int] = None, label: str = "") -> Iterator[QueryStats]:
+    """
+    Assert a query budget for a block; meant for tests (pytest fixture or plain):
+
+        with query_budget(3, label="recommendations"):
+            client.get("/resources/destinations/1/recommendations")
+    """
+    with track_queries(label, all_threads=True) as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise AssertionError(f"{label or 'block'} ran {stats.count} queries (budget {max_queries})")
+    if max_repeats is not None and stats.repeated(max_repeats):
+        raise AssertionError(f"{label or 'block'} repeated statements: {stats.repeated(max_repeats)}")
+
+
+def _finish_query(conn, statement: str) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    timing.add("db", elapsed)
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for stats in tuple(_global_stats):
+        stats.record(statement, elapsed)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish_query(conn, statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        _finish_query(conn, exception_context.statement or "")
+
+
+# ---------------------------
+# Read-your-writes stickiness
+# ---------------------------
+
+def client_key(request: Request) -> Optional[str]:
+    """Who the read-after-write window belongs to: the token's user, else the cookie."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        from app.core.security import decode_token
+
+        try:
+            return "user:" + decode_token(token.strip())["sub"]
+        except Exception:
+            pass  # anonymous as far as routing is concerned
+    cookie = request.cookies.get(READ_AFTER_WRITE_COOKIE)
+    return f"cookie:{cookie}" if cookie else None
+
+
+def note_write(request: Request) -> None:
+    if READ_AFTER_WRITE_SECONDS <= 0 or not DATABASE_READ_URL:
+        return
+    key = client_key(request)
+    if key is None:
+        # ReadAfterWriteMiddleware hands the cookie to the client
+        cookie = request.state.read_after_write_cookie = secrets.token_urlsafe(16)
+        key = f"cookie:{cookie}"
+    get_cache("read-after-write").set(key, 1, ttl=READ_AFTER_WRITE_SECONDS)
+
+
+def recently_wrote(request: Request) -> bool:
+    if not DATABASE_READ_URL:
+        return False
+    key = client_key(request)
+    return key is not None and get_cache("read-after-write").get(key) is not None
+
+
+async def anote_write(request: Request) -> None:
+    """note_write for async code: the shared-cache call runs in the threadpool."""
+    if READ_AFTER_WRITE_SECONDS > 0 and DATABASE_READ_URL:
+        await run_in_threadpool(note_write, request)
+
+
+class ReadAfterWriteMiddleware:
+    """Sets the read-after-write cookie for anonymous clients that just wrote (see note_write)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not DATABASE_READ_URL:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                cookie = scope.get("state", {}).get("read_after_write_cookie")
+                if cookie:
+                    MutableHeaders(scope=message).append(
+                        "Set-Cookie",
+                        f"{READ_AFTER_WRITE_COOKIE}={cookie}; Max-Age={int(READ_AFTER_WRITE_SECONDS) or 1}; "
+                        "Path=/; HttpOnly; SameSite=Lax",
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+@event.listens_for(Session, "after_commit")
+def _flag_commit(session):
+    session.info["committed"] = True
+
+
+def get_db(request: Request):
     db = SessionLocal()
+    try:
+        yield db
+    finally:
+        if db.info.get("committed"):
+            note_write(request)
+        db.close()
+
+
+def get_read_db(request: Request):
+    """Replica session for read-only routes; the primary when no replica or right after a write."""
+    if read_engine is None or recently_wrote(request):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# ---------------------------
+# Async engine (asyncpg) for the non-blocking read path
+# ---------------------------
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def _async_engine_kwargs(url: str) -> dict:
+    kwargs = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if url.startswith("sqlite"):
+        return kwargs
+
+    kwargs.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if DB_STATEMENT_TIMEOUT_MS > 0 and url.startswith("postgresql"):
+        kwargs["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+    return kwargs
+
+
+# role ("primary" | "read") -> (engine, sessionmaker); created on first use,
+# so sync-only tools never need the async driver.
+_async: dict = {}
+_async_lock = threading.Lock()
+
+
+def _async_sessionmaker(role: str = "primary") -> async_sessionmaker:
+    if role == "read" and not DATABASE_READ_URL:
+        role = "primary"
+    entry = _async.get(role)
+    if entry is None:
+        with _async_lock:
+            entry = _async.get(role)
+            if entry is None:
+                url = to_async_url(DATABASE_READ_URL if role == "read" else DATABASE_URL)
+                eng = create_async_engine(url, **_async_engine_kwargs(url))
+                maker = async_sessionmaker(eng, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+                entry = _async[role] = (eng, maker)
+    return entry[1]
+
+
+def get_async_engine():
+    _async_sessionmaker("primary")
+    return _async["primary"][0]
+
+
+def async_session() -> AsyncSession:
+    """New primary AsyncSession (use as `async with async_session() as db:`)."""
+    return _async_sessionmaker("primary")()
+
+
+async def dispose_async_engines() -> None:
+    for eng, _ in list(_async.values()):
+        await eng.dispose()
+
+
+async def get_async_db(request: Request):
+    async with _async_sessionmaker("primary")() as db:
+        yield db
+        if db.sync_session.info.get("committed"):
+            await anote_write(request)
+
+
+async def get_async_read_db(request: Request):
+    # the stickiness lookup talks to the shared cache: keep it off the event loop
+    role = "primary" if DATABASE_READ_URL and await run_in_threadpool(recently_wrote, request) else "read"
+    async with _async_sessionmaker(role)() as db:
+        yield db
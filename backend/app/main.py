@@ -1,13 +1,54 @@
-from fastapi import FastAPI
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Security
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.core import metrics, readiness
+from app.core.compression import CompressionMiddleware
+from app.core.security import require_admin_user
+from app.core.metrics import MetricsMiddleware
+from app.core.timing import ServerTimingMiddleware
+from app.core.responses import FastJSONResponse
+from app.db.session import ReadAfterWriteMiddleware, dispose_async_engines, pool_stats
 from app.resources.router import router as resources_router
 from app.resources.auth import router as auth_router
 
+# Response compression (bytes on the wire matter for clinics on slow links)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the pools, catalog, CBR index and auth config before taking traffic
+    # (WARMUP_ENABLED=0: warm in the background without delaying startup);
+    # failed steps are retried in the background and reported by /ready
+    # instead of crashing the worker.
+    retry = None
+    if readiness.WARMUP_ENABLED:
+        await readiness.warm_up()
+        if not readiness.status()["ready"]:
+            retry = asyncio.create_task(readiness.retry_until_ready())
+    else:
+        retry = asyncio.create_task(readiness.retry_until_ready(delay=0))
+    yield
+    if retry is not None:
+        retry.cancel()
+        with suppress(asyncio.CancelledError):
+            await retry
+    await dispose_async_engines()
+
+
 app = FastAPI(
     title="PasteurHub API",
     description="Intelligent vaccine recommendation system for travel health",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -23,6 +64,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    gzip_level=COMPRESSION_GZIP_LEVEL,
+    brotli_quality=COMPRESSION_BROTLI_QUALITY,
+)
+
+app.add_middleware(ServerTimingMiddleware)
+
+# Hands out the read-your-writes cookie to anonymous writers (replica setups only)
+app.add_middleware(ReadAfterWriteMiddleware)
+
+# Outermost, so latency includes compression and CORS handling
+app.add_middleware(MetricsMiddleware)
+
 # Auth endpoints at /auth/*
 app.include_router(auth_router)
 
@@ -42,3 +98,47 @@ def read_root():
 @app.get("/health", include_in_schema=False)
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/ready", include_in_schema=False)
+def readiness_check():
+    """Readiness probe: 503 until every warmup step has succeeded (retries run in the background)."""
+    state = readiness.status()
+    return FastJSONResponse(state, status_code=200 if state["ready"] else 503)
+
+
+@app.get("/health/pool", include_in_schema=False, dependencies=[Security(require_admin_user)])
+def pool_health():
+    return pool_stats()
+
+
+@metrics.collector
+def _pool_metrics():
+    stats = pool_stats()
+    checkout = stats["checkout"]
+    lines = [
+        "# HELP db_pool_connections Primary pool connections by state.",
+        "# TYPE db_pool_connections gauge",
+    ]
+    for state in ("checked_out", "checked_in", "overflow"):
+        lines.append(f'db_pool_connections{{state="{state}"}} {stats[state]}')
+    lines += [
+        "# HELP db_pool_checkout_timeouts_total Checkouts that gave up waiting for a connection.",
+        "# TYPE db_pool_checkout_timeouts_total counter",
+        f"db_pool_checkout_timeouts_total {checkout['timeouts']}",
+        "# HELP db_pool_checkout_seconds Time spent waiting for a pooled connection.",
+        "# TYPE db_pool_checkout_seconds histogram",
+    ]
+    for bound, n in checkout["buckets"].items():
+        lines.append(f'db_pool_checkout_seconds_bucket{{le="{bound}"}} {n}')
+    lines += [
+        f'db_pool_checkout_seconds_bucket{{le="+Inf"}} {checkout["count"]}',
+        f"db_pool_checkout_seconds_sum {checkout['seconds_total']}",
+        f"db_pool_checkout_seconds_count {checkout['count']}",
+    ]
+    return lines
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class Case(Base):
     __tablename__ = "cases"
+    __table_args__ = (
+        # equality lookups only (seed dedup); hash keeps the index small for long texts
+        Index("ix_cases_problem_text_hash", "problem_text", postgresql_using="hash"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -11,9 +15,15 @@ class Case(Base):
     problem_text = Column(Text, nullable=False)
 
     # Simple metadata for filtering/boosting
-    scenario_type = Column(String(50), nullable=True)
+    scenario_type = Column(String(50), nullable=True, index=True)
+
+    # Derived from problem_text/scenario_type on write (cbr.derived_case_fields);
+    # NULL text_tokens means the row predates these columns (see scripts/backfill_case_fields.py)
+    scenario_norm = Column(String(50), nullable=True)
+    scenario_inferred = Column(String(50), nullable=True)
+    text_tokens = Column(Text, nullable=True)
 
     # Solution link
-    vaccine_id = Column(Integer, ForeignKey("vaccines.id", ondelete="RESTRICT"), nullable=False)
+    vaccine_id = Column(Integer, ForeignKey("vaccines.id", ondelete="RESTRICT"), nullable=False, index=True)
 
     vaccine = relationship("Vaccine")
\ No newline at end of file
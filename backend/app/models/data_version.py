@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+
+from app.db.base import Base
+
+
+class DataVersion(Base):
+    """Write counters ("catalog", "cbr") for deployments without a shared cache."""
+
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
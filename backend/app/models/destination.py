@@ -14,7 +14,7 @@ class Destination(Base):
     group_code = Column(String(50), nullable=True)
 
     # URL of the official PDF used
-    source_url = Column(String, nullable=True)
+    source_url = Column(String, nullable=True, index=True)
 
     vaccines = relationship(
         "DestinationVaccine",
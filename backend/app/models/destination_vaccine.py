@@ -13,10 +13,12 @@ class DestinationVaccine(Base):
         ForeignKey("destinations.id", ondelete="CASCADE"),
         primary_key=True,
     )
+    # the PK (destination_id, vaccine_id) does not cover lookups by vaccine alone
     vaccine_id = Column(
         Integer,
         ForeignKey("vaccines.id", ondelete="CASCADE"),
         primary_key=True,
+        index=True,
     )
 
     # "required" or "recommended"
@@ -1,21 +1,39 @@
+import hashlib
+import os
+
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.core.admission import admit, assessment_limiter
+from app.core.cache import get_cache
+from app.db.session import get_read_db
 from app.schemas.assessment import AssessmentIn, AssessmentOut, MatchOut
-from app.services.cbr import find_similar_cases
+from app.services.cbr import case_base_version, find_similar_cases
 
 router = APIRouter(prefix="/assessments", tags=["assessments"])
 
 TOP_K = 2  # keep results small & stable
 
+# Results are keyed by the case-base version, so case writes invalidate them.
+ASSESSMENT_CACHE_TTL = int(os.getenv("ASSESSMENT_CACHE_TTL", "600"))
+
+
+def _cache_key(payload: AssessmentIn) -> str:
+    raw = f"{case_base_version()}|{TOP_K}|{payload.scenario_type or ''}|{payload.problem_text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
 
-@router.post("", response_model=AssessmentOut)
-def assess(payload: AssessmentIn, db: Session = Depends(get_db)):
-    matches = find_similar_cases(
-        db=db,
-        query_text=payload.problem_text,
-        scenario_type=payload.scenario_type,
-        top_k=TOP_K,
+# admission runs before the DB session and threadpool worker are taken
+@router.post("", response_model=AssessmentOut, dependencies=[Depends(admit(assessment_limiter))])
+def assess(payload: AssessmentIn, db: Session = Depends(get_read_db)):
+    matches = get_cache("assessment").get_or_set(
+        _cache_key(payload),
+        lambda: find_similar_cases(
+            db=db,
+            query_text=payload.problem_text,
+            scenario_type=payload.scenario_type,
+            top_k=TOP_K,
+        ),
+        ttl=ASSESSMENT_CACHE_TTL,
     )
     return {"matches": [MatchOut(**m) for m in matches]}
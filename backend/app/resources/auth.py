@@ -1,21 +1,39 @@
 import os
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.core.security import authenticate_user_db, create_access_token
+from app.core.rate_limit import FixedWindowLimiter
+from app.core.security import authenticate_user_db_async, create_access_token, jwt_expire_minutes
 from app.db.session import get_db
 from app.schemas.auth import LoginRequest, TokenResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+LOGIN_WINDOW_SECONDS = int(os.getenv("LOGIN_WINDOW_SECONDS", "300"))
+username_limiter = FixedWindowLimiter(
+    "login-user", int(os.getenv("LOGIN_MAX_PER_USERNAME", "10")), LOGIN_WINDOW_SECONDS
+)
+ip_limiter = FixedWindowLimiter(
+    "login-ip", int(os.getenv("LOGIN_MAX_PER_IP", "30")), LOGIN_WINDOW_SECONDS
+)
+
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    role = authenticate_user_db(db, payload.username, payload.password)
+async def login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)):
+    # Throttle before hashing: rejected attempts cost no PBKDF2 work.
+    # The limiters talk to the cache (Redis when shared), so keep them off the event loop.
+    client_ip = request.client.host if request.client else "unknown"
+    username = payload.username.lower()
+    await run_in_threadpool(ip_limiter.check, client_ip, detail="Too many login attempts from this address")
+    await run_in_threadpool(username_limiter.check, username, detail="Too many login attempts for this account")
+
+    role = await authenticate_user_db_async(db, payload.username, payload.password)
     if not role:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    await run_in_threadpool(username_limiter.reset, username)
+
     jwt_token = create_access_token(subject=payload.username, role=role)
-    expires_in = int(os.getenv("JWT_EXPIRE_MINUTES", "240"))
-    return TokenResponse(access_token=jwt_token, token_type="bearer", expires_in_minutes=expires_in)
+    return TokenResponse(access_token=jwt_token, token_type="bearer", expires_in_minutes=jwt_expire_minutes())
@@ -0,0 +1,28 @@
+import os
+
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import etag_matches
+from app.db.session import get_async_read_db
+from app.services.bootstrap import get_snapshot
+
+router = APIRouter(prefix="/bootstrap", tags=["bootstrap"])
+
+# Browsers reuse the payload for BOOTSTRAP_MAX_AGE and may serve it stale while
+# revalidating; revalidation is a cheap If-None-Match -> 304.
+BOOTSTRAP_MAX_AGE = int(os.getenv("BOOTSTRAP_MAX_AGE", "3600"))
+BOOTSTRAP_STALE_WHILE_REVALIDATE = int(os.getenv("BOOTSTRAP_STALE_WHILE_REVALIDATE", "86400"))
+
+
+@router.get("")
+async def get_bootstrap(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """Destinations, vaccine catalog (with prices) and scenario codes in one cacheable payload."""
+    snap = await get_snapshot(db)
+    headers = {
+        "ETag": snap.etag,
+        "Cache-Control": f"public, max-age={BOOTSTRAP_MAX_AGE}, stale-while-revalidate={BOOTSTRAP_STALE_WHILE_REVALIDATE}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), snap.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snap.body, media_type="application/json", headers=headers)
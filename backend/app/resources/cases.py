@@ -1,13 +1,18 @@
 from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Security, status
-from sqlalchemy import or_
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Security, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.security import require_admin_user
-from app.db.session import get_db
+from app.db.session import get_async_read_db, get_db
 from app.models.case import Case
-from app.schemas.case import CaseCreate, CaseOut
+from app.schemas.case import CaseCompactionReport, CaseCreate, CaseImportReport, CaseOut
+from app.services import case_import, case_maintenance
+from app.services.cbr import bump_case_base_version, derived_case_fields
 
 router = APIRouter(prefix="/cases", tags=["cases"])
 
@@ -16,24 +21,24 @@ SortDir = Literal["asc", "desc"]
 
 
 @router.get("", response_model=list[CaseOut])
-def list_cases(
+async def list_cases(
     q: str | None = Query(default=None, description="Optional search term (matches problem_text)"),
     scenario_type: str | None = Query(default=None, description="Optional scenario filter"),
     vaccine_id: int | None = Query(default=None, ge=1, description="Optional vaccine_id filter"),
     sort_by: CaseSortBy = Query(default="id", description="Sort field"),
     sort_dir: SortDir = Query(default="desc", description="Sort direction"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    query = db.query(Case)
+    stmt = select(Case)
 
     if q:
-        query = query.filter(Case.problem_text.ilike(f"%{q}%"))
+        stmt = stmt.where(Case.problem_text.ilike(f"%{q}%"))
 
     if scenario_type:
-        query = query.filter(Case.scenario_type == scenario_type)
+        stmt = stmt.where(Case.scenario_type == scenario_type)
 
     if vaccine_id is not None:
-        query = query.filter(Case.vaccine_id == vaccine_id)
+        stmt = stmt.where(Case.vaccine_id == vaccine_id)
 
     sort_map = {
         "id": Case.id,
@@ -41,9 +46,9 @@ def list_cases(
         "vaccine_id": Case.vaccine_id,
     }
     col = sort_map[sort_by]
-    query = query.order_by(col.desc() if sort_dir == "desc" else col.asc())
+    stmt = stmt.order_by(col.desc() if sort_dir == "desc" else col.asc())
 
-    return query.all()
+    return (await db.scalars(stmt)).all()
 
 
 
@@ -54,13 +59,68 @@ def list_cases(
     dependencies=[Security(require_admin_user)],
 )
 def create_case(payload: CaseCreate, db: Session = Depends(get_db)):
-    c = Case(**payload.model_dump())
+    data = payload.model_dump()
+    c = Case(**data, **derived_case_fields(data["problem_text"], data["scenario_type"]))
     db.add(c)
     db.commit()
     db.refresh(c)
+    bump_case_base_version()
     return c
 
 
+@router.post(
+    "/import",
+    response_model=CaseImportReport,
+    dependencies=[Security(require_admin_user)],
+)
+async def import_cases(
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = Query(
+        default=None, description="Upload format; defaults to the request Content-Type"
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk-import cases from a CSV (header: problem_text,scenario_type,vaccine_id)
+    or NDJSON upload. The body is streamed, never buffered whole.
+    """
+    fmt = format or case_import.detect_format(request.headers.get("content-type"))
+    if fmt not in case_import.FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson (or pass ?format=csv|ndjson)",
+        )
+
+    chunks = request.stream().__aiter__()
+
+    async def next_chunk():
+        try:
+            return await chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    # parsing and inserts run in a worker thread that pulls body chunks from the event loop
+    def run():
+        lines = case_import.iter_lines(lambda: anyio.from_thread.run(next_chunk))
+        return case_import.import_cases(db, lines, fmt)
+
+    return await run_in_threadpool(run)
+
+
+@router.post(
+    "/maintenance/duplicates",
+    response_model=CaseCompactionReport,
+    dependencies=[Security(require_admin_user)],
+)
+def compact_cases(
+    threshold: float = Query(default=0.9, gt=0, le=1, description="Minimum retrieval similarity for a duplicate"),
+    merge: bool = Query(default=False, description="Delete redundant cases (keeps the lowest id of each group)"),
+    db: Session = Depends(get_db),
+):
+    """Near-duplicate groups per scenario_type/vaccine_id, with case-base size and latency before/after."""
+    return case_maintenance.compact_case_base(db, threshold=threshold, merge=merge)
+
+
 @router.delete(
     "/{case_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -72,4 +132,5 @@ def delete_case(case_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Case not found")
     db.delete(c)
     db.commit()
+    bump_case_base_version()
     return None
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import math
+import os
+import time
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.admission import scrape_limiter
+from app.core.cache import get_cache
+from app.core.circuit import CircuitOpenError
+from app.db.session import anote_write, async_session, get_async_read_db
 from app.models.destination import Destination
-from app.models.vaccine import Vaccine
 from app.models.destination_vaccine import DestinationVaccine
 
 from app.schemas.travel import (
@@ -16,11 +24,16 @@ from app.schemas.travel import (
     DestinationVaccineOut,
 )
 
-from app.services.travel_scraper import scrape_country_recommendations
+from app.services.catalog import catalog
+from app.services.travel_scraper import last_known_recommendations, scrape_country_recommendations
 
 
 router = APIRouter(prefix="/destinations", tags=["destinations"])
 
+SCRAPE_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL", str(6 * 3600)))
+# end-to-end budget for a cold (live-scrape) recommendations request
+SCRAPE_DEADLINE_SECONDS = float(os.getenv("SCRAPE_DEADLINE_SECONDS", "8"))
+
 
 def _map_scraped_key_to_ipt_vaccine_names(scraped_key: str) -> List[str]:
     """
@@ -43,34 +56,37 @@ def _map_scraped_key_to_ipt_vaccine_names(scraped_key: str) -> List[str]:
 
 
 @router.get("", response_model=List[DestinationOut])
-def list_destinations(
+async def list_destinations(
     q: Optional[str] = Query(default=None, description="Search by destination name"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    query = db.query(Destination)
+    stmt = select(Destination)
 
     if q:
-        query = query.filter(Destination.name.ilike(f"%{q}%"))
+        stmt = stmt.where(Destination.name.ilike(f"%{q}%"))
 
-    items = query.order_by(Destination.name).all()
+    items = (await db.scalars(stmt.order_by(Destination.name))).all()
     return [DestinationOut(id=d.id, name=d.name, group_code=d.group_code) for d in items]
 
 
 @router.get("/{destination_id}/recommendations", response_model=DestinationRecommendationsOut)
-def get_destination_recommendations(destination_id: int, db: Session = Depends(get_db)):
-    dest = db.query(Destination).filter(Destination.id == destination_id).first()
+async def get_destination_recommendations(
+    destination_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    dest = await db.get(Destination, destination_id)
     if not dest:
         raise HTTPException(status_code=404, detail="Destination not found")
 
     # ---------------------------
     # 1) Return cached (mapped) recommendations if present
     # ---------------------------
-    cached = (
-        db.query(DestinationVaccine, Vaccine)
-        .join(Vaccine, Vaccine.id == DestinationVaccine.vaccine_id)
-        .filter(DestinationVaccine.destination_id == dest.id)
-        .all()
-    )
+    cached = []
+    for link in await catalog.alinks_for_destination(db, dest.id):
+        v = await catalog.aget(db, link["vaccine_id"])
+        if v is not None:
+            cached.append((link, v))
 
     if cached:
         recs: List[DestinationVaccineOut] = []
@@ -81,8 +97,8 @@ def get_destination_recommendations(destination_id: int, db: Session = Depends(g
             recs.append(
                 DestinationVaccineOut(
                     vaccine_name=v.name,
-                    requirement_level=link.requirement_level,
-                    notes=link.notes,
+                    requirement_level=link["requirement_level"],
+                    notes=link["notes"],
                     available_in_ipt=True,
                     status=status,
                     price_tnd=price,
@@ -104,15 +120,41 @@ def get_destination_recommendations(destination_id: int, db: Session = Depends(g
     if not dest.source_url:
         raise HTTPException(status_code=400, detail="Destination has no source_url to scrape")
 
+    # the whole live path (queueing included) must finish within the deadline
+    deadline = time.monotonic() + SCRAPE_DEADLINE_SECONDS
     try:
-        scraped = scrape_country_recommendations(dest.source_url)
-    except Exception:
-        raise HTTPException(status_code=502, detail="Failed to fetch destination recommendations from source")
+        # shared across nodes; concurrent cold requests scrape the page only once
+        async with scrape_limiter.slot():
+            scraped = await run_in_threadpool(
+                get_cache("scrape").get_or_set,
+                dest.source_url,
+                lambda: scrape_country_recommendations(dest.source_url, deadline=deadline),
+                ttl=SCRAPE_CACHE_TTL,
+                # waiting on another request's scrape counts against our deadline too
+                lock_timeout=max(0.0, deadline - time.monotonic()),
+            )
+    except HTTPException:
+        raise  # shed by admission control
+    except Exception as e:
+        # Pasteur.fr slow or down: serve the last good scrape if we ever had one
+        scraped = await run_in_threadpool(last_known_recommendations, dest.source_url)
+        if scraped is None:
+            if isinstance(e, CircuitOpenError):
+                raise HTTPException(
+                    status_code=503,
+                    detail="Destination recommendations source is unavailable, retry later",
+                    headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+                )
+            if isinstance(e, TimeoutError):
+                raise HTTPException(status_code=504, detail="Timed out fetching destination recommendations from source")
+            raise HTTPException(status_code=502, detail="Failed to fetch destination recommendations from source")
 
     last_updated = scraped.get("last_updated")
     items = scraped.get("items", []) or []
 
     created: List[DestinationVaccineOut] = []
+    linked = {link["vaccine_id"] for link in await catalog.alinks_for_destination(db, dest.id)}
+    new_links: List[DestinationVaccine] = []
 
     for it in items:
         key = (it.get("key") or "").strip()
@@ -139,7 +181,7 @@ def get_destination_recommendations(destination_id: int, db: Session = Depends(g
 
         # If mapped -> return each mapped IPT vaccine; cache only mapped items
         for ipt_vaccine_name in ipt_names:
-            v = db.query(Vaccine).filter(Vaccine.name == ipt_vaccine_name).first()
+            v = await catalog.aget_by_name(db, ipt_vaccine_name)
 
             # Mapped but missing in DB => show unavailable (should be rare if seed is correct)
             if not v:
@@ -158,25 +200,16 @@ def get_destination_recommendations(destination_id: int, db: Session = Depends(g
                 continue
 
             # Cache the mapped link
-            exists = (
-                db.query(DestinationVaccine)
-                .filter(
-                    DestinationVaccine.destination_id == dest.id,
-                    DestinationVaccine.vaccine_id == v.id,
-                )
-                .first()
-            )
-            if not exists:
-                db.add(
-                    DestinationVaccine(
-                        destination_id=dest.id,
-                        vaccine_id=v.id,
-                        requirement_level=requirement_level,
-                        notes="Mapped from Pasteur.fr; priced locally using Institut Pasteur de Tunis official price list.",
-                        source_url=dest.source_url,
-                    )
+            if v.id not in linked:
+                link = DestinationVaccine(
+                    destination_id=dest.id,
+                    vaccine_id=v.id,
+                    requirement_level=requirement_level,
+                    notes="Mapped from Pasteur.fr; priced locally using Institut Pasteur de Tunis official price list.",
+                    source_url=dest.source_url,
                 )
-                db.commit()
+                new_links.append(link)
+                linked.add(v.id)
 
             price = float(v.price_tnd) if v.price_tnd is not None else None
             status = "available" if price is not None else "unknown"
@@ -194,6 +227,25 @@ def get_destination_recommendations(destination_id: int, db: Session = Depends(g
                 )
             )
 
+    if new_links:
+        fresh = [
+            (link.destination_id, link.vaccine_id, link.requirement_level, link.notes, link.source_url)
+            for link in new_links
+        ]
+        # link writes always go to the primary (db may be a replica session)
+        async with async_session() as wdb:
+            wdb.add_all(new_links)
+            try:
+                await wdb.commit()
+            except IntegrityError:
+                # another worker cached the same links first
+                await wdb.rollback()
+                await catalog.arefresh(wdb)
+            else:
+                await anote_write(request)
+                for args in fresh:
+                    await catalog.aadd_link(*args)
+
     return DestinationRecommendationsOut(
         destination=DestinationOut(id=dest.id, name=dest.name, group_code=dest.group_code),
         recommendations=created,
@@ -0,0 +1,86 @@
+import os
+import zlib
+from typing import Iterator
+
+from fastapi import APIRouter, Query, Security
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.core.responses import dumps
+from app.core.security import require_admin_user
+from app.db.session import ReadSessionLocal
+from app.models.case import Case
+from app.models.destination_vaccine import DestinationVaccine
+from app.models.vaccine import Vaccine
+
+router = APIRouter(prefix="/exports", tags=["exports"], dependencies=[Security(require_admin_user)])
+
+# Rows fetched per server-side cursor round trip; also the unit written per chunk.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+NDJSON = "application/x-ndjson"
+
+
+def _ndjson(stmt) -> Iterator[bytes]:
+    # The generator owns its session: request-scoped dependencies are closed
+    # before a streaming body is sent.
+    with ReadSessionLocal() as db:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for part in result.mappings().partitions():
+            yield b"".join(dumps(dict(row)) + b"\n" for row in part)
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    z = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def _export(stmt, name: str, gzip: bool) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{name}.ndjson"'}
+    body = _ndjson(stmt)
+    if gzip:
+        # we set Content-Encoding ourselves, so CompressionMiddleware leaves it alone
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+        body = _gzip(body)
+    return StreamingResponse(body, media_type=NDJSON, headers=headers)
+
+
+_GZIP = Query(default=False, description="gzip the stream (Content-Encoding: gzip)")
+
+
+@router.get("/cases")
+def export_cases(gzip: bool = _GZIP):
+    stmt = select(Case.id, Case.problem_text, Case.scenario_type, Case.vaccine_id).order_by(Case.id)
+    return _export(stmt, "cases", gzip)
+
+
+@router.get("/vaccines")
+def export_vaccines(gzip: bool = _GZIP):
+    stmt = select(
+        Vaccine.id,
+        Vaccine.name,
+        Vaccine.description,
+        Vaccine.price_tnd,
+        Vaccine.currency,
+        Vaccine.price_source_url,
+        Vaccine.price_updated_at,
+    ).order_by(Vaccine.id)
+    return _export(stmt, "vaccines", gzip)
+
+
+@router.get("/destination-links")
+def export_destination_links(gzip: bool = _GZIP):
+    stmt = select(
+        DestinationVaccine.destination_id,
+        DestinationVaccine.vaccine_id,
+        DestinationVaccine.requirement_level,
+        DestinationVaccine.notes,
+        DestinationVaccine.source_url,
+        DestinationVaccine.created_at,
+    ).order_by(DestinationVaccine.destination_id, DestinationVaccine.vaccine_id)
+    return _export(stmt, "destination_links", gzip)
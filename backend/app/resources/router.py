@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.resources import assessments, vaccines, cases, destinations
+from app.resources import assessments, vaccines, cases, destinations, exports, bootstrap
 
 router = APIRouter(prefix="/resources")
 
@@ -7,3 +7,5 @@ router.include_router(assessments.router)
 router.include_router(vaccines.router)
 router.include_router(cases.router)
 router.include_router(destinations.router)
+router.include_router(exports.router)
+router.include_router(bootstrap.router)
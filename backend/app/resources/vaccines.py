@@ -1,13 +1,17 @@
 from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Security, status
-from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.security import require_admin_user
-from app.db.session import get_db
+from app.db.session import get_async_read_db, get_db
+from app.models.destination import Destination
 from app.models.vaccine import Vaccine
+from app.schemas.travel import VaccineDestinationOut, VaccineDestinationsOut
 from app.schemas.vaccine import VaccineCreate, VaccineOut
+from app.services.catalog import catalog
 
 from app.models.case import Case
 from app.models.destination_vaccine import DestinationVaccine
@@ -20,33 +24,90 @@ SortDir = Literal["asc", "desc"]
 
 
 @router.get("", response_model=list[VaccineOut])
-def list_vaccines(
+async def list_vaccines(
     q: str | None = Query(default=None, description="Optional search term (matches name or description)"),
     min_price_tnd: float | None = Query(default=None, ge=0, description="Optional minimum price in TND"),
     max_price_tnd: float | None = Query(default=None, ge=0, description="Optional maximum price in TND"),
     sort_by: VaccineSortBy = Query(default="name", description="Sort field"),
     sort_dir: SortDir = Query(default="asc", description="Sort direction"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    query = db.query(Vaccine)
+    items = await catalog.aall(db)
 
     if q:
-        like = f"%{q}%"
-        query = query.filter(or_(Vaccine.name.ilike(like), Vaccine.description.ilike(like)))
+        needle = q.lower()
+        items = [
+            v for v in items
+            if needle in v.name.lower() or (v.description is not None and needle in v.description.lower())
+        ]
 
     if min_price_tnd is not None:
-        query = query.filter(Vaccine.price_tnd.is_not(None), Vaccine.price_tnd >= min_price_tnd)
+        items = [v for v in items if v.price_tnd is not None and v.price_tnd >= min_price_tnd]
 
     if max_price_tnd is not None:
-        query = query.filter(Vaccine.price_tnd.is_not(None), Vaccine.price_tnd <= max_price_tnd)
+        items = [v for v in items if v.price_tnd is not None and v.price_tnd <= max_price_tnd]
 
-    sort_map = {"id": Vaccine.id, "name": Vaccine.name, "price_tnd": Vaccine.price_tnd}
-    col = sort_map[sort_by]
-    query = query.order_by(col.desc() if sort_dir == "desc" else col.asc())
+    # Same ordering as Postgres: NULL prices sort last ascending, first descending.
+    descending = sort_dir == "desc"
+    if sort_by == "price_tnd":
+        key = lambda v: (v.price_tnd is None, v.price_tnd or 0.0)
+    else:
+        key = lambda v: getattr(v, sort_by)
+    return sorted(items, key=key, reverse=descending)
 
-    return query.all()
 
 
+@router.get("/{vaccine_id}/destinations", response_model=VaccineDestinationsOut)
+async def list_vaccine_destinations(
+    vaccine_id: int,
+    requirement_level: str | None = Query(default=None, description='Optional filter, e.g. "required"'),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Destinations that require or recommend this vaccine (from the catalog's reverse index)."""
+    v = await catalog.aget(db, vaccine_id)
+    if v is None:
+        raise HTTPException(status_code=404, detail="Vaccine not found")
+
+    links = await catalog.alinks_for_vaccine(db, vaccine_id)
+    if requirement_level:
+        level = requirement_level.strip().lower()
+        links = [link for link in links if link["requirement_level"] == level]
+
+    destinations = []
+    if links:
+        rows = await db.execute(
+            select(Destination.id, Destination.name, Destination.group_code).where(
+                Destination.id.in_([link["destination_id"] for link in links])
+            )
+        )
+        by_id = {d.id: d for d in rows}
+        destinations = sorted(
+            (
+                VaccineDestinationOut(
+                    id=link["destination_id"],
+                    name=by_id[link["destination_id"]].name,
+                    group_code=by_id[link["destination_id"]].group_code,
+                    requirement_level=link["requirement_level"],
+                    notes=link["notes"],
+                )
+                for link in links
+                if link["destination_id"] in by_id
+            ),
+            key=lambda d: d.name,
+        )
+
+    counts: dict[str, int] = {}
+    for d in destinations:
+        counts[d.requirement_level] = counts.get(d.requirement_level, 0) + 1
+
+    return VaccineDestinationsOut(
+        vaccine_id=v.id,
+        vaccine_name=v.name,
+        counts=counts,
+        total=len(destinations),
+        destinations=destinations,
+    )
+
 
 @router.post(
     "",
@@ -63,6 +124,7 @@ def create_vaccine(payload: VaccineCreate, db: Session = Depends(get_db)):
     db.add(v)
     db.commit()
     db.refresh(v)
+    catalog.refresh(db)
     return v
 
 @router.delete(
@@ -89,5 +151,6 @@ def delete_vaccine(vaccine_id: int, db: Session = Depends(get_db)):
 
     db.delete(v)
     db.commit()
+    catalog.refresh(db)
     return
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class CaseCreate(BaseModel):
     problem_text: str = Field(min_length=5)
@@ -13,4 +13,39 @@ class CaseOut(BaseModel):
     vaccine_id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CaseImportError(BaseModel):
+    row: int
+    error: str
+
+class CaseImportReport(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[CaseImportError]
+    errors_truncated: bool = False
+
+class DuplicateGroup(BaseModel):
+    keep_id: int
+    duplicate_ids: List[int]
+    min_similarity: float
+
+class DuplicateBlock(BaseModel):
+    scenario_type: Optional[str]
+    vaccine_id: int
+    cases: int
+    groups: List[DuplicateGroup]
+
+class CaseBaseStats(BaseModel):
+    cases: int
+    assessment_p50_ms: Optional[float]
+    assessment_max_ms: Optional[float]
+
+class CaseCompactionReport(BaseModel):
+    threshold: float
+    merged: bool
+    redundant_cases: int
+    blocks: List[DuplicateBlock]
+    before: CaseBaseStats
+    after: Optional[CaseBaseStats]
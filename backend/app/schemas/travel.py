@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel
 
 
@@ -27,3 +27,17 @@ class DestinationRecommendationsOut(BaseModel):
     recommendations: List[DestinationVaccineOut]
     source_url: Optional[str] = None
     last_updated: Optional[str] = None
+
+
+class VaccineDestinationOut(DestinationOut):
+    requirement_level: str
+    notes: Optional[str] = None
+
+
+class VaccineDestinationsOut(BaseModel):
+    vaccine_id: int
+    vaccine_name: str
+    # destinations per requirement_level, over the returned (filtered) list
+    counts: Dict[str, int]
+    total: int
+    destinations: List[VaccineDestinationOut]
@@ -0,0 +1,80 @@
+"""
+Precomputed bootstrap payload for the frontend's first paint.
+
+One JSON document with the destination list, the vaccine catalog (with
+prices) and the supported scenario codes, serialized once and reused until
+the catalog version moves or BOOTSTRAP_REBUILD_SECONDS pass (destinations are
+only written by seed jobs, so a time bound is enough for them).
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import dumps
+from app.models.destination import Destination
+from app.services.catalog import catalog
+from app.services.cbr import KEYWORDS, SCENARIO_MAP
+
+BOOTSTRAP_REBUILD_SECONDS = float(os.getenv("BOOTSTRAP_REBUILD_SECONDS", "300"))
+
+
+class Snapshot:
+    def __init__(self, body: bytes, catalog_version: Optional[int]):
+        self.body = body
+        # weak: the same tag is served on identity, gzip and br bodies
+        self.etag = 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.catalog_version = catalog_version
+        self.built_at = time.monotonic()
+
+
+_snapshot: Optional[Snapshot] = None
+_lock = asyncio.Lock()
+
+
+async def _build(db: AsyncSession) -> Snapshot:
+    vaccines = sorted(await catalog.aall(db), key=lambda v: v.name)
+    rows = (await db.execute(select(Destination.id, Destination.name).order_by(Destination.name))).all()
+    payload = {
+        "destinations": [{"id": d.id, "name": d.name} for d in rows],
+        "vaccines": [
+            {
+                "id": v.id,
+                "name": v.name,
+                "description": v.description,
+                "price_tnd": v.price_tnd,
+                "currency": v.currency,
+            }
+            for v in vaccines
+        ],
+        "scenarios": {
+            "codes": list(KEYWORDS),
+            "aliases": SCENARIO_MAP,
+        },
+    }
+    return Snapshot(dumps(payload), catalog.version)
+
+
+def _current(snap: Optional[Snapshot]) -> bool:
+    return (
+        snap is not None
+        and snap.catalog_version == catalog.version
+        and time.monotonic() - snap.built_at < BOOTSTRAP_REBUILD_SECONDS
+    )
+
+
+async def get_snapshot(db: AsyncSession) -> Snapshot:
+    global _snapshot
+    await catalog.aall(db)  # picks up catalog writes from other workers
+    if _current(_snapshot):
+        return _snapshot
+    async with _lock:
+        if not _current(_snapshot):
+            _snapshot = await _build(db)
+        return _snapshot
@@ -0,0 +1,154 @@
+"""
+Bulk case import from a streamed CSV or NDJSON upload.
+
+Rows are parsed as they arrive, validated against CaseCreate, and inserted in
+batches inside a single transaction; the case base version is bumped (and the
+CBR index rebuilt) once, after the commit.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+import os
+from typing import Callable, Iterator, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.case import Case
+from app.models.vaccine import Vaccine
+from app.schemas.case import CaseCreate
+from app.services.cbr import bump_case_base_version, derived_case_fields, rebuild_case_index
+
+IMPORT_BATCH_SIZE = int(os.getenv("CASE_IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("CASE_IMPORT_MAX_ERRORS", "1000"))  # per-row errors echoed back
+
+FORMATS = ("csv", "ndjson")
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    ct = (content_type or "").split(";")[0].strip().lower()
+    if ct in ("text/csv", "application/csv"):
+        return "csv"
+    if ct in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"):
+        return "ndjson"
+    return None
+
+
+def iter_lines(next_chunk: Callable[[], Optional[bytes]]) -> Iterator[str]:
+    """
+    Decode a chunked UTF-8 body into lines (line endings kept, for csv).
+
+    Lines end at "\n" only: str.splitlines() would also split on U+2028,
+    form feeds and the like, which are legal inside a JSON string.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending: List[str] = []  # start of a line spread over several chunks
+    while True:
+        chunk = next_chunk()
+        if chunk is None:
+            break
+        lines = decoder.decode(chunk).split("\n")
+        if len(lines) == 1:
+            pending.append(lines[0])
+            continue
+        lines[0] = "".join(pending) + lines[0]
+        pending = [lines.pop()]
+        for line in lines:
+            yield line + "\n"
+    tail = "".join(pending) + decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _csv_rows(lines: Iterator[str]) -> Iterator[tuple]:
+    reader = csv.DictReader(lines)
+    for row in reader:
+        # blank cells mean "not given", so optional fields fall back to their defaults
+        yield reader.line_num, {k: v for k, v in row.items() if k and v not in (None, "")}
+
+
+def _ndjson_rows(lines: Iterator[str]) -> Iterator[tuple]:
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except ValueError as e:
+            yield line_num, e
+
+
+def _error_text(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors())
+    return str(e)
+
+
+class _Report:
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda e: e["row"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _flush(db: Session, batch: List[tuple], report: _Report) -> None:
+    """Resolve the batch's vaccine ids with one query, then insert the valid rows."""
+    ids = {case.vaccine_id for _, case in batch}
+    known = set(db.scalars(select(Vaccine.id).where(Vaccine.id.in_(ids))))
+    values = []
+    for row, case in batch:
+        if case.vaccine_id not in known:
+            report.error(row, f"vaccine_id: unknown vaccine {case.vaccine_id}")
+        else:
+            values.append({**case.model_dump(), **derived_case_fields(case.problem_text, case.scenario_type)})
+    if values:
+        db.execute(insert(Case), values)
+        report.inserted += len(values)
+    batch.clear()
+
+
+def import_cases(db: Session, lines: Iterator[str], fmt: str) -> dict:
+    """Validate and insert every row; invalid rows are reported, not fatal."""
+    report = _Report()
+    rows = _csv_rows(lines) if fmt == "csv" else _ndjson_rows(lines)
+    batch: List[tuple] = []
+    try:
+        for row, data in rows:
+            report.received += 1
+            if isinstance(data, Exception):
+                report.error(row, f"invalid JSON: {data}")
+                continue
+            try:
+                batch.append((row, CaseCreate.model_validate(data)))
+            except ValidationError as e:
+                report.error(row, _error_text(e))
+                continue
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _flush(db, batch, report)
+        if batch:
+            _flush(db, batch, report)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if report.inserted:
+        rebuild_case_index(db, bump_case_base_version())
+    return report.as_dict()
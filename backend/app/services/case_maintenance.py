@@ -0,0 +1,205 @@
+"""
+Case-base maintenance: near-duplicate detection and compaction.
+
+Cases are first blocked by (scenario, vaccine_id): only cases that would
+recommend the same vaccine for the same scenario can be redundant. Inside a
+block, texts are embedded with the same TF-IDF models used for retrieval and
+candidate pairs come from random-hyperplane LSH (bands of sign bits), so no
+all-pairs comparison is needed; small blocks are compared exactly. Candidates
+are verified with the true cosine and merged into groups with union-find.
+
+Groups are transitive on purpose (single linkage): if A~B and B~C pass the
+threshold, A, B and C form one group and C is deleted even when cos(A, C)
+is below it. Near-duplicates usually come as rewordings of one case, and
+pairwise-only grouping would keep a member of every chain. Each group's
+min_similarity is its weakest verified link, so a low value flags a long
+chain to review before merging.
+
+Merging keeps the lowest id of each group and deletes the rest.
+"""
+from __future__ import annotations
+
+import os
+import random
+import statistics
+import time
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.models.case import Case
+from app.services.cbr import (
+    bump_case_base_version,
+    char_vectorizer,
+    find_similar_cases,
+    rebuild_case_index,
+    tokenize,
+    word_vectorizer,
+)
+
+# Blocks up to this size are compared exactly (one sparse product).
+DEDUP_EXACT_BLOCK_SIZE = int(os.getenv("DEDUP_EXACT_BLOCK_SIZE", "300"))
+DEDUP_LSH_BANDS = int(os.getenv("DEDUP_LSH_BANDS", "16"))
+DEDUP_LSH_ROWS = int(os.getenv("DEDUP_LSH_ROWS", "8"))
+# Buckets bigger than this are compared against a pivot instead of pairwise.
+DEDUP_MAX_BUCKET = int(os.getenv("DEDUP_MAX_BUCKET", "500"))
+DEDUP_LATENCY_SAMPLES = int(os.getenv("DEDUP_LATENCY_SAMPLES", "20"))
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _embed(texts: List[str], tokens: List[str]):
+    from scipy.sparse import hstack
+
+    # Same word/char models and weights as retrieval. Both blocks are
+    # L2-normalized, so a dot product of the scaled concatenation equals
+    # 0.75 * word cosine + 0.25 * char cosine, i.e. the retrieval score.
+    try:
+        word_mat = word_vectorizer().fit_transform(tokens)
+    except ValueError:
+        return None  # nothing but stop words
+    return hstack([word_mat * 0.75**0.5, char_vectorizer().fit_transform(texts) * 0.25**0.5]).tocsr()
+
+
+def _exact_pairs(mat, threshold: float) -> List[Tuple[int, int, float]]:
+    sims = (mat @ mat.T).tocoo()
+    return [(i, j, float(s)) for i, j, s in zip(sims.row, sims.col, sims.data) if i < j and s >= threshold]
+
+
+def _lsh_pairs(mat, threshold: float, seed: int) -> List[Tuple[int, int, float]]:
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    planes = rng.standard_normal((mat.shape[1], DEDUP_LSH_BANDS * DEDUP_LSH_ROWS)).astype(np.float32)
+    bits = np.asarray(mat @ planes) > 0
+
+    candidates = set()
+    for b in range(DEDUP_LSH_BANDS):
+        keys = np.packbits(bits[:, b * DEDUP_LSH_ROWS : (b + 1) * DEDUP_LSH_ROWS], axis=1)
+        buckets: Dict[bytes, List[int]] = defaultdict(list)
+        for i, key in enumerate(keys):
+            buckets[key.tobytes()].append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) <= DEDUP_MAX_BUCKET:
+                candidates.update(combinations(members, 2))
+            else:
+                candidates.update((members[0], m) for m in members[1:])
+
+    pairs = []
+    for i, j in candidates:
+        s = float(mat[i].multiply(mat[j]).sum())
+        if s >= threshold:
+            pairs.append((i, j, s))
+    return pairs
+
+
+def _block_groups(ids: List[int], texts: List[str], tokens: List[str], threshold: float, seed: int) -> List[dict]:
+    mat = _embed(texts, tokens)
+    if mat is None:
+        return []
+    if len(ids) <= DEDUP_EXACT_BLOCK_SIZE:
+        pairs = _exact_pairs(mat, threshold)
+    else:
+        pairs = _lsh_pairs(mat, threshold, seed)
+
+    uf = _UnionFind(len(ids))
+    min_sim: Dict[int, float] = {}
+    for i, j, s in pairs:
+        uf.union(i, j)
+    for i, j, s in pairs:
+        root = uf.find(i)
+        min_sim[root] = min(min_sim.get(root, 1.0), s)
+
+    members: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(ids)):
+        members[uf.find(i)].append(ids[i])
+    groups = []
+    for root, group in members.items():
+        if len(group) > 1:
+            group.sort()
+            groups.append(
+                {"keep_id": group[0], "duplicate_ids": group[1:], "min_similarity": round(min_sim.get(root, 1.0), 4)}
+            )
+    return sorted(groups, key=lambda g: g["keep_id"])
+
+
+def find_duplicate_groups(db: Session, threshold: float = 0.9, seed: int = 0) -> List[dict]:
+    """Redundant groups per (scenario_type, vaccine_id) block."""
+    blocks: Dict[Tuple[str, int], List[Tuple[int, str, str]]] = defaultdict(list)
+    rows = db.query(Case.id, Case.problem_text, Case.text_tokens, Case.scenario_type, Case.vaccine_id)
+    for cid, text, tokens, scenario, vaccine_id in rows:
+        if tokens is None:
+            tokens = tokenize(text)
+        blocks[((scenario or "").strip().lower(), vaccine_id)].append((cid, text, tokens))
+
+    report = []
+    for (scenario, vaccine_id), rows in sorted(blocks.items()):
+        if len(rows) < 2:
+            continue
+        ids, texts, tokens = zip(*rows)
+        groups = _block_groups(list(ids), list(texts), list(tokens), threshold, seed)
+        if groups:
+            report.append({"scenario_type": scenario or None, "vaccine_id": vaccine_id, "cases": len(rows), "groups": groups})
+    return report
+
+
+def measure_case_base(db: Session, samples: int = DEDUP_LATENCY_SAMPLES, seed: int = 0) -> dict:
+    """Case-base size and find_similar_cases latency over a sample of stored texts."""
+    rows = db.query(Case.problem_text, Case.scenario_type).all()
+    out = {"cases": len(rows), "assessment_p50_ms": None, "assessment_max_ms": None}
+    if not rows:
+        return out
+
+    sample = random.Random(seed).sample(rows, min(samples, len(rows)))
+    find_similar_cases(db, sample[0][0], sample[0][1], top_k=2)  # index build is not part of the latency
+    timings = []
+    for text, scenario in sample:
+        t0 = time.perf_counter()
+        find_similar_cases(db, text, scenario, top_k=2)
+        timings.append((time.perf_counter() - t0) * 1000)
+    out["assessment_p50_ms"] = round(statistics.median(timings), 3)
+    out["assessment_max_ms"] = round(max(timings), 3)
+    return out
+
+
+def compact_case_base(db: Session, threshold: float = 0.9, merge: bool = False, seed: int = 0) -> dict:
+    """Report near-duplicate groups; with merge=True delete the redundant cases in one transaction."""
+    before = measure_case_base(db, seed=seed)
+    blocks = find_duplicate_groups(db, threshold=threshold, seed=seed)
+    redundant = [cid for b in blocks for g in b["groups"] for cid in g["duplicate_ids"]]
+
+    after: Optional[dict] = None
+    if merge and redundant:
+        for i in range(0, len(redundant), 1000):
+            db.execute(delete(Case).where(Case.id.in_(redundant[i : i + 1000])))
+        db.commit()
+        rebuild_case_index(db, bump_case_base_version())
+        after = measure_case_base(db, seed=seed)
+
+    return {
+        "threshold": threshold,
+        "merged": bool(merge and redundant),
+        "redundant_cases": len(redundant),
+        "blocks": blocks,
+        "before": before,
+        "after": after,
+    }
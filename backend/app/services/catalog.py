@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.db.session import DATABASE_READ_URL, SessionLocal
+from app.models.destination_vaccine import DestinationVaccine
+from app.models.vaccine import Vaccine
+from app.schemas.vaccine import VaccineOut
+from app.services.data_version import catalog_version
+
+
+# How often a worker checks the shared catalog version for writes made on other nodes.
+CATALOG_VERSION_CHECK_SECONDS = float(os.getenv("CATALOG_VERSION_CHECK_SECONDS", "5"))
+
+
+class _Snapshot:
+    def __init__(self, vaccines: List[VaccineOut], links: List[dict], version: int):
+        self.version = version
+        self.by_id: Dict[int, VaccineOut] = {v.id: v for v in vaccines}
+        self.by_name: Dict[str, VaccineOut] = {v.name: v for v in vaccines}
+        self.links: Dict[int, List[dict]] = {}
+        # reverse index: vaccine -> links of every destination that lists it
+        self.by_vaccine: Dict[int, List[dict]] = {}
+        for link in links:
+            self.links.setdefault(link["destination_id"], []).append(link)
+            self.by_vaccine.setdefault(link["vaccine_id"], []).append(link)
+
+
+def _link_dict(link: DestinationVaccine) -> dict:
+    return {
+        "destination_id": link.destination_id,
+        "vaccine_id": link.vaccine_id,
+        "requirement_level": link.requirement_level,
+        "notes": link.notes,
+        "source_url": link.source_url,
+    }
+
+
+class VaccineCatalog:
+    """
+    Read-through, in-process cache of the vaccine catalog.
+
+    Holds id -> vaccine, name -> vaccine, destination -> links and
+    vaccine -> links maps.
+    The first read loads everything with the caller's session; writers call
+    refresh()/invalidate() (or add_link() for a single new link) after commit.
+    Writes bump a version (see app.services.data_version) so other
+    workers/nodes and scripts' writes are picked up within
+    CATALOG_VERSION_CHECK_SECONDS.
+
+    Entries are detached VaccineOut snapshots, so they are safe to share
+    between requests and threads.
+
+    The async API never blocks the event loop: shared-cache calls run in the
+    threadpool, and concurrent cold reads on a loop wait on an asyncio.Lock
+    (the threading lock is only used by sync callers, which run in threads).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snap: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        # one asyncio.Lock per event loop (asyncio locks are bound to a loop)
+        self._aload_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    # -------- loading --------
+
+    @staticmethod
+    def _shared_version() -> int:
+        return catalog_version.get()
+
+    @staticmethod
+    def _bump_shared_version() -> int:
+        return catalog_version.bump()
+
+    def _load(self, db: Session, version: int) -> _Snapshot:
+        vaccines = [VaccineOut.model_validate(v) for v in db.query(Vaccine).all()]
+        links = [_link_dict(link) for link in db.query(DestinationVaccine).all()]
+        return _Snapshot(vaccines, links, version)
+
+    def _check_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= CATALOG_VERSION_CHECK_SECONDS
+
+    def _stale(self, snap: _Snapshot) -> bool:
+        if not self._check_due():
+            return False
+        self._checked_at = time.monotonic()
+        return self._shared_version() != snap.version
+
+    def _fresh(self) -> Optional[_Snapshot]:
+        snap = self._snap
+        if snap is not None and not self._stale(snap):
+            return snap
+        return None
+
+    def _reload(self, db: Session, seen: Optional[_Snapshot]) -> _Snapshot:
+        with self._lock:
+            if self._snap is None or self._snap is seen:
+                self._snap = self._load(db, self._shared_version())
+                self._checked_at = time.monotonic()
+            return self._snap
+
+    def _reload_from_primary(self, seen: Optional[_Snapshot]) -> _Snapshot:
+        # A lagging replica could pin a stale snapshot under the new version,
+        # so with a replica configured the catalog always loads from the primary.
+        with SessionLocal() as db:
+            return self._reload(db, seen)
+
+    def _get(self, db: Session) -> _Snapshot:
+        snap = self._fresh()
+        if snap is not None:
+            return snap
+        if DATABASE_READ_URL:
+            return self._reload_from_primary(self._snap)
+        return self._reload(db, self._snap)
+
+    def refresh(self, db: Session) -> None:
+        """Reload after a committed write and tell other workers to do the same."""
+        version = self._bump_shared_version()
+        snap = self._load(db, version)
+        with self._lock:
+            self._snap = snap
+
+    def invalidate(self) -> None:
+        self._bump_shared_version()
+        with self._lock:
+            self._snap = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._snap is not None
+
+    @property
+    def version(self) -> Optional[int]:
+        """Version of the current snapshot (None until loaded)."""
+        snap = self._snap
+        return snap.version if snap is not None else None
+
+    # -------- reads --------
+
+    def all(self, db: Session) -> List[VaccineOut]:
+        return list(self._get(db).by_id.values())
+
+    def get(self, db: Session, vaccine_id: int) -> Optional[VaccineOut]:
+        return self._get(db).by_id.get(vaccine_id)
+
+    def vaccine_ids(self, db: Session) -> Tuple[int, AbstractSet[int]]:
+        """Version and vaccine ids of one snapshot, for callers that cache per catalog version."""
+        snap = self._get(db)
+        return snap.version, snap.by_id.keys()
+
+    def get_by_name(self, db: Session, name: str) -> Optional[VaccineOut]:
+        return self._get(db).by_name.get(name)
+
+    def links_for_destination(self, db: Session, destination_id: int) -> List[dict]:
+        return list(self._get(db).links.get(destination_id, []))
+
+    def links_for_vaccine(self, db: Session, vaccine_id: int) -> List[dict]:
+        return list(self._get(db).by_vaccine.get(vaccine_id, []))
+
+    # -------- async reads (the snapshot is loaded through run_sync) --------
+
+    def _aload_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._aload_locks.get(loop)
+        if lock is None:
+            lock = self._aload_locks[loop] = asyncio.Lock()
+        return lock
+
+    async def _aget(self, db: AsyncSession) -> _Snapshot:
+        snap = self._snap
+        if snap is not None:
+            # the version check talks to the shared cache (Redis): keep it off the loop
+            if not self._check_due() or not await run_in_threadpool(self._stale, snap):
+                return snap
+        async with self._aload_lock():
+            if self._snap is not None and self._snap is not snap:
+                return self._snap  # loaded while we waited
+            version = await run_in_threadpool(self._shared_version)
+            if DATABASE_READ_URL:
+                new = await run_in_threadpool(self._load_from_primary, version)
+            else:
+                new = await db.run_sync(self._load, version)
+            self._snap = new
+            self._checked_at = time.monotonic()
+            return new
+
+    def _load_from_primary(self, version: int) -> _Snapshot:
+        with SessionLocal() as db:
+            return self._load(db, version)
+
+    async def aall(self, db: AsyncSession) -> List[VaccineOut]:
+        return list((await self._aget(db)).by_id.values())
+
+    async def aget(self, db: AsyncSession, vaccine_id: int) -> Optional[VaccineOut]:
+        return (await self._aget(db)).by_id.get(vaccine_id)
+
+    async def aget_by_name(self, db: AsyncSession, name: str) -> Optional[VaccineOut]:
+        return (await self._aget(db)).by_name.get(name)
+
+    async def alinks_for_destination(self, db: AsyncSession, destination_id: int) -> List[dict]:
+        return list((await self._aget(db)).links.get(destination_id, []))
+
+    async def alinks_for_vaccine(self, db: AsyncSession, vaccine_id: int) -> List[dict]:
+        return list((await self._aget(db)).by_vaccine.get(vaccine_id, []))
+
+    # -------- async writes --------
+
+    async def arefresh(self, db: AsyncSession) -> None:
+        version = await run_in_threadpool(self._bump_shared_version)
+        self._snap = await db.run_sync(self._load, version)
+
+    async def aadd_link(self, *args, **kwargs) -> None:
+        await run_in_threadpool(self.add_link, *args, **kwargs)
+
+    # -------- incremental writes --------
+
+    def add_link(
+        self,
+        destination_id: int,
+        vaccine_id: int,
+        requirement_level: str,
+        notes: Optional[str] = None,
+        source_url: Optional[str] = None,
+    ) -> None:
+        """Record a freshly committed destination link without a full reload."""
+        version = self._bump_shared_version()
+        with self._lock:
+            snap = self._snap
+            if snap is None:
+                return  # next read will load it from the DB
+            if snap.version == version - 1:
+                # nobody else wrote in between: our snapshot stays current
+                snap.version = version
+            current = snap.links.get(destination_id, [])
+            if any(x["vaccine_id"] == vaccine_id for x in current):
+                return
+            link = {
+                "destination_id": destination_id,
+                "vaccine_id": vaccine_id,
+                "requirement_level": requirement_level,
+                "notes": notes,
+                "source_url": source_url,
+            }
+            # copy-on-write: readers may be iterating the old lists
+            snap.links[destination_id] = current + [link]
+            snap.by_vaccine[vaccine_id] = snap.by_vaccine.get(vaccine_id, []) + [link]
+
+
+catalog = VaccineCatalog()
@@ -1,14 +1,35 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
 from sqlalchemy.orm import Session
 
+from app.core.metrics import CBR_INDEX_BYTES, CBR_STAGE_SECONDS
+from app.core.timing import timed_as
+from app.db.session import DATABASE_READ_URL, SessionLocal
 from app.models.case import Case
-from app.models.vaccine import Vaccine
+from app.services.catalog import catalog
+from app.services.data_version import case_base_counter
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+# numpy/scikit-learn are imported on first use (or by load_dependencies() during
+# warmup), so processes that never assess a case don't pay for them.
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# float32 values / int32 indices for the fitted matrices (about half the memory of float64)
+CBR_COMPACT_INDEX = os.getenv("CBR_COMPACT_INDEX", "1") == "1"
+# char 3-5-gram vocabulary pruning in compact mode (0 / 1 = keep every term)
+CBR_CHAR_MAX_FEATURES = int(os.getenv("CBR_CHAR_MAX_FEATURES", "0"))
+CBR_CHAR_MIN_DF = int(os.getenv("CBR_CHAR_MIN_DF", "1"))
+# per-worker budget for the index (0 = unlimited); see CaseIndex
+CBR_INDEX_MEMORY_BUDGET_MB = float(os.getenv("CBR_INDEX_MEMORY_BUDGET_MB", "0"))
 
 
 KEYWORDS = {
@@ -87,6 +108,15 @@ SCENARIO_MAP = {
 }
 
 
+def case_base_version() -> int:
+    """Counter bumped on every case write (see app.services.data_version); part of every derived cache key."""
+    return case_base_counter.get()
+
+
+def bump_case_base_version() -> int:
+    return case_base_counter.bump()
+
+
 def normalize_scenario(user_value: Optional[str]) -> str:
     """
     Map user input to internal scenario codes.
@@ -118,6 +148,367 @@ def infer_scenario(text: str) -> Optional[str]:
     return best if best_score >= 1 else None
 
 
+# same tokens as scikit-learn's default token_pattern, after lowercasing
+_TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+
+
+def tokenize(text: str) -> str:
+    """Lowercased word tokens joined by single spaces (what the word vectorizer consumes)."""
+    return " ".join(_TOKEN_RE.findall((text or "").lower()))
+
+
+def derived_case_fields(problem_text: str, scenario_type: Optional[str]) -> dict:
+    """Stored Case columns derived from the text/scenario; recompute whenever those change."""
+    return {
+        "scenario_norm": (scenario_type or "").strip().lower() or None,
+        "scenario_inferred": infer_scenario(problem_text),
+        "text_tokens": tokenize(problem_text),
+    }
+
+
+def load_dependencies() -> None:
+    """Import the heavy ML stack now instead of on the first assessment."""
+    import numpy  # noqa: F401
+    import sklearn.feature_extraction.text  # noqa: F401
+
+
+def word_vectorizer(dtype=None):
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    # input is tokenize() output (stored as Case.text_tokens), so splitting on spaces
+    # gives the same tokens as the default lowercase + token_pattern pipeline
+    return TfidfVectorizer(
+        stop_words="english",
+        ngram_range=(1, 2),
+        sublinear_tf=True,
+        lowercase=False,
+        tokenizer=str.split,
+        token_pattern=None,
+        dtype=dtype or np.float64,
+    )
+
+
+def char_vectorizer(dtype=None, max_features: Optional[int] = None, min_df: int = 1):
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(
+        analyzer="char_wb",
+        ngram_range=(3, 5),
+        dtype=dtype or np.float64,
+        max_features=max_features,
+        min_df=min_df,
+    )
+
+
+def _compact(mat):
+    """CSR with int32 indices (scikit-learn/scipy may pick int64)."""
+    import numpy as np
+
+    mat = mat.tocsr()
+    if mat.nnz < np.iinfo(np.int32).max:
+        mat.indices = mat.indices.astype(np.int32, copy=False)
+        mat.indptr = mat.indptr.astype(np.int32, copy=False)
+    return mat
+
+
+def _matrix_bytes(mat) -> int:
+    return int(mat.data.nbytes + mat.indices.nbytes + mat.indptr.nbytes)
+
+
+class _Terms:
+    """
+    Term frequencies of one vectorizer over a corpus, with IDF applied per query.
+
+    Scores equal fitting the TF-IDF vectorizer on corpus + [query] and taking
+    the cosine between the query and each document (the original per-request
+    behaviour): the query counts as one more document, so every idf uses
+    n + 1 documents and query terms get one more document frequency. Only the
+    query's columns change between queries, so document norms are corrected
+    for those columns instead of being refitted.
+    """
+
+    def __init__(self, vec, docs: List[str], compact: bool = False):
+        import numpy as np
+
+        vec.set_params(use_idf=False, norm=None)  # raw (sublinear) tf; idf/norm are applied per query
+        self.vec = vec
+        self.tf = vec.fit_transform(docs).tocsr()
+        if compact:
+            self.tf = _compact(self.tf)
+            vec.stop_words_ = None  # pruned terms are only kept for introspection
+        self.analyze = vec.build_analyzer()
+        self.df = np.bincount(self.tf.indices, minlength=self.tf.shape[1])
+        self.idf, self.sq_norms = self._weights(self.tf, self.df)
+
+    @staticmethod
+    def _weights(tf, df):
+        import numpy as np
+
+        # smooth idf over the n documents plus a query that lacks the term
+        idf = np.log((2.0 + tf.shape[0]) / (1.0 + df)) + 1.0
+        sq_norms = np.asarray(tf.multiply(tf) @ (idf**2)).ravel()
+        return idf, sq_norms
+
+    def query(self, doc: str):
+        """(vocabulary columns, tf) of the query's terms; column -1 = not in the vocabulary."""
+        import numpy as np
+
+        counts: Dict[str, int] = {}
+        for term in self.analyze(doc):
+            counts[term] = counts.get(term, 0) + 1
+        vocab = self.vec.vocabulary_
+        cols = np.fromiter((vocab.get(t, -1) for t in counts), dtype=int, count=len(counts))
+        q_tf = np.fromiter(counts.values(), dtype=float, count=len(counts))
+        if self.vec.sublinear_tf:
+            q_tf = 1.0 + np.log(q_tf)
+        return cols, q_tf
+
+    def cosine(self, query, rows=None) -> np.ndarray:
+        """Cosine of the query against each document (or only `rows`, as if the corpus were just those)."""
+        import numpy as np
+
+        if rows is None:
+            tf, df, idf, sq_norms = self.tf, self.df, self.idf, self.sq_norms
+        else:
+            tf = self.tf[rows]
+            df = np.bincount(tf.indices, minlength=tf.shape[1])
+            idf, sq_norms = self._weights(tf, df)
+        n = tf.shape[0]
+        cols, q_tf = query
+        known = cols >= 0
+        q_df = np.zeros(len(cols))
+        q_df[known] = df[cols[known]]
+        q_idf = np.log((2.0 + n) / (2.0 + q_df)) + 1.0
+        q_norm = float(np.sqrt(np.sum((q_tf * q_idf) ** 2)))
+
+        cols, q_tf, q_idf = cols[known], q_tf[known], q_idf[known]
+        if not len(cols) or not q_norm:
+            return np.zeros(n)
+        sub = tf[:, cols]
+        dots = np.asarray(sub @ (q_tf * q_idf**2)).ravel()
+        sq_norms = sq_norms + np.asarray(sub.multiply(sub) @ (q_idf**2 - idf[cols] ** 2)).ravel()
+        norms = np.sqrt(np.maximum(sq_norms, 0.0)) * q_norm
+        return np.divide(dots, norms, out=np.zeros(n), where=norms > 0)
+
+    def nbytes(self) -> Dict[str, int]:
+        # rough: dict slots + term strings, plus the per-term and per-document arrays
+        vocab = self.vec.vocabulary_
+        return {
+            "matrix": _matrix_bytes(self.tf),
+            "vocabulary": sys.getsizeof(vocab)
+            + sum(sys.getsizeof(t) for t in vocab)
+            + int(self.df.nbytes + self.idf.nbytes + self.sq_norms.nbytes),
+        }
+
+
+class _Group:
+    """Term statistics for one subset of the case base (one scenario, or all)."""
+
+    def __init__(self, rows: List[int], corpus: List[str], tokens: List[str], compact: bool = False):
+        import numpy as np
+
+        self.rows = np.asarray(rows, dtype=int)
+        dtype = np.float32 if compact else np.float64
+        self.word = _Terms(word_vectorizer(dtype), tokens, compact)
+        if compact and (CBR_CHAR_MAX_FEATURES or CBR_CHAR_MIN_DF > 1):
+            try:
+                char_vec = char_vectorizer(dtype, CBR_CHAR_MAX_FEATURES or None, min(CBR_CHAR_MIN_DF, len(corpus)))
+                self.char = _Terms(char_vec, corpus, compact)
+            except ValueError:  # pruning left no terms (tiny subset): keep the full vocabulary
+                self.char = _Terms(char_vectorizer(dtype), corpus, compact)
+        else:
+            self.char = _Terms(char_vectorizer(dtype), corpus, compact)
+
+    def semantic(self, query_text: str, rows=None) -> np.ndarray:
+        """0.75 word + 0.25 char cosine; `rows` (positions in this group) restricts the corpus."""
+        with CBR_STAGE_SECONDS.time(stage="transform"):
+            word_q = self.word.query(tokenize(query_text))
+            char_q = self.char.query(query_text)
+        with CBR_STAGE_SECONDS.time(stage="cosine"):
+            word_sims = self.word.cosine(word_q, rows)
+            char_sims = self.char.cosine(char_q, rows)
+        return 0.75 * word_sims + 0.25 * char_sims
+
+    def nbytes(self) -> Dict[str, int]:
+        word, char = self.word.nbytes(), self.char.nbytes()
+        return {
+            "word_matrix": word["matrix"],
+            "char_matrix": char["matrix"],
+            "vocabulary": word["vocabulary"] + char["vocabulary"],
+        }
+
+
+class _View:
+    """A scenario subset of the full group (no matrices of its own)."""
+
+    def __init__(self, parent: _Group, rows: List[int]):
+        import numpy as np
+
+        self.parent = parent
+        self.rows = np.asarray(rows, dtype=int)
+
+    def semantic(self, query_text: str, rows=None) -> np.ndarray:
+        return self.parent.semantic(query_text, self.rows if rows is None else self.rows[rows])
+
+    def nbytes(self) -> Dict[str, int]:
+        return {"rows": int(self.rows.nbytes)}
+
+
+class CaseIndex:
+    """
+    Fitted CBR index over the whole case base.
+
+    Term statistics are collected once per scenario subset (plus one over
+    every case) instead of on each assessment, and scores match fitting on the
+    subset plus the query (see _Terms). The index is tagged with the case-base
+    version it was built from and rebuilt when that version moves.
+
+    compact=True stores float32 values with int32 indices and applies the
+    CBR_CHAR_* vocabulary pruning (which drops rare terms, so scores can move).
+    When the full group alone would take more than half of memory_budget_mb,
+    scenario subsets become views on the full group instead of refitted
+    copies; views score the same, at the cost of recounting document
+    frequencies over the subset on each query.
+    """
+
+    def __init__(
+        self,
+        cases: List[Case],
+        version: int,
+        compact: Optional[bool] = None,
+        memory_budget_mb: Optional[float] = None,
+    ):
+        import numpy as np
+
+        self.version = version
+        self.compact = CBR_COMPACT_INDEX if compact is None else compact
+        budget = CBR_INDEX_MEMORY_BUDGET_MB if memory_budget_mb is None else memory_budget_mb
+        self.case_ids = [c.id for c in cases]
+        self.texts = [c.problem_text for c in cases]
+        self.raw_scenarios = [c.scenario_type for c in cases]
+        self.vaccine_ids = [c.vaccine_id for c in cases]
+        self._live = None  # (catalog version, live_mask)
+        self.tokens = []
+        # effective scenario: the stored one, else the one inferred from the text
+        self.scenarios = []
+        for c in cases:
+            if c.text_tokens is None:  # not backfilled yet
+                derived = derived_case_fields(c.problem_text, c.scenario_type)
+                self.tokens.append(derived["text_tokens"])
+                self.scenarios.append(derived["scenario_norm"] or derived["scenario_inferred"] or "")
+            else:
+                self.tokens.append(c.text_tokens)
+                self.scenarios.append(c.scenario_norm or c.scenario_inferred or "")
+        # scenario codes as small ints so ranking compares arrays, not strings
+        self.scenario_codes = {s: n for n, s in enumerate(sorted(set(self.scenarios)))}
+        self.scenario_idx = np.asarray([self.scenario_codes[s] for s in self.scenarios], dtype=int)
+
+        self.groups: Dict[str, object] = {}
+        self.views = False
+        if cases:
+            full = self.groups[""] = _Group(list(range(len(cases))), self.texts, self.tokens, self.compact)
+            # scenario subsets partition the cases, so refitting them costs about as much again
+            full_mb = sum(full.nbytes().values()) / 2**20
+            self.views = bool(budget) and 2 * full_mb > budget
+            if budget and full_mb > budget:
+                logger.warning(
+                    "CBR index needs %.1f MB, over CBR_INDEX_MEMORY_BUDGET_MB=%s; "
+                    "consider CBR_COMPACT_INDEX=1 or CBR_CHAR_MAX_FEATURES/CBR_CHAR_MIN_DF",
+                    full_mb,
+                    budget,
+                )
+            by_scenario: Dict[str, List[int]] = {}
+            for i, s in enumerate(self.scenarios):
+                if s:
+                    by_scenario.setdefault(s, []).append(i)
+            for s, rows in by_scenario.items():
+                if self.views:
+                    self.groups[s] = _View(full, rows)
+                    continue
+                try:
+                    self.groups[s] = _Group(
+                        rows, [self.texts[i] for i in rows], [self.tokens[i] for i in rows], self.compact
+                    )
+                except ValueError:
+                    self.groups[s] = _View(full, rows)  # e.g. only stop words in this subset
+
+    def __len__(self) -> int:
+        return len(self.case_ids)
+
+    def nbytes(self) -> Dict[str, int]:
+        """Bytes held by the fitted matrices and vocabularies, summed over groups."""
+        total: Dict[str, int] = {}
+        for group in self.groups.values():
+            for k, v in group.nbytes().items():
+                total[k] = total.get(k, 0) + v
+        return total
+
+    def live_mask(self, db: Session):
+        """
+        Boolean mask over the cases whose vaccine is still in the catalog.
+
+        Computed once per catalog version, so ranking does not look up the
+        catalog for every case.
+        """
+        import numpy as np
+
+        version, ids = catalog.vaccine_ids(db)
+        cached = self._live
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        mask = np.fromiter((v in ids for v in self.vaccine_ids), dtype=bool, count=len(self.vaccine_ids))
+        self._live = (version, mask)
+        return mask
+
+    def group_for(self, q_scenario: str):
+        # scenario-first filtering, falling back to every case when the DB has no such scenario
+        return self.groups.get(q_scenario) or self.groups[""]
+
+
+_index: Optional[CaseIndex] = None
+_index_lock = threading.Lock()
+
+
+def rebuild_case_index(db: Session, version: Optional[int] = None) -> CaseIndex:
+    """
+    Fit a new index from the DB and install it for this process.
+
+    With a read replica configured the cases are loaded from the primary: the
+    index (and the assessment cache) is tagged with the newest version, so a
+    lagging replica would pin a case base that misses recent writes.
+    """
+    global _index
+    if version is None:
+        version = case_base_version()
+    with CBR_STAGE_SECONDS.time(stage="db_load"):
+        if DATABASE_READ_URL:
+            with SessionLocal() as primary:
+                cases = primary.query(Case).order_by(Case.id).all()
+        else:
+            cases = db.query(Case).order_by(Case.id).all()
+    with CBR_STAGE_SECONDS.time(stage="fit"):
+        index = CaseIndex(cases, version)
+    for part, n in index.nbytes().items():
+        CBR_INDEX_BYTES.set(n, part=part)
+    _index = index
+    return index
+
+
+def get_case_index(db: Session) -> CaseIndex:
+    version = case_base_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _index_lock:
+        index = _index
+        if index is not None and index.version == version:
+            return index
+        return rebuild_case_index(db, version)
+
+
+@timed_as("cbr")
 def find_similar_cases(
     db: Session,
     query_text: str,
@@ -128,12 +519,20 @@ def find_similar_cases(
     Find similar cases based on text and scenario matching.
     No age filtering - simplified version.
     """
-    rows = (
-        db.query(Case, Vaccine)
-        .join(Vaccine, Vaccine.id == Case.vaccine_id)
-        .all()
-    )
-    if not rows:
+    return rank_cases(db, get_case_index(db), query_text, scenario_type, top_k)
+
+
+def rank_cases(
+    db: Session,
+    index: CaseIndex,
+    query_text: str,
+    scenario_type: Optional[str],
+    top_k: int,
+) -> List[dict]:
+    """find_similar_cases against a given index (e.g. to compare index variants)."""
+    import numpy as np
+
+    if not len(index):
         return []
 
     # Normalize and infer scenario
@@ -141,41 +540,33 @@ def find_similar_cases(
     if not q_scenario:
         q_scenario = infer_scenario(query_text) or ""
 
-    # Scenario-first filtering (critical for "dog bite" -> bite/rabies)
-    scenario_rows = rows
-    if q_scenario:
-        scenario_rows = [(c, v) for (c, v) in rows if (c.scenario_type or "").strip().lower() == q_scenario]
-        if not scenario_rows:
-            scenario_rows = rows  # fallback if DB has no such scenario
+    # Scenario-first filtering (critical for "dog bite" -> bite/rabies);
+    # cases whose vaccine has since been deleted are skipped
+    alive = index.live_mask(db)
 
-    filtered = scenario_rows
+    def live(group):
+        return np.flatnonzero(alive[group.rows])
 
-    cases = [c for (c, _) in filtered]
-    vaccines = [v for (_, v) in filtered]
-    corpus = [c.problem_text for c in cases]
-
-    # Semantic similarity (TF-IDF word + char)
-    word_vec = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), sublinear_tf=True)
-    char_vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5))
+    group = index.group_for(q_scenario)
+    keep = live(group)
+    if not len(keep) and group is not index.groups[""]:
+        group = index.groups[""]  # fallback if DB has no such scenario
+        keep = live(group)
+    if not len(keep):
+        return []
+    rows = group.rows[keep]
 
-    word_mat = word_vec.fit_transform(corpus + [query_text])
-    char_mat = char_vec.fit_transform(corpus + [query_text])
+    # Semantic similarity (TF-IDF word + char), over the live cases only
+    semantic = group.semantic(query_text, None if len(keep) == len(group.rows) else keep)
 
-    word_sims = cosine_similarity(word_mat[-1], word_mat[:-1]).flatten()
-    char_sims = cosine_similarity(char_mat[-1], char_mat[:-1]).flatten()
-    semantic = 0.75 * word_sims + 0.25 * char_sims
+    t_rank = time.perf_counter()
 
     # Context scoring: scenario match only
-    scenario_scores = []
-    for c in cases:
-        c_s = (c.scenario_type or "").strip().lower()
-        if not q_scenario:
-            scen_score = 0.5
-        else:
-            scen_score = 1.0 if c_s == q_scenario else 0.0
-        scenario_scores.append(scen_score)
-
-    scenario_arr = np.array(scenario_scores, dtype=float)
+    if not q_scenario:
+        scenario_arr = np.full(len(rows), 0.5)
+    else:
+        code = index.scenario_codes.get(q_scenario, -1)
+        scenario_arr = (index.scenario_idx[rows] == code).astype(float)
     context = scenario_arr
 
     # Final score: 75% semantic, 25% context
@@ -186,36 +577,36 @@ def find_similar_cases(
     take = ranked[: min(top_k, len(ranked))]
 
     results: List[dict] = []
-    for i in take:
-        i = int(i)
-        c = cases[i]
-        v = vaccines[i]
+    for j in take:
+        j = int(j)
+        i = int(rows[j])
+        v = catalog.get(db, index.vaccine_ids[i])
         results.append(
             {
-                "case_id": c.id,
-                "score": float(final[i]),
-                "problem_text": c.problem_text,
-                "scenario_type": c.scenario_type,
-                "vaccine_id": c.vaccine_id,
+                "case_id": index.case_ids[i],
+                "score": float(final[j]),
+                "problem_text": index.texts[i],
+                "scenario_type": index.raw_scenarios[i],
+                "vaccine_id": index.vaccine_ids[i],
                 "vaccine_name": v.name,
                 "vaccine_description": v.description,
-                "semantic_score": float(semantic[i]),
-                "context_score": float(context[i]),
-                "scenario_match": bool(scenario_arr[i] == 1.0),
+                "semantic_score": float(semantic[j]),
+                "context_score": float(context[j]),
+                "scenario_match": bool(scenario_arr[j] == 1.0),
             }
         )
 
     # Guarantee at least 1 if DB had cases
-    if not results and cases:
-        c = cases[0]
-        v = vaccines[0]
+    if not results and len(rows):
+        i = int(rows[0])
+        v = catalog.get(db, index.vaccine_ids[i])
         results.append(
             {
-                "case_id": c.id,
+                "case_id": index.case_ids[i],
                 "score": 0.0,
-                "problem_text": c.problem_text,
-                "scenario_type": c.scenario_type,
-                "vaccine_id": c.vaccine_id,
+                "problem_text": index.texts[i],
+                "scenario_type": index.raw_scenarios[i],
+                "vaccine_id": index.vaccine_ids[i],
                 "vaccine_name": v.name,
                 "vaccine_description": v.description,
                 "semantic_score": 0.0,
@@ -224,4 +615,5 @@ def find_similar_cases(
             }
         )
 
-    return results
\ No newline at end of file
+    CBR_STAGE_SECONDS.observe(time.perf_counter() - t_rank, stage="rank")
+    return results
@@ -0,0 +1,86 @@
+"""
+Write counters that every process sees.
+
+Derived in-memory state (the vaccine catalog snapshot, the CBR index and the
+caches keyed on them) is tagged with a counter that writers bump. With a
+shared cache (Redis) the counter lives there. A memory:// cache is private to
+each process, so a write from another worker or a script (seed_db, backfills)
+could never invalidate it; the counter is then kept in the data_versions table
+and re-read at most every DATA_VERSION_CHECK_SECONDS.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.core.cache import RedisCache, get_backend, get_cache
+from app.db.session import SessionLocal
+from app.models.data_version import DataVersion
+
+DATA_VERSION_CHECK_SECONDS = float(os.getenv("DATA_VERSION_CHECK_SECONDS", "5"))
+
+logger = logging.getLogger(__name__)
+
+
+class DataVersionCounter:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._value = 0
+        self._checked_at = float("-inf")
+
+    @staticmethod
+    def shared_cache() -> bool:
+        return isinstance(get_backend(), RedisCache)
+
+    def get(self) -> int:
+        if self.shared_cache():
+            return int(get_cache(self.name).get("version", 0))
+        if time.monotonic() - self._checked_at < DATA_VERSION_CHECK_SECONDS:
+            return self._value
+        try:
+            with SessionLocal() as db:
+                value = db.execute(select(DataVersion.version).where(DataVersion.name == self.name)).scalar()
+        except SQLAlchemyError as e:  # e.g. init_db not re-run since the table was added
+            logger.warning("data version %r unavailable: %s", self.name, e)
+            return self._value
+        with self._lock:
+            self._value = max(self._value, value or 0)
+            self._checked_at = time.monotonic()
+            return self._value
+
+    def bump(self) -> int:
+        if self.shared_cache():
+            return get_cache(self.name).incr("version")
+        try:
+            with SessionLocal() as db:
+                value = self._increment(db)
+        except SQLAlchemyError as e:
+            logger.warning("data version %r not bumped in the database: %s", self.name, e)
+            value = self._value + 1
+        with self._lock:
+            self._value = max(self._value, value)
+            self._checked_at = time.monotonic()
+            return self._value
+
+    def _increment(self, db) -> int:
+        stmt = update(DataVersion).where(DataVersion.name == self.name).values(version=DataVersion.version + 1)
+        if not db.execute(stmt).rowcount:
+            try:
+                db.add(DataVersion(name=self.name, version=1))
+                db.commit()
+                return 1
+            except IntegrityError:  # another process created the row first
+                db.rollback()
+                db.execute(stmt)
+        db.commit()
+        return db.execute(select(DataVersion.version).where(DataVersion.name == self.name)).scalar_one()
+
+
+catalog_version = DataVersionCounter("catalog")
+case_base_counter = DataVersionCounter("cbr")
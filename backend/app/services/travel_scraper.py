@@ -1,12 +1,20 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import os
 import re
-import requests
-from bs4 import BeautifulSoup
+import time
 
-PASTEUR_FR_COUNTRY_INDEX_URL = "https://www.pasteur.fr/fr/data/export/json/fiche_pays/fr"
-PASTEUR_FR_BASE_URL = "https://www.pasteur.fr/fr/"
+from app.core.cache import get_cache
+from app.core.circuit import CircuitBreaker
+from app.core.metrics import SCRAPE_STAGE_SECONDS
+from app.core.timing import timed_as
+
+# Overridable so local stacks and load tests can point at a stub server.
+PASTEUR_FR_BASE_URL = os.getenv("PASTEUR_FR_BASE_URL", "https://www.pasteur.fr/fr/")
+PASTEUR_FR_COUNTRY_INDEX_URL = os.getenv(
+    "PASTEUR_FR_COUNTRY_INDEX_URL", PASTEUR_FR_BASE_URL + "data/export/json/fiche_pays/fr"
+)
 
 # We only care about travel-vaccine headings that we can map to Tunisia (IPT) vaccines.
 # The page may contain other vaccines; we ignore those for pricing.
@@ -32,22 +40,85 @@ STOP_MARKERS = {
 }
 
 
+# ---------------------------
+# Upstream protection
+# ---------------------------
+
+# Last successful scrape per page, kept much longer than the scrape cache so
+# callers can fall back to it while Pasteur.fr is down.
+SCRAPE_LAST_KNOWN_TTL = int(os.getenv("SCRAPE_LAST_KNOWN_TTL", str(30 * 24 * 3600)))
+
+
+class DeadlineExceeded(TimeoutError):
+    """The caller's deadline passed before the upstream call could start."""
+
+
+class UpstreamTimeout(TimeoutError):
+    """Pasteur.fr did not answer within the (deadline-capped) timeout."""
+
+
+def _get(url: str, timeout: Tuple[float, float]):
+    import requests
+
+    try:
+        r = requests.get(url, timeout=timeout, headers={"User-Agent": "pasteurhub/1.0"})
+    except requests.Timeout as e:
+        raise UpstreamTimeout(str(e)) from e
+    r.raise_for_status()
+    return r
+
+
+def _is_upstream_failure(exc: Exception) -> bool:
+    # a 4xx (e.g. a removed country page) means Pasteur.fr is answering fine
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status is None or status >= 500
+
+
+pasteur_breaker = CircuitBreaker(
+    "pasteur_fr",
+    failure_rate=float(os.getenv("PASTEUR_CIRCUIT_FAILURE_RATE", "0.5")),
+    min_calls=int(os.getenv("PASTEUR_CIRCUIT_MIN_CALLS", "5")),
+    window=int(os.getenv("PASTEUR_CIRCUIT_WINDOW", "20")),
+    open_seconds=float(os.getenv("PASTEUR_CIRCUIT_OPEN_SECONDS", "30")),
+    is_failure=_is_upstream_failure,
+)
+
+
+def _request_timeout(timeout: float, deadline: Optional[float]) -> Tuple[float, float]:
+    """
+    (connect, read) timeout for requests, capped by an absolute time.monotonic()
+    deadline. The read timeout applies per socket read, so a page that trickles
+    in can overrun it slightly; fine for a few-hundred-KB page.
+
+    Called before the breaker: a request whose deadline already passed never
+    reaches Pasteur.fr, so it must not count as an outcome or use up a probe.
+    """
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("deadline passed before contacting Pasteur.fr")
+        timeout = min(timeout, remaining)
+    return (timeout, timeout)
+
+
+def last_known_recommendations(country_url: str) -> Optional[dict]:
+    """Most recent successful scrape of this page, if any."""
+    return get_cache("scrape_last_known").get(country_url)
+
+
 def _norm(s: str) -> str:
     return " ".join((s or "").strip().split())
 
 
-def fetch_country_index(timeout: int = 30) -> List[dict]:
+def fetch_country_index(timeout: int = 30, deadline: Optional[float] = None) -> List[dict]:
     """
     Returns list of:
       { "name": <country label from Pasteur.fr>, "url": <full url>, "path": <path> }
+
+    Raises CircuitOpenError without contacting Pasteur.fr while its circuit is open.
     """
-    r = requests.get(
-        PASTEUR_FR_COUNTRY_INDEX_URL,
-        timeout=timeout,
-        headers={"User-Agent": "pasteurhub/1.0"},
-    )
-    r.raise_for_status()
-    payload = r.json()
+    payload = pasteur_breaker.call(_get, PASTEUR_FR_COUNTRY_INDEX_URL, _request_timeout(timeout, deadline)).json()
     data = payload.get("data", []) or []
 
     out: List[dict] = []
@@ -84,10 +155,15 @@ def _match_heading_to_key(line: str) -> Optional[str]:
     return None
 
 
-def scrape_country_recommendations(country_url: str, timeout: int = 30) -> dict:
+@timed_as("scrape")
+def scrape_country_recommendations(country_url: str, timeout: int = 30, deadline: Optional[float] = None) -> dict:
     """
     Scrape Pasteur.fr country page and extract recommended vaccine sections.
 
+    `deadline` is an absolute time.monotonic() value set by the caller; the
+    request timeout shrinks to fit it. Raises CircuitOpenError without
+    contacting Pasteur.fr while its circuit is open (see last_known_recommendations).
+
     Returns:
       {
         "source_url": country_url,
@@ -98,13 +174,25 @@ def scrape_country_recommendations(country_url: str, timeout: int = 30) -> dict:
         ]
       }
     """
-    r = requests.get(country_url, timeout=timeout, headers={"User-Agent": "pasteurhub/1.0"})
-    r.raise_for_status()
+    # imported lazily: requests/bs4 are only needed once a live scrape happens
+    from bs4 import BeautifulSoup
+
+    with SCRAPE_STAGE_SECONDS.time(stage="fetch"):
+        r = pasteur_breaker.call(_get, country_url, _request_timeout(timeout, deadline))
+
+    with SCRAPE_STAGE_SECONDS.time(stage="parse"):
+        soup = BeautifulSoup(r.text, "html.parser")
+        lines = [_norm(x) for x in soup.get_text("\n").splitlines()]
+        lines = [x for x in lines if x]
+
+    with SCRAPE_STAGE_SECONDS.time(stage="extract"):
+        result = _extract(country_url, lines)
+    get_cache("scrape_last_known").set(country_url, result, ttl=SCRAPE_LAST_KNOWN_TTL)
+    return result
 
-    soup = BeautifulSoup(r.text, "html.parser")
-    lines = [_norm(x) for x in soup.get_text("\n").splitlines()]
-    lines = [x for x in lines if x]
 
+def _extract(country_url: str, lines: List[str]) -> dict:
+    """Pull the recommended-vaccine sections out of the page's text lines."""
     # Find update date (if present)
     last_updated = None
     for line in reversed(lines):
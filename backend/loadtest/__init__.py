@@ -0,0 +1,3 @@
+"""
+Self-contained (stdlib-only) async HTTP load generation for PasteurHub.
+"""
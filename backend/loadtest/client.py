@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class HttpError(Exception):
+    pass
+
+
+class Connection:
+    """
+    Minimal keep-alive HTTP/1.1 client connection (one request at a time).
+
+    Good enough for load generation against our own API: no TLS proxying,
+    no redirects; Content-Length and chunked bodies are supported.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = parts.scheme == "https"
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        self._reader = self._writer = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[object] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        try:
+            return await asyncio.wait_for(self._request(method, path, body, headers), self.timeout)
+        except Exception:
+            await self.close()  # never reuse a connection in an unknown state
+            raise
+
+    async def _request(self, method, path, body, headers):
+        if self._writer is None:
+            await self._connect()
+
+        payload = b""
+        hdrs = {"Host": f"{self.host}:{self.port}", "Connection": "keep-alive", "Accept-Encoding": "identity"}
+        if body is not None:
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+            hdrs["Content-Type"] = "application/json"
+        hdrs["Content-Length"] = str(len(payload))
+        hdrs.update(headers or {})
+
+        head = f"{method} {self.base_path}{path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in hdrs.items())
+        self._writer.write(head.encode("latin-1") + b"\r\n" + payload)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise HttpError("connection closed by server")
+        status = int(status_line.split()[1])
+
+        resp_headers: Dict[str, str] = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            resp_headers[k.strip().lower()] = v.strip()
+
+        if resp_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks: List[bytes] = []
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readline()
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+            data = b"".join(chunks)
+        else:
+            data = await self._reader.readexactly(int(resp_headers.get("content-length", "0")))
+
+        if resp_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, resp_headers, data
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank percentile
+    idx = min(len(sorted_values) - 1, max(0, math.ceil(p / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+class Stats:
+    """Per-endpoint latency samples and error counts."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        self.latencies.setdefault(name, []).append(seconds)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def stop(self) -> None:
+        self.finished = time.perf_counter()
+
+    def summary(self) -> Dict[str, dict]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        out = {}
+        for name, samples in sorted(self.latencies.items()):
+            s = sorted(samples)
+            out[name] = {
+                "requests": len(s),
+                "rps": round(len(s) / elapsed, 2) if elapsed > 0 else 0.0,
+                "p50_ms": round(percentile(s, 50) * 1000, 2),
+                "p95_ms": round(percentile(s, 95) * 1000, 2),
+                "p99_ms": round(percentile(s, 99) * 1000, 2),
+                "error_rate": round(self.errors.get(name, 0) / len(s), 4),
+            }
+        return out
@@ -0,0 +1,185 @@
+"""
+User flows replayed by the load generator, mirroring frontend/app.js.
+
+Each flow is an async function (session) -> None issuing the same requests,
+in the same order, as the corresponding UI action. Requests are recorded
+under a route-template name so per-endpoint stats aggregate across ids.
+"""
+from __future__ import annotations
+
+import json
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from loadtest.client import Connection, Stats
+
+PROBLEMS = [
+    ("Dog bite while travelling in a rural area", "bite"),
+    ("Fever and chills after mosquito bites in a tropical region", "fever"),
+    ("Diarrhea and vomiting after eating street food", "gastro"),
+    ("Stepped on a rusty nail during a hike", "wound"),
+    ("Going on a pilgrimage with large crowds", "crowd"),
+    ("Needle stick injury at a clinic abroad", None),
+    ("Drank unsafe water during a trek", None),
+]
+
+
+class Session:
+    """One virtual user: a keep-alive connection plus shared run state."""
+
+    def __init__(self, base_url: str, stats: Stats, state: "RunState"):
+        self.conn = Connection(base_url)
+        self.stats = stats
+        self.state = state
+        self.rnd = random.Random()
+
+    async def call(
+        self,
+        name: str,
+        method: str,
+        path: str,
+        body: Optional[object] = None,
+        auth: bool = False,
+        expect: tuple = (200,),
+    ):
+        headers = {"Authorization": f"Bearer {self.state.token}"} if auth and self.state.token else None
+        t0 = time.perf_counter()
+        try:
+            status, _, data = await self.conn.request(method, path, body, headers)
+            ok = status in expect
+        except Exception:
+            status, data, ok = 0, b"", False
+        self.stats.record(f"{method} {name}", time.perf_counter() - t0, ok)
+        return status, data
+
+    async def json(self, *args, **kwargs):
+        status, data = await self.call(*args, **kwargs)
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+    async def close(self) -> None:
+        await self.conn.close()
+
+
+class RunState:
+    """State shared by every virtual user (one admin login for the whole run)."""
+
+    def __init__(self, admin_user: str, admin_password: str):
+        self.admin_user = admin_user
+        self.admin_password = admin_password
+        self.token: Optional[str] = None
+        self.destination_ids: List[int] = []
+        self.vaccine_ids: List[int] = []
+
+
+# ---------------------------
+# Flows (see the matching functions in frontend/app.js)
+# ---------------------------
+
+async def page_load(s: Session) -> None:
+    """DOMContentLoaded: checkAuth() + loadDestinations() (via the bootstrap payload)."""
+    if s.state.token:
+        await s.call("/resources/vaccines", "GET", "/resources/vaccines?limit=1", auth=True)
+    status, data = await s.json("/resources/bootstrap", "GET", "/resources/bootstrap")
+    if status == 200 and data:
+        s.state.destination_ids = [d["id"] for d in data["destinations"]]
+
+
+async def travel(s: Session) -> None:
+    """handleTravelSubmit: pick a destination, fetch its recommendations."""
+    if not s.state.destination_ids:
+        await page_load(s)
+    if not s.state.destination_ids:
+        return
+    dest_id = s.rnd.choice(s.state.destination_ids)
+    await s.call(
+        "/resources/destinations/{id}/recommendations",
+        "GET",
+        f"/resources/destinations/{dest_id}/recommendations",
+    )
+
+
+async def assessment(s: Session) -> None:
+    """handleAssessmentSubmit."""
+    text, scenario = s.rnd.choice(PROBLEMS)
+    await s.call(
+        "/resources/assessments",
+        "POST",
+        "/resources/assessments",
+        {"problem_text": f"{text} ({s.rnd.randint(1, 50)})", "scenario_type": scenario},
+    )
+
+
+async def admin(s: Session) -> None:
+    """Admin panel: loadVaccines, loadCases, loadVaccinesForSelect, then case + vaccine CRUD."""
+    if not s.state.token:
+        return
+    status, vaccines = await s.json("/resources/vaccines", "GET", "/resources/vaccines", auth=True)
+    await s.call("/resources/cases", "GET", "/resources/cases", auth=True)
+    await s.call("/resources/bootstrap", "GET", "/resources/bootstrap")
+    if status == 200 and vaccines:
+        s.state.vaccine_ids = [v["id"] for v in vaccines]
+    if not s.state.vaccine_ids:
+        return
+
+    text, scenario = s.rnd.choice(PROBLEMS)
+    status, case = await s.json(
+        "/resources/cases",
+        "POST",
+        "/resources/cases",
+        {"problem_text": f"[loadtest] {text}", "scenario_type": scenario, "vaccine_id": s.rnd.choice(s.state.vaccine_ids)},
+        auth=True,
+        expect=(201,),
+    )
+    if status == 201 and case:
+        await s.call("/resources/cases/{id}", "DELETE", f"/resources/cases/{case['id']}", auth=True, expect=(204,))
+
+    name = f"[loadtest] vaccine {s.rnd.getrandbits(48):012x}"
+    status, vaccine = await s.json(
+        "/resources/vaccines",
+        "POST",
+        "/resources/vaccines",
+        {"name": name, "description": None, "price_tnd": 10.0},
+        auth=True,
+        expect=(201,),
+    )
+    if status == 201 and vaccine:
+        await s.call(
+            "/resources/vaccines/{id}", "DELETE", f"/resources/vaccines/{vaccine['id']}", auth=True, expect=(204,)
+        )
+
+
+FLOWS: Dict[str, Callable[[Session], Awaitable[None]]] = {
+    "page_load": page_load,
+    "travel": travel,
+    "assessment": assessment,
+    "admin": admin,
+}
+
+DEFAULT_MIX = "page_load=2,travel=5,assessment=3,admin=1"
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in FLOWS:
+            raise ValueError(f"unknown flow {name!r} (known: {', '.join(FLOWS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def login(base_url: str, state: RunState, stats: Stats) -> None:
+    """handleLogin, once per run (login is rate limited per username)."""
+    s = Session(base_url, stats, state)
+    try:
+        status, data = await s.json(
+            "/auth/login", "POST", "/auth/login", {"username": state.admin_user, "password": state.admin_password}
+        )
+        if status == 200 and data:
+            state.token = data.get("access_token")
+    finally:
+        await s.close()
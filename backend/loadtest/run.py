@@ -0,0 +1,130 @@
+"""
+Closed-loop load generator replaying the frontend flows.
+
+Local stack:
+
+  python -m loadtest.stub_pasteur --port 8089 --latency-ms 150 &
+  export PASTEUR_FR_BASE_URL=http://127.0.0.1:8089/fr/
+  python scripts/seed_db.py
+  uvicorn app.main:app --port 8000 --workers 4 &
+  python -m loadtest.run --base-url http://127.0.0.1:8000 --concurrency 50 --duration 60
+
+Each virtual user picks a flow by weight (--mix), runs it, and repeats until
+--duration elapses. The report lists throughput, p50/p95/p99 and error rate
+per endpoint. --save-baseline stores the result as JSON; --baseline compares a
+run against it and exits 1 when p95 or error rate regress beyond --tolerance.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict
+
+from loadtest.client import Stats
+from loadtest.flows import DEFAULT_MIX, FLOWS, RunState, Session, login, parse_mix
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+async def _user(base_url: str, stats: Stats, state: RunState, mix: Dict[str, float], stop_at: float) -> None:
+    s = Session(base_url, stats, state)
+    names, weights = list(mix), list(mix.values())
+    try:
+        await FLOWS["page_load"](s)
+        while time.perf_counter() < stop_at:
+            await FLOWS[s.rnd.choices(names, weights)[0]](s)
+    finally:
+        await s.close()
+
+
+async def run(base_url: str, concurrency: int, duration: float, mix: Dict[str, float], state: RunState) -> dict:
+    if "admin" in mix:
+        await login(base_url, state, Stats())
+        if not state.token:
+            print("warning: admin login failed; admin flow will be skipped", file=sys.stderr)
+
+    stats = Stats()
+    stop_at = time.perf_counter() + duration
+
+    # stagger the ramp-up so the first second is not one synchronized burst
+    async def delayed():
+        await asyncio.sleep(random.uniform(0, min(1.0, duration / 10)))
+        await _user(base_url, stats, state, mix, stop_at)
+
+    await asyncio.gather(*(delayed() for _ in range(concurrency)))
+    stats.stop()
+    return stats.summary()
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> int:
+    """Print a per-endpoint comparison; returns the number of regressions."""
+    regressions = 0
+    print(f"\n{'endpoint':55} {'p95 base':>9} {'p95 now':>9} {'rps base':>9} {'rps now':>9} {'err now':>8}")
+    for name, now in current.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:55} {'-':>9} {now['p95_ms']:9.1f} {'-':>9} {now['rps']:9.1f} {now['error_rate']:8.2%}  (new)")
+            continue
+        flags = []
+        if now["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            flags.append("p95")
+        if now["error_rate"] > base["error_rate"] + 0.01:
+            flags.append("errors")
+        regressions += bool(flags)
+        print(
+            f"{name:55} {base['p95_ms']:9.1f} {now['p95_ms']:9.1f} {base['rps']:9.1f} {now['rps']:9.1f} "
+            f"{now['error_rate']:8.2%}  {'REGRESSION: ' + ', '.join(flags) if flags else 'ok'}"
+        )
+    return regressions
+
+
+def report(summary: dict) -> None:
+    print(f"{'endpoint':55} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>8}")
+    for name, s in summary.items():
+        print(
+            f"{name:55} {s['requests']:7d} {s['rps']:8.1f} {s['p50_ms']:7.1f}ms {s['p95_ms']:7.1f}ms "
+            f"{s['p99_ms']:7.1f}ms {s['error_rate']:8.2%}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=os.getenv("LOADTEST_BASE_URL", "http://127.0.0.1:8000"))
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"flow weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--admin-user", default=os.getenv("LOADTEST_ADMIN_USER", "doctor@gmail.com"))
+    parser.add_argument("--admin-password", default=os.getenv("LOADTEST_ADMIN_PASSWORD", "doctor456"))
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="compare against a stored baseline")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 increase vs baseline (0.2 = +20%%)")
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    state = RunState(args.admin_user, args.admin_password)
+    summary = asyncio.run(run(args.base_url, args.concurrency, args.duration, mix, state))
+
+    print(f"{args.base_url}  concurrency={args.concurrency} duration={args.duration}s mix={args.mix}\n")
+    report(summary)
+
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, sort_keys=True)
+        print(f"\nwrote {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(summary, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Stub Pasteur.fr server for local stacks and load tests.
+
+Serves the country index JSON and one country page per country, in the same
+shape travel_scraper expects, so the live-scrape path can be exercised
+without hitting pasteur.fr. Latency and error injection are optional.
+
+  python -m loadtest.stub_pasteur --port 8089 --countries 200 --latency-ms 150
+  PASTEUR_FR_BASE_URL=http://localhost:8089/fr/ python scripts/seed_db.py
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+INDEX_PATH = "/fr/data/export/json/fiche_pays/fr"
+
+_SECTIONS = [
+    ("Fièvre jaune", "Vaccination exigée à l'entrée du pays pour tous les voyageurs âgés de plus de 9 mois."),
+    ("Hépatite A", "Recommandée pour tous les voyageurs."),
+    ("Typhoïde", "Recommandée pour les séjours prolongés ou dans de mauvaises conditions d'hygiène."),
+    ("Rage", "Recommandée pour les séjours prolongés ou isolés."),
+    ("Hépatite B", "Recommandée pour les séjours fréquents ou prolongés."),
+    ("Méningite ACYW", "Recommandée en saison sèche."),
+    ("Diphtérie - Tétanos", "Mise à jour du rappel."),
+]
+
+
+def country_names(n: int) -> List[str]:
+    return [f"Stubland {i:03d}" for i in range(1, n + 1)]
+
+
+def country_path(i: int) -> str:
+    return f"fiche-pays/stubland-{i:03d}"
+
+
+def country_page(i: int) -> str:
+    rnd = random.Random(i)
+    sections = rnd.sample(_SECTIONS, k=rnd.randint(2, len(_SECTIONS)))
+    body = "\n".join(f"<h3>{label}</h3>\n<p>{text}</p>" for label, text in sections)
+    return (
+        "<html><body><h1>Stubland</h1>\n"
+        "<h2>Vaccinations recommandées</h2>\n"
+        f"{body}\n"
+        "<h2>Paludisme</h2><p>Risque faible.</p>\n"
+        "<p>Dernière mise à jour le 1 janvier 2025</p>\n"
+        "</body></html>"
+    )
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    countries = 50
+    latency_ms = 0.0
+    jitter_ms = 0.0
+    error_rate = 0.0
+
+    def log_message(self, format, *args):  # keep load-test output readable
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            self._send(503, b"stub: injected failure", "text/plain")
+            return
+
+        path = self.path.split("?")[0]
+        if path == INDEX_PATH:
+            data = [
+                {"value": name, "path": country_path(i)}
+                for i, name in enumerate(country_names(self.countries), start=1)
+            ]
+            self._send(200, json.dumps({"data": data}).encode("utf-8"), "application/json")
+            return
+
+        prefix = "/fr/fiche-pays/stubland-"
+        if path.startswith(prefix) and path[len(prefix):].isdigit():
+            i = int(path[len(prefix):])
+            if 1 <= i <= self.countries:
+                self._send(200, country_page(i).encode("utf-8"), "text/html; charset=utf-8")
+                return
+        self._send(404, b"not found", "text/plain")
+
+
+def serve(host: str, port: int, **options) -> ThreadingHTTPServer:
+    handler = type("ConfiguredStubHandler", (StubHandler,), options)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--countries", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fixed delay per response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="extra uniform random delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    args = parser.parse_args()
+
+    server = serve(
+        args.host,
+        args.port,
+        countries=args.countries,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+    )
+    print(f"stub Pasteur.fr on http://{args.host}:{args.port}/fr/ ({args.countries} countries)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
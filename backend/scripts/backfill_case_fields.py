@@ -0,0 +1,61 @@
+"""
+Backfill the derived Case columns (scenario_norm, scenario_inferred,
+text_tokens) for rows written before they existed.
+
+Processes rows with NULL text_tokens in id order, --batch-size at a time, one
+commit per batch; safe to interrupt and re-run. Use --all to recompute every
+row (e.g. after changing KEYWORDS or the tokenizer).
+
+Usage:
+  python scripts/backfill_case_fields.py [--batch-size 1000] [--all]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import select, update
+
+from app.db.session import SessionLocal
+from app.models.case import Case
+from app.models.destination import Destination  # noqa: F401
+from app.models.destination_vaccine import DestinationVaccine  # noqa: F401
+from app.services.cbr import bump_case_base_version, derived_case_fields
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--all", action="store_true", help="recompute rows that are already filled")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    updated = 0
+    last_id = 0
+    with SessionLocal() as db:
+        while True:
+            stmt = select(Case.id, Case.problem_text, Case.scenario_type).where(Case.id > last_id)
+            if not args.all:
+                stmt = stmt.where(Case.text_tokens.is_(None))
+            rows = db.execute(stmt.order_by(Case.id).limit(args.batch_size)).all()
+            if not rows:
+                break
+            values = [{"id": r.id, **derived_case_fields(r.problem_text, r.scenario_type)} for r in rows]
+            db.execute(update(Case), values)  # executemany by primary key
+            db.commit()
+            updated += len(rows)
+            last_id = rows[-1].id
+            print(f"  backfilled {updated} cases ({time.perf_counter() - t0:.1f}s)")
+
+        if updated:
+            bump_case_base_version()  # workers refit their index from the new columns
+    print(f"Backfilled {updated} cases in {time.perf_counter() - t0:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
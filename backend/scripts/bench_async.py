@@ -0,0 +1,83 @@
+"""
+Async vs sync read path: requests/second and tail latency at high concurrency.
+
+Start two API instances against the same database, one on a build from before
+the async port and one on the current tree, then:
+
+  python scripts/bench_async.py --sync-url http://localhost:8001 \
+      --async-url http://localhost:8000 --concurrency 200 --duration 20
+
+Each read endpoint is hammered by closed-loop workers for --duration seconds.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from loadtest.client import Connection, Stats
+
+READ_PATHS = [
+    "/resources/destinations",
+    "/resources/vaccines",
+    "/resources/cases",
+    "/resources/destinations/1/recommendations",
+]
+
+
+async def _worker(base_url: str, path: str, stats: Stats, stop_at: float) -> None:
+    conn = Connection(base_url)
+    try:
+        while time.perf_counter() < stop_at:
+            t0 = time.perf_counter()
+            try:
+                status, _, _ = await conn.request("GET", path)
+                ok = status < 500
+            except Exception:
+                ok = False
+            stats.record(path, time.perf_counter() - t0, ok)
+    finally:
+        await conn.close()
+
+
+async def run(base_url: str, paths, concurrency: int, duration: float) -> dict:
+    results = {}
+    for path in paths:
+        stats = Stats()
+        stop_at = time.perf_counter() + duration
+        await asyncio.gather(*(_worker(base_url, path, stats, stop_at) for _ in range(concurrency)))
+        stats.stop()
+        results.update(stats.summary())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sync-url", required=True)
+    parser.add_argument("--async-url", required=True)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--path", action="append", dest="paths", help="override the endpoint list")
+    args = parser.parse_args()
+    paths = args.paths or READ_PATHS
+
+    sync_res = asyncio.run(run(args.sync_url, paths, args.concurrency, args.duration))
+    async_res = asyncio.run(run(args.async_url, paths, args.concurrency, args.duration))
+
+    print(f"concurrency={args.concurrency} duration={args.duration}s per endpoint\n")
+    print(f"{'endpoint':45} {'sync rps':>9} {'async rps':>9} {'sync p99':>9} {'async p99':>9} {'err s/a':>11}")
+    for path in paths:
+        s, a = sync_res.get(path, {}), async_res.get(path, {})
+        print(
+            f"{path:45} {s.get('rps', 0):9.1f} {a.get('rps', 0):9.1f} "
+            f"{s.get('p99_ms', 0):8.1f}ms {a.get('p99_ms', 0):8.1f}ms "
+            f"{s.get('error_rate', 0):5.1%}/{a.get('error_rate', 0):5.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Protected-endpoint overhead: get_current_user with and without the principal cache.
+
+Runs against DATABASE_URL (use the real Postgres to include the network round
+trip; defaults to a throwaway SQLite file).
+
+Usage:
+  python scripts/bench_auth.py [iterations]   (default: 2000)
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_auth.db")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import security
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.models.user import User
+
+BENCH_USER = "bench-admin@pasteurhub.local"
+
+
+def _ensure_user(db) -> None:
+    if not db.query(User).filter(User.username == BENCH_USER).first():
+        db.add(User(username=BENCH_USER, password_hash="pbkdf2_sha256$1$x$x", role="admin"))
+        db.commit()
+
+
+def _run(iterations: int, ttl: float) -> float:
+    security.PRINCIPAL_CACHE_TTL = ttl
+    creds = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=security.create_access_token(BENCH_USER, role="admin")
+    )
+    db = SessionLocal()
+    try:
+        security.require_admin_user(security.get_current_user(creds, db))  # warm
+        t0 = time.perf_counter()
+        for _ in range(iterations):
+            security.require_admin_user(security.get_current_user(creds, db))
+        return (time.perf_counter() - t0) / iterations * 1e6
+    finally:
+        db.close()
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    if os.environ["DATABASE_URL"].startswith("sqlite"):
+        init_db()
+    db = SessionLocal()
+    try:
+        _ensure_user(db)
+    finally:
+        db.close()
+
+    before = _run(iterations, ttl=0)
+    after = _run(iterations, ttl=30)
+    print(f"get_current_user + require_admin_user ({iterations} calls)")
+    print(f"  no principal cache : {before:8.1f} us/call")
+    print(f"  principal cache    : {after:8.1f} us/call  ({before / max(after, 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
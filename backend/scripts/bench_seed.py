@@ -0,0 +1,87 @@
+"""
+Seeding benchmark: set-based bulk path vs the old per-row SELECT+INSERT loop.
+
+Uses DATABASE_URL (defaults to a throwaway SQLite file). The bulk path is timed
+at --cases rows; the legacy loop is timed on --legacy-sample rows and its
+per-row rate is extrapolated.
+
+Usage:
+  python scripts/bench_seed.py [--cases 100000] [--legacy-sample 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_seed.db")
+
+import seed_db  # noqa: E402  (scripts/ is on sys.path when run directly)
+
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.models.case import Case
+
+
+def _rows(n: int, tag: str, vaccine_id: int):
+    return [
+        {"problem_text": f"bench {tag} case #{i}", "scenario_type": "bite", "vaccine_id": vaccine_id}
+        for i in range(n)
+    ]
+
+
+def legacy_insert(db, rows) -> int:
+    added = 0
+    for r in rows:
+        if db.query(Case).filter(Case.problem_text == r["problem_text"]).first():
+            continue
+        db.add(Case(**r))
+        added += 1
+    db.commit()
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--legacy-sample", type=int, default=2_000)
+    args = parser.parse_args()
+
+    if os.environ["DATABASE_URL"].startswith("sqlite"):
+        init_db()
+
+    db = SessionLocal()
+    try:
+        seed_db.upsert_ipt_vaccines(db)
+        vaccine_id = db.query(seed_db.Vaccine.id).order_by(seed_db.Vaccine.id).first()[0]
+
+        rows = _rows(args.cases, f"bulk-{time.time_ns()}", vaccine_id)
+        t0 = time.perf_counter()
+        added = seed_db.insert_cases(db, rows, label="bulk")
+        bulk_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        again = seed_db.insert_cases(db, rows, label="bulk re-run")
+        rerun_s = time.perf_counter() - t0
+
+        sample = _rows(args.legacy_sample, f"legacy-{time.time_ns()}", vaccine_id)
+        t0 = time.perf_counter()
+        legacy_insert(db, sample)
+        legacy_s = time.perf_counter() - t0
+        legacy_est = legacy_s / max(1, len(sample)) * args.cases
+    finally:
+        db.close()
+
+    print(f"\n{args.cases:,} cases")
+    print(f"  bulk insert          : {bulk_s:8.2f}s  (+{added:,})")
+    print(f"  bulk re-run (no-op)  : {rerun_s:8.2f}s  (+{again:,})")
+    print(f"  legacy loop (est.)   : {legacy_est:8.2f}s  (measured {legacy_s:.2f}s on {len(sample):,} rows)")
+    print(f"  speed-up             : {legacy_est / max(bulk_s, 1e-9):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Serialization + wire-size benchmark for the list endpoints.
+
+Mirrors what FastAPI does for /resources/vaccines and /resources/cases
+(response_model validation -> JSON bytes -> optional compression) on synthetic
+ORM rows, comparing the stock JSONResponse with the app-wide FastJSONResponse.
+
+Usage:
+  python scripts/bench_serialization.py [rows]   (default: 10000)
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse
+from app.models.case import Case
+from app.models.destination import Destination  # noqa: F401
+from app.models.destination_vaccine import DestinationVaccine  # noqa: F401
+from app.models.vaccine import Vaccine
+from app.schemas.case import CaseOut
+from app.schemas.vaccine import VaccineOut
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def _vaccines(n: int):
+    return [
+        Vaccine(
+            id=i,
+            name=f"Vaccine {i}",
+            description="Official Institut Pasteur de Tunis item (English).",
+            price_tnd=Decimal("92.000") + i,
+            currency="TND",
+            price_source_url="https://pasteur.tn/vp",
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def _cases(n: int):
+    scenarios = ["bite", "fever", "gastro", "wound", "crowd", None]
+    return [
+        Case(
+            id=i,
+            problem_text=f"Traveller {i} reports exposure and asks which vaccine is recommended",
+            scenario_type=scenarios[i % len(scenarios)],
+            vaccine_id=(i % 14) + 1,
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def _timeit(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def bench(label: str, rows, schema) -> None:
+    adapter = TypeAdapter(list[schema])
+
+    def validated():
+        # what FastAPI's serialize_response hands to the response class
+        return adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+
+    content = validated()
+
+    t_validate = _timeit(validated)
+    t_stock = _timeit(lambda: JSONResponse(content).body)
+    t_fast = _timeit(lambda: FastJSONResponse(content).body)
+
+    raw = FastJSONResponse(content).body
+    gz = gzip.compress(raw, compresslevel=6)
+    br = brotli.compress(raw, quality=4) if brotli is not None else None
+
+    print(f"\n{label} ({len(rows)} rows)")
+    print(f"  model validation/dump : {t_validate:8.1f} ms")
+    print(f"  stock JSONResponse    : {t_stock:8.1f} ms")
+    print(f"  FastJSONResponse      : {t_fast:8.1f} ms  ({t_stock / max(t_fast, 1e-9):.1f}x)")
+    print(f"  identity              : {len(raw):>10,} bytes")
+    print(f"  gzip (level 6)        : {len(gz):>10,} bytes  ({len(raw) / len(gz):.1f}x)")
+    if br is not None:
+        print(f"  brotli (quality 4)    : {len(br):>10,} bytes  ({len(raw) / len(br):.1f}x)")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    bench("/resources/vaccines", _vaccines(n), VaccineOut)
+    bench("/resources/cases", _cases(n), CaseOut)
+
+
+if __name__ == "__main__":
+    main()
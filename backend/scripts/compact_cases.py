@@ -0,0 +1,59 @@
+"""
+Case-base compaction: report (and optionally delete) near-duplicate cases.
+
+Cases are grouped per scenario_type/vaccine_id; within a group, cases whose
+retrieval similarity is at least --threshold are merged into the lowest id.
+
+Usage:
+  python scripts/compact_cases.py [--threshold 0.9] [--merge] [--json report.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.db.session import SessionLocal
+from app.models.destination import Destination  # noqa: F401
+from app.models.destination_vaccine import DestinationVaccine  # noqa: F401
+from app.services.case_maintenance import compact_case_base
+
+
+def _stats(label: str, s: dict) -> str:
+    return f"{label}: {s['cases']} cases, assessment p50 {s['assessment_p50_ms']} ms, max {s['assessment_max_ms']} ms"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--merge", action="store_true", help="delete the redundant cases")
+    parser.add_argument("--json", help="also write the full report to this file")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        report = compact_case_base(db, threshold=args.threshold, merge=args.merge)
+
+    for block in report["blocks"]:
+        redundant = sum(len(g["duplicate_ids"]) for g in block["groups"])
+        print(
+            f"{block['scenario_type'] or '-':15} vaccine {block['vaccine_id']:<5} "
+            f"{block['cases']:6d} cases  {len(block['groups']):4d} groups  {redundant:6d} redundant"
+        )
+    print(f"\nredundant cases: {report['redundant_cases']} (threshold {report['threshold']})")
+    print(_stats("before", report["before"]))
+    if report["after"]:
+        print(_stats("after ", report["after"]))
+    elif report["redundant_cases"]:
+        print("re-run with --merge to delete them")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
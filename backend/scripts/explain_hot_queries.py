@@ -0,0 +1,85 @@
+"""
+Query-plan check for the hot lookups (Postgres).
+
+Runs EXPLAIN on each hot query and exits non-zero when the plan contains a
+sequential scan over a table with more than --max-seq-rows estimated rows.
+Small tables are allowed to seq-scan: that is what the planner should pick.
+
+Usage:
+  python scripts/explain_hot_queries.py [--max-seq-rows 1000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import Iterator, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+HOT_QUERIES: List[Tuple[str, str, dict]] = [
+    ("list_cases?scenario_type", "SELECT * FROM cases WHERE scenario_type = :v", {"v": "bite"}),
+    ("list_cases?vaccine_id", "SELECT * FROM cases WHERE vaccine_id = :v", {"v": 1}),
+    ("delete_vaccine: cases check", "SELECT 1 FROM cases WHERE vaccine_id = :v LIMIT 1", {"v": 1}),
+    (
+        "delete_vaccine: links check",
+        "SELECT 1 FROM destination_vaccines WHERE vaccine_id = :v LIMIT 1",
+        {"v": 1},
+    ),
+    (
+        "seed: destination by source_url",
+        "SELECT * FROM destinations WHERE source_url = :v LIMIT 1",
+        {"v": "https://www.pasteur.fr/fr/centre-medical/fiches-pays/france"},
+    ),
+    (
+        "seed: case by problem_text",
+        "SELECT * FROM cases WHERE problem_text = :v LIMIT 1",
+        {"v": "bite: patient needs advice"},
+    ),
+]
+
+
+def _nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []) or []:
+        yield from _nodes(child)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-seq-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("explain_hot_queries: Postgres only")
+        return 2
+
+    failures = 0
+    with engine.connect() as conn:
+        for label, sql, params in HOT_QUERIES:
+            plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar()[0]["Plan"]
+            bad = []
+            for node in _nodes(plan):
+                if node.get("Node Type") != "Seq Scan":
+                    continue
+                rel = node.get("Relation Name")
+                reltuples = conn.execute(
+                    text("SELECT reltuples FROM pg_class WHERE relname = :r"), {"r": rel}
+                ).scalar() or 0
+                if reltuples > args.max_seq_rows:
+                    bad.append(f"Seq Scan on {rel} (~{int(reltuples)} rows)")
+
+            status = "FAIL" if bad else "ok"
+            top = plan.get("Node Type")
+            print(f"[{status:4}] {label:35} {top}{' -- ' + '; '.join(bad) if bad else ''}")
+            failures += bool(bad)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
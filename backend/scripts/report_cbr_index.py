@@ -0,0 +1,98 @@
+"""
+CBR index memory report: the compact index (float32 / int32, optional char
+vocabulary pruning, memory budget) against the float64 reference.
+
+Prints the bytes held by each part of both indexes, then replays a sample of
+stored case texts as queries through both and reports how much the ranking
+moved (top-1 agreement, top-k overlap, largest score difference).
+
+Usage:
+  python scripts/report_cbr_index.py [--samples 200] [--top-k 5]
+      [--char-max-features N] [--char-min-df N] [--budget-mb MB]
+
+Settings default to the CBR_* environment variables used by the app.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.db.session import SessionLocal
+from app.models.case import Case
+from app.models.destination import Destination  # noqa: F401
+from app.models.destination_vaccine import DestinationVaccine  # noqa: F401
+from app.services import cbr
+
+
+def _build(cases, **kwargs):
+    t0 = time.perf_counter()
+    index = cbr.CaseIndex(cases, 0, **kwargs)
+    return index, time.perf_counter() - t0
+
+
+def _mb(n: int) -> str:
+    return f"{n / 2**20:9.2f} MB"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=200, help="queries replayed for the ranking comparison")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--char-max-features", type=int, default=cbr.CBR_CHAR_MAX_FEATURES)
+    parser.add_argument("--char-min-df", type=int, default=cbr.CBR_CHAR_MIN_DF)
+    parser.add_argument("--budget-mb", type=float, default=cbr.CBR_INDEX_MEMORY_BUDGET_MB)
+    args = parser.parse_args()
+
+    cbr.CBR_CHAR_MAX_FEATURES = args.char_max_features
+    cbr.CBR_CHAR_MIN_DF = args.char_min_df
+
+    with SessionLocal() as db:
+        cases = db.query(Case).order_by(Case.id).all()
+        if not cases:
+            print("no cases")
+            return 0
+        reference, ref_s = _build(cases, compact=False, memory_budget_mb=0)
+        compact, compact_s = _build(cases, compact=True, memory_budget_mb=args.budget_mb)
+
+        print(
+            f"{len(cases)} cases; compact: char max_features={args.char_max_features or '-'} "
+            f"min_df={args.char_min_df} budget={args.budget_mb or '-'} MB"
+            f"{' (scenario groups as views)' if compact.views else ''}\n"
+        )
+        ref_bytes, compact_bytes = reference.nbytes(), compact.nbytes()
+        print(f"{'part':15} {'float64':>12} {'compact':>12}")
+        for part in sorted(set(ref_bytes) | set(compact_bytes)):
+            print(f"{part:15} {_mb(ref_bytes.get(part, 0)):>12} {_mb(compact_bytes.get(part, 0)):>12}")
+        ref_total, compact_total = sum(ref_bytes.values()), sum(compact_bytes.values())
+        print(f"{'total':15} {_mb(ref_total):>12} {_mb(compact_total):>12}  ({compact_total / ref_total:.0%})")
+        print(f"{'build time':15} {ref_s:11.2f}s {compact_s:11.2f}s")
+
+        sample = random.Random(0).sample(cases, min(args.samples, len(cases)))
+        top1 = overlap = 0
+        max_diff = 0.0
+        for c in sample:
+            a = cbr.rank_cases(db, reference, c.problem_text, c.scenario_type, args.top_k)
+            b = cbr.rank_cases(db, compact, c.problem_text, c.scenario_type, args.top_k)
+            ids_a, ids_b = [r["case_id"] for r in a], [r["case_id"] for r in b]
+            top1 += bool(ids_a) and ids_a[:1] == ids_b[:1]
+            overlap += len(set(ids_a) & set(ids_b)) / max(1, len(ids_a))
+            scores_b = {r["case_id"]: r["score"] for r in b}
+            for r in a:
+                if r["case_id"] in scores_b:
+                    max_diff = max(max_diff, abs(r["score"] - scores_b[r["case_id"]]))
+
+        n = len(sample)
+        print(f"\nranking vs float64 over {n} queries (top-{args.top_k}):")
+        print(f"  top-1 agreement   {top1 / n:.1%}")
+        print(f"  top-k overlap     {overlap / n:.1%}")
+        print(f"  max score change  {max_diff:.2e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
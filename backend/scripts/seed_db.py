@@ -2,16 +2,18 @@ from __future__ import annotations
 
 import os
 import sys
+import time
 from decimal import Decimal
 from datetime import datetime
-from typing import List
+from typing import Iterator, List
 
 # Fix Python path for script execution
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from sqlalchemy import text
 
-from app.core.security import hash_password, verify_password
+from app.core.cache import RedisCache, get_backend
+from app.core.security import PRINCIPAL_CACHE_TTL, hash_password, invalidate_principal, verify_password
 from app.db.session import SessionLocal
 from app.models.user import User
 from app.models.vaccine import Vaccine
@@ -19,10 +21,15 @@ from app.models.case import Case
 from app.models.destination import Destination
 from app.models.destination_vaccine import DestinationVaccine
 
+from app.services.catalog import catalog
+from app.services.cbr import bump_case_base_version, derived_case_fields
 from app.services.travel_scraper import fetch_country_index
 
 IPT_PRICE_SOURCE_URL = "https://pasteur.tn/vp"
 
+# Rows per executemany batch / commit
+SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", "5000"))
+
 OFFICIAL_IPT_VACCINES: List[dict] = [
     {"name": "Yellow Fever (multi-dose)", "price_tnd": None, "note": "Marked as not available on IPT website."},
     {"name": "Yellow Fever (single-dose)", "price_tnd": Decimal("92.000"), "note": None},
@@ -88,6 +95,7 @@ def seed_staff_users(db):
 
     created = 0
     updated = 0
+    changed_users: List[str] = []
 
     for username, plain_pw, role in staff:
         u = db.query(User).filter(User.username == username).first()
@@ -117,31 +125,65 @@ def seed_staff_users(db):
 
         if changed:
             updated += 1
+            changed_users.append(username)
 
     db.commit()
+    if changed_users:
+        if isinstance(get_backend(), RedisCache):
+            for username in changed_users:
+                invalidate_principal(username)
+        else:
+            # this process's memory cache is not the API workers' cache
+            print(
+                f"  note: running API workers may keep the old role/password of {', '.join(changed_users)} "
+                f"cached for up to PRINCIPAL_CACHE_TTL={PRINCIPAL_CACHE_TTL:g}s (set a shared CACHE_URL to invalidate)"
+            )
     print(f"✅ Seeded staff users: created={created}, updated={updated}, total={db.query(User).count()}")
 
 
-def upsert_ipt_vaccines(db):
-    now = datetime.utcnow()
+def _insert(db, model):
+    """Dialect-specific INSERT (supports ON CONFLICT on Postgres and SQLite)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
 
-    for item in OFFICIAL_IPT_VACCINES:
-        name = item["name"]
-        price = item["price_tnd"]
-        note = item.get("note")
+def _chunks(rows: List[dict], size: int = SEED_BATCH_SIZE) -> Iterator[List[dict]]:
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
 
-        v = db.query(Vaccine).filter(Vaccine.name == name).first()
-        if not v:
-            v = Vaccine(name=name)
 
-        v.description = "Official Institut Pasteur de Tunis item (English)." + (f" {note}" if note else "")
-        v.currency = "TND"
-        v.price_source_url = IPT_PRICE_SOURCE_URL
-        v.price_updated_at = now
-        v.price_tnd = price
+def _progress(label: str, done: int, total: int, t0: float) -> None:
+    elapsed = time.perf_counter() - t0
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"  {label}: {done}/{total} ({rate:,.0f} rows/s)")
 
-        db.add(v)
 
+def upsert_ipt_vaccines(db):
+    now = datetime.utcnow()
+
+    rows = [
+        {
+            "name": item["name"],
+            "description": "Official Institut Pasteur de Tunis item (English)."
+            + (f" {item['note']}" if item.get("note") else ""),
+            "currency": "TND",
+            "price_source_url": IPT_PRICE_SOURCE_URL,
+            "price_updated_at": now,
+            "price_tnd": item["price_tnd"],
+        }
+        for item in OFFICIAL_IPT_VACCINES
+    ]
+
+    stmt = _insert(db, Vaccine)
+    updated = ("description", "currency", "price_source_url", "price_updated_at", "price_tnd")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Vaccine.name],
+        set_={c: stmt.excluded[c] for c in updated},
+    )
+    db.execute(stmt, rows)
     db.commit()
 
 
@@ -151,31 +193,36 @@ def seed_destinations_from_pasteur_fr(db):
     """
     items = fetch_country_index(timeout=30)
 
-    added = 0
-    for it in items:
-        name = it["name"]
-        url = it["url"]
-
-        exists = db.query(Destination).filter(Destination.source_url == url).first()
-        if exists:
-            continue
+    existing = {url for (url,) in db.query(Destination.source_url).filter(Destination.source_url.is_not(None))}
+    rows = [
+        {"name": it["name"], "group_code": "PASTEUR_FR", "source_url": it["url"]}
+        for it in items
+        if it["url"] not in existing
+    ]
 
-        dest = Destination(name=name, group_code="PASTEUR_FR", source_url=url)
-        db.add(dest)
-        added += 1
+    before = db.query(Destination).count()
+    t0 = time.perf_counter()
+    done = 0
+    for chunk in _chunks(rows):
+        db.execute(_insert(db, Destination).on_conflict_do_nothing(), chunk)
+        db.commit()
+        done += len(chunk)
+        _progress("destinations", done, len(rows), t0)
 
-    db.commit()
+    added = db.query(Destination).count() - before
     print(f"Seeded destinations from Pasteur.fr: +{added}")
 
 
-def seed_symptom_cases(db):
-    """
-    Seeds demo cases for CBR.
-    """
-    added = 0
+def _symptom_case_rows(db) -> List[dict]:
+    vaccine_ids = {
+        name: vid
+        for vid, name in db.query(Vaccine.id, Vaccine.name).filter(Vaccine.name.in_(SCENARIO_TO_VACCINE.values()))
+    }
+
+    rows: List[dict] = []
     for scenario, vaccine_name in SCENARIO_TO_VACCINE.items():
-        vaccine = db.query(Vaccine).filter(Vaccine.name == vaccine_name).first()
-        if not vaccine:
+        vaccine_id = vaccine_ids.get(vaccine_name)
+        if vaccine_id is None:
             continue
 
         prompts = [
@@ -185,17 +232,56 @@ def seed_symptom_cases(db):
             f"{scenario}: what vaccine is recommended?",
             f"{scenario}: consult travel clinic recommendation",
         ]
+        rows.extend({"problem_text": p, "scenario_type": scenario, "vaccine_id": vaccine_id} for p in prompts)
+
+    # Optional synthetic load for benchmarks / large environments
+    synthetic = int(os.getenv("SEED_SYNTHETIC_CASES", "0"))
+    if synthetic > 0 and vaccine_ids:
+        scenarios = [(s, vaccine_ids[v]) for s, v in SCENARIO_TO_VACCINE.items() if v in vaccine_ids]
+        for i in range(synthetic):
+            scenario, vaccine_id = scenarios[i % len(scenarios)]
+            rows.append(
+                {
+                    "problem_text": f"{scenario}: synthetic traveller case #{i}",
+                    "scenario_type": scenario,
+                    "vaccine_id": vaccine_id,
+                }
+            )
+    return rows
+
 
-        for p in prompts:
-            exists = db.query(Case).filter(Case.problem_text == p).first()
-            if exists:
+def insert_cases(db, rows: List[dict], label: str = "cases") -> int:
+    """
+    Idempotent bulk insert: Case has no natural unique key, so each chunk
+    skips texts that already exist (one set-based lookup per chunk, served by
+    ix_cases_problem_text_hash) and inserts the rest with executemany.
+    """
+    added = 0
+    t0 = time.perf_counter()
+    seen = set()
+    for i, chunk in enumerate(_chunks(rows), start=1):
+        texts = [r["problem_text"] for r in chunk]
+        existing = {t for (t,) in db.query(Case.problem_text).filter(Case.problem_text.in_(texts))}
+        fresh = []
+        for r in chunk:
+            if r["problem_text"] in existing or r["problem_text"] in seen:
                 continue
+            seen.add(r["problem_text"])
+            fresh.append({**r, **derived_case_fields(r["problem_text"], r.get("scenario_type"))})
+        if fresh:
+            db.execute(_insert(db, Case), fresh)
+            added += len(fresh)
+        db.commit()
+        if i % 10 == 0 or i * SEED_BATCH_SIZE >= len(rows):
+            _progress(label, min(i * SEED_BATCH_SIZE, len(rows)), len(rows), t0)
+    return added
 
-            c = Case(problem_text=p, scenario_type=scenario, vaccine_id=vaccine.id)
-            db.add(c)
-            added += 1
 
-    db.commit()
+def seed_symptom_cases(db):
+    """
+    Seeds demo cases for CBR.
+    """
+    added = insert_cases(db, _symptom_case_rows(db))
     print(f"Seeded symptom cases: +{added} (total now {db.query(Case).count()})")
 
 
@@ -203,37 +289,29 @@ def seed_destination_vaccine_links(db):
     """
     Simple demo links: attach a few vaccines to a few destinations.
     """
-    destinations = db.query(Destination).limit(20).all()
-    vaccines = db.query(Vaccine).limit(8).all()
+    destination_ids = [d for (d,) in db.query(Destination.id).order_by(Destination.id).limit(10)]
+    vaccine_ids = [v for (v,) in db.query(Vaccine.id).order_by(Vaccine.id).limit(4)]
 
-    if not destinations or not vaccines:
+    if not destination_ids or not vaccine_ids:
         return
 
-    added = 0
-    for d in destinations[:10]:
-        for v in vaccines[:4]:
-            exists = (
-                db.query(DestinationVaccine)
-                .filter(
-                    DestinationVaccine.destination_id == d.id,
-                    DestinationVaccine.vaccine_id == v.id,
-                )
-                .first()
-            )
-            if exists:
-                continue
-
-            link = DestinationVaccine(
-                destination_id=d.id,
-                vaccine_id=v.id,
-                requirement_level="recommended",
-                notes="Demo seeded recommendation",
-            )
-            db.add(link)
-            added += 1
+    now = datetime.utcnow()
+    rows = [
+        {
+            "destination_id": d,
+            "vaccine_id": v,
+            "requirement_level": "recommended",
+            "notes": "Demo seeded recommendation",
+            "created_at": now,
+        }
+        for d in destination_ids
+        for v in vaccine_ids
+    ]
 
+    before = db.query(DestinationVaccine).count()
+    db.execute(_insert(db, DestinationVaccine).on_conflict_do_nothing(), rows)
     db.commit()
-    print(f"Seeded destination-vaccine links: +{added}")
+    print(f"Seeded destination-vaccine links: +{db.query(DestinationVaccine).count() - before}")
 
 
 def main():
@@ -241,15 +319,24 @@ def main():
     try:
         maybe_reset(db)
 
-        seed_staff_users(db)
-        upsert_ipt_vaccines(db)
-        seed_destinations_from_pasteur_fr(db)
-        seed_symptom_cases(db)
-        seed_destination_vaccine_links(db)
-
-        print("Seeding done.")
+        t0 = time.perf_counter()
+        for step in (
+            seed_staff_users,
+            upsert_ipt_vaccines,
+            seed_destinations_from_pasteur_fr,
+            seed_symptom_cases,
+            seed_destination_vaccine_links,
+        ):
+            t = time.perf_counter()
+            step(db)
+            print(f"  {step.__name__}: {time.perf_counter() - t:.2f}s")
+
+        print(f"Seeding done in {time.perf_counter() - t0:.2f}s.")
     finally:
         db.close()
+        # even after a partial run: running workers reload the vaccine catalog and refit the CBR index
+        catalog.invalidate()
+        bump_case_base_version()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+"""
+Test configuration. The app reads its settings from the environment at import
+time, so a throwaway SQLite database (or TEST_DATABASE_URL) is configured here,
+before any app module is imported.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='pasteurhub-tests-')}/test.db"
+)
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ["CACHE_URL"] = "memory://"
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    """Schema plus a small catalog: 9 vaccines, 22 cases, 2 destinations, an admin."""
+    from app.core.security import hash_password
+    from app.db.init_db import init_db
+    from app.db.session import SessionLocal
+    from app.models.case import Case
+    from app.models.destination import Destination
+    from app.models.destination_vaccine import DestinationVaccine
+    from app.models.user import User
+    from app.models.vaccine import Vaccine
+
+    init_db()
+    with SessionLocal() as db:
+        db.add_all(Vaccine(name=f"V{i}", description="d", price_tnd=i if i % 3 else None) for i in range(1, 10))
+        db.flush()
+        db.add_all(
+            [
+                Case(problem_text="dog bite while travelling", scenario_type="bite", vaccine_id=1),
+                Case(problem_text="fever after a mosquito bite", scenario_type="fever", vaccine_id=2),
+                *(
+                    Case(problem_text=f"case {i}: scratched by a cat abroad", scenario_type="bite", vaccine_id=i % 9 + 1)
+                    for i in range(20)
+                ),
+                Destination(name="France", source_url="http://127.0.0.1:1/france"),
+                Destination(name="Peru", source_url="http://127.0.0.1:1/peru"),
+                User(username="admin@example.com", password_hash=hash_password("pw"), role="admin"),
+            ]
+        )
+        db.flush()
+        db.add(DestinationVaccine(destination_id=1, vaccine_id=2, requirement_level="required"))
+        db.add_all(DestinationVaccine(destination_id=1, vaccine_id=v, requirement_level="recommended") for v in range(4, 9))
+        db.commit()
+    yield SessionLocal
+
+
+@pytest.fixture(scope="session")
+def client(seeded_db):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    r = client.post("/auth/login", json={"username": "admin@example.com", "password": "pw"})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+@pytest.fixture
+def query_budget():
+    """
+    app.db.session.query_budget: counts every statement the process runs in the
+    block (the TestClient app runs in another thread) and fails over budget.
+
+        def test_vaccines(client, query_budget):
+            with query_budget(1):
+                client.get("/resources/vaccines")
+    """
+    from app.db.session import query_budget
+
+    return query_budget
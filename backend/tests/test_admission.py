@@ -0,0 +1,121 @@
+import asyncio
+import itertools
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.admission import AdmissionLimiter
+
+_pools = itertools.count()
+
+
+def _limiter(max_concurrent=1, max_queue=2, queue_timeout=5.0) -> AdmissionLimiter:
+    return AdmissionLimiter(f"test-{next(_pools)}", max_concurrent, max_queue, queue_timeout)
+
+
+async def _queued(limiter, n):
+    # let spawned acquire() calls reach the queue
+    while len(limiter._waiters) < n:
+        await asyncio.sleep(0)
+
+
+def test_queue_full_is_rejected_with_retry_after():
+    async def run():
+        limiter = _limiter(max_concurrent=1, max_queue=1)
+        limiter._service_seconds = 3.0
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await _queued(limiter, 1)
+        with pytest.raises(HTTPException) as e:
+            await limiter.acquire()
+        limiter.release()
+        await waiter
+        limiter.release()
+        return limiter, e.value
+
+    limiter, e = asyncio.run(run())
+    assert e.status_code == 503
+    assert e.headers["Retry-After"] == "6"  # (1 queued + us) * 3 s per slot
+    assert (limiter.active, len(limiter._waiters)) == (0, 0)
+
+
+def test_queue_timeout_is_rejected_with_retry_after():
+    async def run():
+        limiter = _limiter(max_concurrent=1, queue_timeout=0.05)
+        await limiter.acquire()
+        with pytest.raises(HTTPException) as e:
+            await limiter.acquire()
+        state = (limiter.active, len(limiter._waiters))
+        limiter.release()
+        return limiter, state, e.value
+
+    limiter, state, e = asyncio.run(run())
+    assert state == (1, 0)  # the timed-out waiter left the queue
+    assert e.status_code == 503
+    assert int(e.headers["Retry-After"]) >= 1
+    assert limiter.active == 0
+
+
+def test_slots_are_handed_over_in_fifo_order():
+    order = []
+
+    async def worker(limiter, name):
+        async with limiter.slot():
+            order.append(name)
+            await asyncio.sleep(0.001)
+
+    async def run():
+        limiter = _limiter(max_concurrent=1, max_queue=5)
+        await limiter.acquire()
+        tasks = []
+        for name in "abcde":
+            tasks.append(asyncio.create_task(worker(limiter, name)))
+            await _queued(limiter, len(tasks))
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert order == list("abcde")
+    assert limiter.active == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        limiter = _limiter(max_concurrent=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await _queued(limiter, 1)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert len(limiter._waiters) == 0
+        limiter.release()
+        assert limiter.active == 0
+        await asyncio.wait_for(limiter.acquire(), 0.1)  # the slot is free, not leaked
+        limiter.release()
+        return limiter
+
+    assert asyncio.run(run()).active == 0
+
+
+def test_waiter_cancelled_during_hand_over_returns_the_slot():
+    async def request(limiter):
+        async with limiter.slot():
+            pass
+
+    async def run():
+        limiter = _limiter(max_concurrent=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(request(limiter))
+        await _queued(limiter, 1)
+        limiter.release()  # slot handed to the waiter...
+        waiter.cancel()  # ...which goes away before it runs
+        # depending on the Python version the cancellation or the hand-over wins;
+        # either way the slot must end up free
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert (limiter.active, len(limiter._waiters)) == (0, 0)
@@ -0,0 +1,37 @@
+import asyncio
+
+from app.core import security
+from app.core.security import hash_password, verify_password_async
+from app.resources.auth import ip_limiter, username_limiter
+
+
+def test_password_slots_work_across_event_loops(monkeypatch):
+    monkeypatch.setattr(security, "_PBKDF2_ITERS", 1_000)
+    stored = hash_password("secret")
+
+    async def burst():
+        # more callers than PASSWORD_HASH_WORKERS, so some wait on the semaphore
+        calls = [verify_password_async("secret", stored) for _ in range(security.PASSWORD_HASH_WORKERS * 3)]
+        return await asyncio.gather(*calls)
+
+    assert all(asyncio.run(burst()))
+    assert all(asyncio.run(burst()))  # a fresh loop gets its own slots
+
+
+def test_login_throttles_off_the_event_loop(client, seeded_db, monkeypatch):
+    seen = []
+
+    def check(key, detail=None):
+        try:
+            asyncio.get_running_loop()
+            seen.append("loop")
+        except RuntimeError:
+            seen.append("thread")
+
+    monkeypatch.setattr(ip_limiter, "check", check)
+    monkeypatch.setattr(username_limiter, "check", check)
+    monkeypatch.setattr(username_limiter, "reset", lambda key: check(key))
+
+    r = client.post("/auth/login", json={"username": "admin@example.com", "password": "pw"})
+    assert r.status_code == 200
+    assert seen == ["thread", "thread", "thread"]
@@ -0,0 +1,149 @@
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from app.core.cache import Cache, MemoryCache, RedisCache
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryCache()
+    return RedisCache(client=fakeredis.FakeRedis())
+
+
+@pytest.fixture
+def cache(backend):
+    return Cache(backend, "test")
+
+
+def test_get_set_roundtrip(cache):
+    assert cache.get("missing") is None
+    assert cache.get("missing", "default") == "default"
+    cache.set("k", {"a": [1, 2], "b": None})
+    assert cache.get("k") == {"a": [1, 2], "b": None}
+    cache.delete("k")
+    assert cache.get("k") is None
+
+
+def test_ttl_expires(cache):
+    cache.set("k", 1, ttl=0.05)
+    assert cache.get("k") == 1
+    time.sleep(0.1)
+    assert cache.get("k") is None
+
+
+def test_incr(cache):
+    assert cache.incr("n") == 1
+    assert cache.incr("n") == 2
+    assert cache.get("n") == 2
+
+
+def test_incr_ttl_applies_on_create(cache):
+    cache.incr("n", ttl=0.05)
+    cache.incr("n", ttl=10)  # does not extend the window
+    time.sleep(0.1)
+    assert cache.incr("n", ttl=10) == 1
+
+
+def test_add_only_when_absent(backend):
+    assert backend.add("k", b"1", 10)
+    assert not backend.add("k", b"2", 10)
+    assert backend.get("k") == b"1"
+
+
+def test_namespaces_are_isolated(backend):
+    Cache(backend, "a").set("k", 1)
+    assert Cache(backend, "b").get("k") is None
+
+
+def _race(caches, n_threads=10):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"value": 42}
+
+    results = []
+    barrier = threading.Barrier(n_threads)
+
+    def worker(i):
+        barrier.wait()
+        results.append(caches[i % len(caches)].get_or_set("k", loader, ttl=10))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return calls, results
+
+
+def test_get_or_set_single_flight_in_process(cache):
+    calls, results = _race([cache])
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 10
+
+
+def test_get_or_set_single_flight_across_nodes():
+    # two Cache views with their own local locks over one Redis: the SET NX lock serializes them
+    server = fakeredis.FakeServer()
+    nodes = [Cache(RedisCache(client=fakeredis.FakeRedis(server=server)), "test") for _ in range(2)]
+    calls, results = _race(nodes)
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 10
+
+
+def test_get_or_set_releases_locks(cache):
+    for i in range(100):
+        cache.get_or_set(f"k{i}", lambda: i)
+    assert cache._locks == {}
+    assert cache.backend.get(cache._key("lock:k0")) is None
+
+
+def test_get_or_set_loader_error_releases_lock(cache):
+    def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_set("k", boom)
+    assert cache._locks == {}
+    assert cache.get_or_set("k", lambda: "ok") == "ok"
+
+
+def test_get_or_set_wait_is_bounded_by_lock_timeout(cache):
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        time.sleep(1.0)
+        return "slow"
+
+    leader = threading.Thread(target=cache.get_or_set, args=("k", slow))
+    leader.start()
+    started.wait()
+    t0 = time.perf_counter()
+    assert cache.get_or_set("k", lambda: "own", lock_timeout=0.2) == "own"
+    assert time.perf_counter() - t0 < 0.5
+    leader.join()
+
+
+def test_get_or_set_cross_node_wait_is_bounded_by_lock_timeout(backend):
+    node_a, node_b = Cache(backend, "test"), Cache(backend, "test")
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        time.sleep(1.0)
+        return "slow"
+
+    leader = threading.Thread(target=node_a.get_or_set, args=("k", slow))
+    leader.start()
+    started.wait()
+    t0 = time.perf_counter()
+    assert node_b.get_or_set("k", lambda: "own", lock_timeout=0.2) == "own"
+    assert time.perf_counter() - t0 < 0.5
+    leader.join()
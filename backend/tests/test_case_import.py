@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from app.models.case import Case
+from app.services.case_import import iter_lines
+from app.services.cbr import case_base_version
+
+MARKER = "imported:"
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def _next_chunk(chunks):
+    it = iter(chunks)
+    return lambda: next(it, None)
+
+
+@pytest.fixture
+def upload(client, admin_headers, seeded_db):
+    """POST a body to /resources/cases/import in chunks; imported cases are removed afterwards."""
+
+    def post(body: bytes, content_type: str, chunk_size: int = 7):
+        return client.post(
+            "/resources/cases/import",
+            content=iter(_chunks(body, chunk_size)),
+            headers={**admin_headers, "Content-Type": content_type},
+        )
+
+    yield post
+    with seeded_db() as db:
+        db.query(Case).filter(Case.problem_text.like(f"{MARKER}%")).delete(synchronize_session=False)
+        db.commit()
+
+
+def _ndjson(*records) -> bytes:
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode()
+
+
+def test_iter_lines_splits_on_newline_only():
+    text = 'a b\x0bc\x0cd\x1ce\u0085f\r\nsecond\nthird'
+    assert list(iter_lines(_next_chunk(_chunks(text.encode(), 3)))) == ['a b\x0bc\x0cd\x1ce\u0085f\r\n', "second\n", "third"]
+
+
+def test_iter_lines_handles_split_utf8_and_bom():
+    data = "﻿é\nà".encode()
+    for size in range(1, len(data) + 1):
+        assert list(iter_lines(_next_chunk(_chunks(data, size)))) == ["é\n", "à"]
+
+
+def test_ndjson_multi_chunk_upload(upload):
+    records = [{"problem_text": f"{MARKER} dog bite number {i}", "scenario_type": "bite", "vaccine_id": 1} for i in range(25)]
+    before = case_base_version()
+    r = upload(_ndjson(*records), "application/x-ndjson", chunk_size=5)  # records span chunk boundaries
+    assert r.status_code == 200
+    assert r.json() == {"received": 25, "inserted": 25, "failed": 0, "errors": [], "errors_truncated": False}
+    assert case_base_version() > before
+
+
+def test_ndjson_record_with_line_separator(upload):
+    body = _ndjson(
+        {"problem_text": f"{MARKER} bitten by a dog", "vaccine_id": 1},
+        {"problem_text": f"{MARKER} line\u2028separator", "vaccine_id": 1},
+    )
+    assert upload(body, "application/x-ndjson").json()["inserted"] == 2
+
+
+def test_invalid_rows_are_reported(upload):
+    body = (
+        _ndjson({"problem_text": f"{MARKER} valid row", "vaccine_id": 1})
+        + b"{not json\n"
+        + _ndjson({"problem_text": "x", "vaccine_id": 1}, {"problem_text": f"{MARKER} unknown vaccine", "vaccine_id": 999})
+    )
+    before = case_base_version()
+    report = upload(body, "application/x-ndjson").json()
+    assert (report["received"], report["inserted"], report["failed"]) == (4, 1, 3)
+    rows = {e["row"]: e["error"] for e in report["errors"]}
+    assert rows[2].startswith("invalid JSON")
+    assert rows[3].startswith("problem_text")
+    assert rows[4] == "vaccine_id: unknown vaccine 999"
+    assert case_base_version() > before
+
+
+def test_csv_upload_with_quoted_newline(upload):
+    body = f'problem_text,scenario_type,vaccine_id\r\n"{MARKER} first\nline",bite,1\r\n{MARKER} second,,2\r\n'.encode()
+    report = upload(body, "text/csv", chunk_size=4).json()
+    assert (report["received"], report["inserted"], report["failed"]) == (2, 2, 0)
+
+
+def test_nothing_inserted_keeps_the_version(upload):
+    before = case_base_version()
+    report = upload(b"{broken\n", "application/x-ndjson").json()
+    assert report["inserted"] == 0
+    assert case_base_version() == before
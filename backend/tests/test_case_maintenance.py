@@ -0,0 +1,116 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.db.init_db  # noqa: F401  (registers every mapped model)
+from app.db.base import Base
+from app.models.case import Case
+from app.models.vaccine import Vaccine
+from app.services import case_maintenance, cbr, data_version
+from app.services.case_maintenance import _embed, compact_case_base, find_duplicate_groups
+from app.services.cbr import case_base_version, tokenize
+
+DOG = [
+    "bitten by a stray dog in the market, deep wound on the leg",
+    "Bitten by a stray dog in the market - deep wound on the leg.",
+    "bitten by a stray dog at the market, deep wound on the leg",
+]
+OTHER = "mosquito bites during a trek, high fever three days later"
+
+
+@pytest.fixture
+def case_db(seeded_db, monkeypatch):
+    """A separate case base; the shared CBR index is rebuilt from the test DB afterwards."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([Vaccine(id=1, name="V1"), Vaccine(id=2, name="V2")])
+        db.commit()
+    monkeypatch.setattr(cbr, "_index", None)
+    monkeypatch.setattr(data_version, "DATA_VERSION_CHECK_SECONDS", 0)
+    yield Session
+    cbr.bump_case_base_version()
+
+
+def _add(Session, *cases):
+    with Session() as db:
+        db.add_all(Case(id=cid, problem_text=text, scenario_type=scenario, vaccine_id=v) for cid, text, scenario, v in cases)
+        db.commit()
+
+
+def _ids(Session):
+    with Session() as db:
+        return sorted(cid for (cid,) in db.query(Case.id))
+
+
+def test_groups_are_blocked_by_scenario_and_vaccine(case_db):
+    _add(
+        case_db,
+        (5, DOG[0], "bite", 1),
+        (3, DOG[1], "bite", 1),
+        (9, DOG[2], "bite", 1),
+        (4, OTHER, "bite", 1),
+        (7, DOG[0], "bite", 2),  # same text, other vaccine: not redundant
+        (8, DOG[0], "Bite ", 1),  # scenario is normalized for blocking
+    )
+    with case_db() as db:
+        report = find_duplicate_groups(db, threshold=0.8)
+    assert report == [
+        {
+            "scenario_type": "bite",
+            "vaccine_id": 1,
+            "cases": 5,
+            "groups": [{"keep_id": 3, "duplicate_ids": [5, 8, 9], "min_similarity": report[0]["groups"][0]["min_similarity"]}],
+        }
+    ]
+    assert 0.8 <= report[0]["groups"][0]["min_similarity"] <= 1.0
+
+
+def test_dry_run_leaves_the_db_untouched(case_db):
+    _add(case_db, (1, DOG[0], "bite", 1), (2, DOG[1], "bite", 1), (3, OTHER, "bite", 1))
+    version = case_base_version()
+    with case_db() as db:
+        out = compact_case_base(db, threshold=0.8)
+    assert (out["merged"], out["redundant_cases"], out["after"]) == (False, 1, None)
+    assert out["before"]["cases"] == 3
+    assert _ids(case_db) == [1, 2, 3]
+    assert case_base_version() == version
+
+
+def test_merge_keeps_the_lowest_id_and_bumps_the_version(case_db):
+    _add(case_db, (4, DOG[0], "bite", 1), (2, DOG[1], "bite", 1), (6, DOG[2], "bite", 1), (3, OTHER, "bite", 1))
+    version = case_base_version()
+    with case_db() as db:
+        out = compact_case_base(db, threshold=0.8, merge=True)
+    assert (out["merged"], out["redundant_cases"]) == (True, 2)
+    assert _ids(case_db) == [2, 3]
+    assert out["after"]["cases"] == 2
+    assert case_base_version() > version
+    assert cbr._index.case_ids == [2, 3]  # the index was refit from the compacted case base
+
+
+def test_chains_are_merged_transitively(case_db):
+    a = "rabies shot after a monkey bite in bali temple"
+    b = "rabies shot after a monkey bite in a bali temple garden"
+    c = "second rabies shot after a monkey bite in a bali temple garden today"
+    mat = _embed([a, b, c], [tokenize(t) for t in (a, b, c)])
+    sims = (mat @ mat.T).toarray()
+    threshold = (sims[0, 2] + min(sims[0, 1], sims[1, 2])) / 2
+    assert sims[0, 2] < threshold <= min(sims[0, 1], sims[1, 2])  # A~B, B~C, but not A~C
+
+    _add(case_db, (1, a, "bite", 1), (2, b, "bite", 1), (3, c, "bite", 1))
+    with case_db() as db:
+        groups = find_duplicate_groups(db, threshold=threshold)[0]["groups"]
+    assert [(g["keep_id"], g["duplicate_ids"]) for g in groups] == [(1, [2, 3])]
+    assert groups[0]["min_similarity"] == round(min(sims[0, 1], sims[1, 2]), 4)
+
+
+def test_lsh_finds_the_same_groups(case_db, monkeypatch):
+    _add(case_db, *((i, DOG[i % 3] + f" case {i // 3}", "bite", 1) for i in range(1, 13)), (20, OTHER, "bite", 1))
+    with case_db() as db:
+        exact = find_duplicate_groups(db, threshold=0.8)
+        monkeypatch.setattr(case_maintenance, "DEDUP_EXACT_BLOCK_SIZE", 0)
+        lsh = find_duplicate_groups(db, threshold=0.8)
+    assert [g["keep_id"] for g in lsh[0]["groups"]] == [g["keep_id"] for g in exact[0]["groups"]]
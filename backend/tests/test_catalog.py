@@ -0,0 +1,58 @@
+import asyncio
+
+from app.db.session import async_session, dispose_async_engines
+from app.services.catalog import VaccineCatalog
+
+
+def _run(coro):
+    async def main():
+        try:
+            return await asyncio.wait_for(coro, timeout=10)
+        finally:
+            await dispose_async_engines()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_cold_async_reads_share_one_load(seeded_db):
+    catalog = VaccineCatalog()
+    loads = []
+    load = catalog._load
+    catalog._load = lambda db, version: loads.append(version) or load(db, version)
+
+    async def read():
+        async with async_session() as db:
+            return await catalog.aall(db)
+
+    async def main():
+        return await asyncio.gather(*(read() for _ in range(5)))
+
+    results = _run(main())
+    assert [len(r) for r in results] == [9] * 5
+    assert len(loads) == 1
+
+
+def test_async_reads_after_sync_load(seeded_db):
+    catalog = VaccineCatalog()
+    with seeded_db() as db:
+        assert len(catalog.all(db)) == 9
+
+    async def main():
+        async with async_session() as db:
+            return await catalog.aget(db, 1), await catalog.alinks_for_vaccine(db, 2)
+
+    vaccine, links = _run(main())
+    assert vaccine.name == "V1"
+    assert [link["destination_id"] for link in links] == [1]
+
+
+def test_aadd_link_updates_reverse_index(seeded_db):
+    catalog = VaccineCatalog()
+
+    async def main():
+        async with async_session() as db:
+            await catalog.aall(db)
+            await catalog.aadd_link(2, 3, "recommended")
+            return await catalog.alinks_for_vaccine(db, 3)
+
+    assert 2 in [link["destination_id"] for link in _run(main())]
@@ -0,0 +1,119 @@
+import random
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+import app.db.init_db  # noqa: F401  (registers every mapped model)
+from app.models.case import Case
+from app.models.vaccine import Vaccine
+from app.services import cbr
+from app.services.cbr import CaseIndex, rank_cases
+
+WORDS = (
+    "dog bite scratch rabies fever mosquito chills travel trip child school measles "
+    "water food unsafe wound rusty nail cut crowd festival pilgrimage lung elderly the and of"
+).split()
+SCENARIOS = ["bite", "fever", "gastro", "wound", None]
+
+
+def _reference(corpus, query):
+    """The original per-request scoring: both vectorizers fitted on corpus + [query]."""
+    word_vec = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), sublinear_tf=True)
+    char_vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5))
+    word_mat = word_vec.fit_transform(corpus + [query])
+    char_mat = char_vec.fit_transform(corpus + [query])
+    word_sims = cosine_similarity(word_mat[-1], word_mat[:-1]).flatten()
+    char_sims = cosine_similarity(char_mat[-1], char_mat[:-1]).flatten()
+    return 0.75 * word_sims + 0.25 * char_sims
+
+
+def _cases(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        Case(
+            id=i,
+            problem_text=" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))).capitalize(),
+            scenario_type=rng.choice(SCENARIOS),
+            vaccine_id=1,
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("views", [False, True])
+def test_semantic_scores_match_fitting_on_corpus_plus_query(compact, views):
+    cases = _cases(60)
+    index = CaseIndex(cases, version=0, compact=compact, memory_budget_mb=1e-6 if views else 0)
+    assert index.views is views
+    rng = random.Random(1)
+    for _ in range(10):
+        query = " ".join(rng.choice(WORDS + ["zebra", "Dog"]) for _ in range(rng.randint(1, 8)))
+        for scenario, group in index.groups.items():
+            corpus = [index.texts[i] for i in group.rows]
+            expected = _reference(corpus, query)
+            assert np.allclose(group.semantic(query), expected, atol=1e-5)
+            # a subset of the group (e.g. cases of deleted vaccines dropped) is scored as its own corpus
+            keep = np.arange(0, len(group.rows), 2)
+            expected = _reference([corpus[j] for j in keep], query)
+            assert np.allclose(group.semantic(query, keep), expected, atol=1e-5)
+
+
+def test_rank_cases_returns_a_result_for_an_unrelated_query(seeded_db):
+    with seeded_db() as db:
+        index = CaseIndex(db.query(Case).order_by(Case.id).all(), version=0)
+        results = rank_cases(db, index, "zzz qqq", None, top_k=1)
+    assert len(results) == 1
+    assert results[0]["semantic_score"] == 0.0
+
+
+def test_rank_cases_falls_back_to_every_case_for_an_unknown_scenario(seeded_db):
+    with seeded_db() as db:
+        index = CaseIndex(db.query(Case).order_by(Case.id).all(), version=0)
+        results = rank_cases(db, index, "dog bite while travelling", "wound", top_k=5)
+    assert len(results) == 5
+    assert not any(r["scenario_match"] for r in results)
+
+
+class _Catalog:
+    def __init__(self, ids, version=1):
+        self.ids, self.version, self.lookups = set(ids), version, 0
+
+    def vaccine_ids(self, db):
+        return self.version, self.ids
+
+    def get(self, db, vaccine_id):
+        self.lookups += 1
+        return Vaccine(id=vaccine_id, name=f"V{vaccine_id}", description=None) if vaccine_id in self.ids else None
+
+
+def test_rank_cases_skips_deleted_vaccines_with_a_cached_mask(monkeypatch):
+    cases = _cases(40)
+    for c in cases:
+        c.vaccine_id = 1 + c.id % 2
+    index = CaseIndex(cases, version=0)
+    fake = _Catalog({1, 2})
+    monkeypatch.setattr(cbr, "catalog", fake)
+
+    assert len(rank_cases(None, index, "unsafe trip", None, top_k=40)) == 40
+    mask = index.live_mask(None)
+    assert mask.all()
+    assert fake.lookups == 40  # one per returned case, none for the liveness check
+
+    fake.ids, fake.version = {1}, 2  # vaccine 2 deleted
+    results = rank_cases(None, index, "unsafe trip", None, top_k=40)
+    assert {r["vaccine_id"] for r in results} == {1}
+    assert len(results) == 20
+    assert index.live_mask(None) is index.live_mask(None) is not mask
+
+
+def test_rank_cases_falls_back_when_the_scenario_has_no_live_case(monkeypatch):
+    cases = _cases(40)
+    for c in cases:
+        c.vaccine_id = 2 if c.scenario_type == "bite" else 1
+    index = CaseIndex(cases, version=0)
+    monkeypatch.setattr(cbr, "catalog", _Catalog({1}))
+    results = rank_cases(None, index, "dog bite", "bite", top_k=5)
+    assert results and {r["vaccine_id"] for r in results} == {1}
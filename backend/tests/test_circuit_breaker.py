@@ -0,0 +1,96 @@
+"""Circuit breaker and deadlines for the Pasteur.fr client, against the local stub server."""
+import threading
+import time
+
+import pytest
+
+from app.core.circuit import CLOSED, HALF_OPEN, OPEN, CircuitOpenError
+from app.services import travel_scraper as ts
+from loadtest.stub_pasteur import serve
+
+OPEN_SECONDS = 0.3
+
+
+@pytest.fixture(scope="module")
+def stub():
+    server = serve("127.0.0.1", 0)
+    server.handle_error = lambda request, client_address: None  # clients hang up on purpose (deadlines)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def page(stub):
+    """A country page on the stub; the stub and breaker are healthy again afterwards."""
+
+    def configure(**options):
+        for k, v in {"latency_ms": 0.0, "jitter_ms": 0.0, "error_rate": 0.0, **options}.items():
+            setattr(stub.RequestHandlerClass, k, v)
+
+    configure()
+    ts.pasteur_breaker.reset()
+    ts.pasteur_breaker.open_seconds, open_seconds = OPEN_SECONDS, ts.pasteur_breaker.open_seconds
+    stub.configure = configure
+    yield f"http://127.0.0.1:{stub.server_port}/fr/fiche-pays/stubland-001"
+    configure()
+    ts.pasteur_breaker.open_seconds = open_seconds
+    ts.pasteur_breaker.reset()
+
+
+def _open_circuit(stub, page):
+    stub.configure(error_rate=1.0)
+    for _ in range(ts.pasteur_breaker.min_calls):
+        with pytest.raises(Exception):
+            ts.scrape_country_recommendations(page)
+    assert ts.pasteur_breaker.state == OPEN
+    stub.configure()
+
+
+def test_scrape_is_remembered_as_last_known(page):
+    result = ts.scrape_country_recommendations(page)
+    assert result["items"]
+    assert ts.last_known_recommendations(page) == result
+
+
+def test_deadline_cuts_off_slow_upstream(stub, page):
+    stub.configure(latency_ms=2000)
+    t0 = time.perf_counter()
+    with pytest.raises(ts.UpstreamTimeout):
+        ts.scrape_country_recommendations(page, deadline=time.monotonic() + 0.3)
+    assert time.perf_counter() - t0 < 1.0
+
+
+def test_expired_deadline_is_not_an_outcome(page):
+    for _ in range(ts.pasteur_breaker.min_calls * 2):
+        with pytest.raises(ts.DeadlineExceeded):
+            ts.scrape_country_recommendations(page, deadline=time.monotonic() - 1)
+    assert ts.pasteur_breaker.state == CLOSED
+    assert not ts.pasteur_breaker._results
+
+
+def test_errors_open_the_circuit_and_calls_fail_fast(stub, page):
+    _open_circuit(stub, page)
+    t0 = time.perf_counter()
+    with pytest.raises(CircuitOpenError) as exc:
+        ts.scrape_country_recommendations(page)
+    assert time.perf_counter() - t0 < 0.05
+    assert 0 < exc.value.retry_after <= OPEN_SECONDS
+
+
+def test_half_open_probe_closes_the_circuit(stub, page):
+    _open_circuit(stub, page)
+    time.sleep(OPEN_SECONDS + 0.05)
+    assert ts.scrape_country_recommendations(page)["items"]
+    assert ts.pasteur_breaker.state == CLOSED
+
+
+def test_half_open_expired_deadline_does_not_close_or_use_the_probe(stub, page):
+    _open_circuit(stub, page)
+    time.sleep(OPEN_SECONDS + 0.05)
+    with pytest.raises(ts.DeadlineExceeded):
+        ts.scrape_country_recommendations(page, deadline=time.monotonic() - 1)
+    assert ts.pasteur_breaker.state == HALF_OPEN
+    # the probe is still available to a request that can actually reach Pasteur.fr
+    assert ts.scrape_country_recommendations(page)["items"]
+    assert ts.pasteur_breaker.state == CLOSED
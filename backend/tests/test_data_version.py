@@ -0,0 +1,47 @@
+"""Write counters without a shared cache: a write from another process reaches this one through the DB."""
+import pytest
+
+from app.services import catalog as catalog_module
+from app.services import data_version
+from app.services.catalog import VaccineCatalog
+from app.services.data_version import DataVersionCounter
+
+
+@pytest.fixture(autouse=True)
+def no_check_interval(monkeypatch):
+    monkeypatch.setattr(data_version, "DATA_VERSION_CHECK_SECONDS", 0)
+    monkeypatch.setattr(catalog_module, "CATALOG_VERSION_CHECK_SECONDS", 0)
+
+
+def test_bump_is_seen_by_another_process(seeded_db):
+    here, elsewhere = DataVersionCounter("test"), DataVersionCounter("test")  # one per process
+    before = here.get()
+    assert elsewhere.bump() == before + 1
+    assert here.get() == before + 1
+    assert here.bump() == before + 2
+    assert elsewhere.get() == before + 2
+
+
+def test_check_interval_bounds_db_reads(seeded_db, monkeypatch):
+    monkeypatch.setattr(data_version, "DATA_VERSION_CHECK_SECONDS", 3600)
+    here, elsewhere = DataVersionCounter("interval"), DataVersionCounter("interval")
+    before = here.get()
+    elsewhere.bump()
+    assert here.get() == before  # not re-read yet
+
+
+def test_catalog_reloads_after_a_write_from_another_process(seeded_db):
+    from app.models.vaccine import Vaccine
+
+    catalog = VaccineCatalog()
+    with seeded_db() as db:
+        n = len(catalog.all(db))
+        db.add(Vaccine(name="Written elsewhere", description="d"))
+        db.commit()
+        assert len(catalog.all(db)) == n  # no bump yet: the snapshot is kept
+        DataVersionCounter("catalog").bump()  # what seed_db or another worker does
+        assert catalog.get_by_name(db, "Written elsewhere") is not None
+
+        db.query(Vaccine).filter(Vaccine.name == "Written elsewhere").delete()
+        db.commit()
+        DataVersionCounter("catalog").bump()
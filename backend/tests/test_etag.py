@@ -0,0 +1,52 @@
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware
+from app.core.responses import etag_matches
+
+
+@pytest.mark.parametrize(
+    "header, etag, expected",
+    [
+        ('"abc"', '"abc"', True),
+        ('W/"abc"', '"abc"', True),
+        ('"abc"', 'W/"abc"', True),
+        ('"x", W/"abc" , "y"', 'W/"abc"', True),
+        ("*", 'W/"abc"', True),
+        ('"xabcx"', '"abc"', False),
+        ('"abcd"', '"abc"', False),
+        ('"ab"', '"abc"', False),
+        ("", '"abc"', False),
+        (None, '"abc"', False),
+    ],
+)
+def test_etag_matches(header, etag, expected):
+    assert etag_matches(header, etag) is expected
+
+
+def test_bootstrap_revalidation(client):
+    r = client.get("/resources/bootstrap")
+    etag = r.headers["etag"]
+    assert r.status_code == 200 and etag.startswith('W/"')
+
+    assert client.get("/resources/bootstrap", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/resources/bootstrap", headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    assert client.get("/resources/bootstrap", headers={"If-None-Match": "*"}).status_code == 304
+    # a tag that merely contains ours is a different tag
+    assert client.get("/resources/bootstrap", headers={"If-None-Match": etag[:-1] + 'x"'}).status_code == 200
+
+
+def test_compression_weakens_strong_etags():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=10)
+
+    @app.get("/strong")
+    def strong():
+        return Response(b"x" * 100, headers={"ETag": '"v1"'})
+
+    client = TestClient(app)
+    assert client.get("/strong", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"v1"'
+    r = client.get("/strong", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["etag"] == 'W/"v1"'
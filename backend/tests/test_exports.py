@@ -0,0 +1,50 @@
+import gzip
+import json
+
+from app.db.session import ReadSessionLocal
+from app.resources import exports
+
+
+def _rows(body: bytes):
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+
+def test_cases_export_is_ndjson(client, admin_headers, seeded_db, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_BATCH_SIZE", 5)  # several partitions
+    r = client.get("/resources/exports/cases", headers=admin_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == exports.NDJSON
+    assert r.headers["content-disposition"] == 'attachment; filename="cases.ndjson"'
+    assert r.content.endswith(b"\n")
+    rows = _rows(r.content)
+    assert len(rows) == 22
+    assert set(rows[0]) == {"id", "problem_text", "scenario_type", "vaccine_id"}
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+
+
+def test_gzip_export(client, admin_headers, seeded_db):
+    plain = client.get("/resources/exports/vaccines", headers=admin_headers).content
+    with client.stream("GET", "/resources/exports/vaccines", params={"gzip": True}, headers=admin_headers) as r:
+        assert r.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in r.headers["vary"].lower()
+        raw = b"".join(r.iter_raw())
+    assert raw[:2] == b"\x1f\x8b"
+    assert gzip.decompress(raw) == plain
+    assert [v["name"] for v in _rows(plain)] == [f"V{i}" for i in range(1, 10)]
+
+
+def test_exports_read_from_the_read_session(client, admin_headers, seeded_db, monkeypatch):
+    opened = []
+
+    def read_session():
+        opened.append(True)
+        return ReadSessionLocal()
+
+    monkeypatch.setattr(exports, "ReadSessionLocal", read_session)
+    rows = _rows(client.get("/resources/exports/destination-links", headers=admin_headers).content)
+    assert opened == [True]
+    assert {(row["destination_id"], row["vaccine_id"], row["requirement_level"]) for row in rows} >= {(1, 2, "required")}
+
+
+def test_exports_require_an_admin(client):
+    assert client.get("/resources/exports/cases").status_code == 401
@@ -0,0 +1,5 @@
+def test_pool_health_requires_an_admin(client, admin_headers):
+    assert client.get("/health/pool").status_code == 401
+    r = client.get("/health/pool", headers=admin_headers)
+    assert r.status_code == 200
+    assert {"checked_out", "checked_in", "overflow", "checkout"} <= r.json().keys()
@@ -0,0 +1,68 @@
+"""The hot-lookup indexes: declared on the models, created by migrations, used by SQLite's planner."""
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.base import Base
+from app.db.init_db import init_db  # noqa: F401  (registers every model)
+from app.db.migrations import MIGRATIONS, run_migrations
+
+# index name -> (table, columns)
+INDEXES = {
+    "ix_cases_scenario_type": ("cases", ["scenario_type"]),
+    "ix_cases_vaccine_id": ("cases", ["vaccine_id"]),
+    "ix_cases_problem_text_hash": ("cases", ["problem_text"]),
+    "ix_destination_vaccines_vaccine_id": ("destination_vaccines", ["vaccine_id"]),
+    "ix_destinations_source_url": ("destinations", ["source_url"]),
+}
+
+# (hot query, parameters, index it should use); see scripts/explain_hot_queries.py for Postgres
+HOT_QUERIES = [
+    ("SELECT * FROM cases WHERE scenario_type = :v", {"v": "bite"}, "ix_cases_scenario_type"),
+    ("SELECT * FROM cases WHERE vaccine_id = :v", {"v": 1}, "ix_cases_vaccine_id"),
+    ("SELECT 1 FROM cases WHERE vaccine_id = :v LIMIT 1", {"v": 1}, "ix_cases_vaccine_id"),
+    (
+        "SELECT 1 FROM destination_vaccines WHERE vaccine_id = :v LIMIT 1",
+        {"v": 1},
+        "ix_destination_vaccines_vaccine_id",
+    ),
+    ("SELECT * FROM destinations WHERE source_url = :v LIMIT 1", {"v": "http://x"}, "ix_destinations_source_url"),
+    ("SELECT * FROM cases WHERE problem_text = :v LIMIT 1", {"v": "dog bite"}, "ix_cases_problem_text_hash"),
+]
+
+
+@pytest.mark.parametrize("name", sorted(INDEXES))
+def test_index_is_declared_on_the_model(name):
+    table, columns = INDEXES[name]
+    declared = {ix.name: [c.name for c in ix.columns] for ix in Base.metadata.tables[table].indexes}
+    assert declared.get(name) == columns
+
+
+def test_migrations_create_the_indexes_on_an_existing_database(tmp_path):
+    assert {m[0] for m in MIGRATIONS} >= set(INDEXES)
+
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:  # a database created before the indexes existed
+        for name in INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+    run_migrations(engine)
+    run_migrations(engine)  # idempotent
+
+    found = {}
+    for table in {t for t, _ in INDEXES.values()}:
+        for ix in inspect(engine).get_indexes(table):
+            found[ix["name"]] = (table, ix["column_names"])
+    for name, expected in INDEXES.items():
+        assert found.get(name) == expected
+    engine.dispose()
+
+
+@pytest.mark.parametrize("sql, params, index", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_sqlite_plan_uses_the_index(seeded_db, sql, params, index):
+    from app.db.session import engine
+
+    if engine.dialect.name != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN is SQLite-only; see scripts/explain_hot_queries.py")
+    with engine.connect() as conn:
+        plan = " | ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params))
+    assert f"INDEX {index} " in plan + " ", plan
@@ -0,0 +1,51 @@
+import re
+
+ROUTE = "/resources/vaccines/{vaccine_id}/destinations"
+SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+
+
+def _scrape(client) -> dict:
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in r.text.splitlines():
+        if line.startswith("#"):
+            continue
+        name, labels, value = SAMPLE.match(line).groups()
+        samples[(name, labels or "")] = float(value)
+    return samples
+
+
+def test_route_histogram_and_status_counters(client, seeded_db):
+    before = _scrape(client)
+    for _ in range(3):
+        assert client.get("/resources/vaccines/2/destinations").status_code == 200
+    assert client.get("/resources/vaccines/999/destinations").status_code == 404
+    assert client.get("/no/such/path/123").status_code == 404
+    after = _scrape(client)
+
+    def delta(name, labels):
+        return after.get((name, labels), 0.0) - before.get((name, labels), 0.0)
+
+    # one series per route template, not per raw path
+    series = f'method="GET",route="{ROUTE}"'
+    assert delta("http_request_duration_seconds_count", series) == 4
+    assert delta("http_request_duration_seconds_bucket", series + ',le="+Inf"') == 4
+    buckets = [v for (name, labels), v in after.items() if name == "http_request_duration_seconds_bucket" and labels.startswith(series + ",")]
+    assert buckets == sorted(buckets)  # cumulative
+    assert after[("http_request_duration_seconds_sum", series)] > 0
+    assert not any(ROUTE.replace("{vaccine_id}", "2") in labels for _, labels in after)
+
+    assert delta("http_requests_total", series + ',status="200"') == 3
+    assert delta("http_requests_total", series + ',status="404"') == 1
+    assert delta("http_requests_total", 'method="GET",route="unmatched",status="404"') == 1
+
+
+def test_in_flight_gauge(client, seeded_db):
+    # the scrape itself is the only request in flight while /metrics renders
+    assert _scrape(client)[("http_requests_in_flight", 'method="GET"')] == 1
+    client.post("/auth/login", json={"username": "nobody", "password": "x"})
+    samples = _scrape(client)
+    assert samples[("http_requests_in_flight", 'method="GET"')] == 1
+    assert samples[("http_requests_in_flight", 'method="POST"')] == 0
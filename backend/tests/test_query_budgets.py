@@ -0,0 +1,21 @@
+"""Query budgets for the hot endpoints (catches N+1 regressions)."""
+import pytest
+
+# (method, path, json body, max queries, max repeats of one statement)
+# Budgets hold for a warm worker: the vaccine catalog and CBR index are loaded.
+BUDGETS = [
+    ("GET", "/resources/vaccines", None, 1, 1),
+    ("GET", "/resources/cases", None, 1, 1),
+    ("GET", "/resources/destinations", None, 1, 1),
+    ("GET", "/resources/destinations/1/recommendations", None, 2, 1),
+    ("GET", "/resources/vaccines/2/destinations", None, 1, 1),
+    ("POST", "/resources/assessments", {"problem_text": "bitten by a stray dog", "scenario_type": "bite"}, 1, 1),
+]
+
+
+@pytest.mark.parametrize("method, path, body, max_queries, max_repeats", BUDGETS, ids=[f"{m} {p}" for m, p, *_ in BUDGETS])
+def test_endpoint_query_budget(client, query_budget, method, path, body, max_queries, max_repeats):
+    assert client.request(method, path, json=body).status_code == 200  # warm caches
+    with query_budget(max_queries, max_repeats=max_repeats, label=f"{method} {path}"):
+        r = client.request(method, path, json=body)
+    assert r.status_code == 200
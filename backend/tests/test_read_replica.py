@@ -0,0 +1,99 @@
+"""
+Read-replica routing against two SQLite files. The engines are created from
+the environment at import time, so the app runs in a subprocess configured
+with DATABASE_URL (primary) and DATABASE_READ_URL (replica); the replica
+starts out with different rows so it is visible where each read went.
+"""
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIO = textwrap.dedent(
+    """
+    import json
+
+    from fastapi import Depends
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+
+    from app.core.security import hash_password
+    from app.db.base import Base
+    from app.db.init_db import init_db
+    from app.db.session import ReadSessionLocal, SessionLocal, get_db, read_engine
+    from app.main import app
+    from app.models.case import Case
+    from app.models.user import User
+    from app.models.vaccine import Vaccine
+
+    init_db()
+    Base.metadata.create_all(bind=read_engine)
+    for maker, where in ((SessionLocal, "primary"), (ReadSessionLocal, "replica")):
+        with maker() as db:
+            db.add(Vaccine(name="V1", description="d"))
+            db.add(Case(problem_text=f"{where} case", scenario_type="bite", vaccine_id=1))
+            db.add(User(username="admin@example.com", password_hash=hash_password("pw"), role="admin"))
+            db.commit()
+
+
+    @app.post("/anonymous-write")
+    def anonymous_write(db: Session = Depends(get_db)):
+        db.add(Case(problem_text="anonymous case", scenario_type="bite", vaccine_id=1))
+        db.commit()
+        return {}
+
+
+    def cases(client, **kwargs):
+        return sorted(c["problem_text"] for c in client.get("/resources/cases", **kwargs).json())
+
+
+    out = {}
+    anonymous, admin, visitor = TestClient(app), TestClient(app), TestClient(app)
+    out["before"] = cases(anonymous)
+
+    token = admin.post("/auth/login", json={"username": "admin@example.com", "password": "pw"}).json()["access_token"]
+    auth = {"Authorization": f"Bearer {token}"}
+    admin.post("/resources/cases", json={"problem_text": "admin case", "scenario_type": "bite", "vaccine_id": 1}, headers=auth)
+    out["admin_after_write"] = cases(admin, headers=auth)
+    out["anonymous_after_admin_write"] = cases(anonymous)
+    # assessments read through the replica session, but the CBR index comes from the primary
+    r = anonymous.post("/resources/assessments", json={"problem_text": "admin case", "scenario_type": "bite"})
+    out["assessment_cases"] = sorted(m["problem_text"] for m in r.json()["matches"])
+
+    r = visitor.post("/anonymous-write")
+    out["cookie"] = r.headers.get("set-cookie", "")
+    out["visitor_after_write"] = cases(visitor)
+    out["anonymous_after_visitor_write"] = cases(anonymous)
+    print(json.dumps(out))
+    """
+)
+
+
+def test_reads_use_replica_and_writers_stick_to_primary(tmp_path):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path}/primary.db",
+        "DATABASE_READ_URL": f"sqlite:///{tmp_path}/replica.db",
+        "READ_AFTER_WRITE_SECONDS": "60",
+        "CACHE_URL": "memory://",
+        "WARMUP_ENABLED": "0",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-c", SCENARIO], cwd=BACKEND, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert proc.returncode == 0, proc.stderr
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    assert out["before"] == ["replica case"]
+    # the writer's reads follow its principal to the primary...
+    assert out["admin_after_write"] == ["admin case", "primary case"]
+    # ...while other clients (same IP under TestClient) keep reading the replica
+    assert out["anonymous_after_admin_write"] == ["replica case"]
+    assert out["assessment_cases"] == ["admin case", "primary case"]
+    # anonymous writers are tracked with a cookie
+    assert out["cookie"].startswith("pasteurhub_rw=")
+    assert out["visitor_after_write"] == ["admin case", "anonymous case", "primary case"]
+    assert out["anonymous_after_visitor_write"] == ["replica case"]
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import readiness
+from app.main import app
+
+
+@pytest.fixture
+def flaky_steps(monkeypatch):
+    """One step that fails twice, one that always works; readiness state is isolated."""
+    calls = {"flaky": 0, "steady": 0}
+
+    def flaky():
+        calls["flaky"] += 1
+        if calls["flaky"] <= 2:
+            raise RuntimeError("database is starting up")
+
+    def steady():
+        calls["steady"] += 1
+
+    steps = [("flaky", flaky), ("steady", steady)]
+    monkeypatch.setattr(readiness, "STEPS", steps)
+    monkeypatch.setattr(readiness, "_state", {name: {"ready": False, "seconds": None, "error": None} for name, _ in steps})
+    monkeypatch.setattr(readiness, "WARMUP_RETRY_SECONDS", 0.01)
+    monkeypatch.setattr(readiness, "WARMUP_RETRY_MAX_SECONDS", 0.02)
+    return calls
+
+
+def test_failed_steps_are_retried_with_backoff(flaky_steps, monkeypatch):
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        await real_sleep(0)
+
+    monkeypatch.setattr(readiness.asyncio, "sleep", sleep)
+
+    async def run():
+        await readiness.warm_up()
+        assert not readiness.status()["ready"]
+        await readiness.retry_until_ready(delay=0.01)
+
+    asyncio.run(run())
+    assert readiness.status()["ready"]
+    assert flaky_steps == {"flaky": 3, "steady": 1}  # ready steps are not re-run
+    assert sleeps == [0.01, 0.02]
+
+
+def test_ready_only_reports_state(flaky_steps, seeded_db):
+    client = TestClient(app)
+    r = client.get("/ready")
+    assert r.status_code == 503
+    assert r.json()["components"]["flaky"]["ready"] is False
+    assert flaky_steps == {"flaky": 0, "steady": 0}  # the probe ran no warmup step
+
+
+def test_lifespan_retries_in_the_background(flaky_steps, seeded_db, monkeypatch):
+    monkeypatch.setattr(readiness, "WARMUP_ENABLED", True)
+    with TestClient(app) as client:
+        for _ in range(200):
+            if client.get("/ready").status_code == 200:
+                break
+            time.sleep(0.01)
+        assert client.get("/ready").json()["ready"] is True
+    assert flaky_steps["flaky"] == 3
@@ -0,0 +1,71 @@
+"""
+Startup budget: `import app.main` in a fresh interpreter must not pull in the
+modules that load lazily (numpy, scikit-learn, bs4, requests), and stays
+within a wall-time and peak-RSS budget (STARTUP_MAX_SECONDS, STARTUP_MAX_RSS_MB).
+"""
+import json
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY_MODULES = ("numpy", "sklearn", "scipy", "bs4", "requests")
+STARTUP_MAX_SECONDS = float(os.getenv("STARTUP_MAX_SECONDS", "1.5"))
+STARTUP_MAX_RSS_MB = float(os.getenv("STARTUP_MAX_RSS_MB", "120"))
+
+# Peak RSS comes from VmHWM where available: ru_maxrss survives exec on Linux,
+# so it would report the (much larger) pytest process this one was forked from.
+PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import app.main
+seconds = time.perf_counter() - t0
+try:
+    with open("/proc/self/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+except (OSError, StopIteration):
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+print(json.dumps({"seconds": seconds, "rss_mb": rss_kb / 1024, "modules": sorted(sys.modules)}))
+"""
+
+
+def _import_app(*flags):
+    proc = subprocess.run(
+        [sys.executable, *flags, "-c", PROBE], cwd=BACKEND, env=os.environ, capture_output=True, text=True, timeout=60
+    )
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def _importers(importtime: str, module: str):
+    """Chain of modules that led to `module` being imported, from -X importtime output."""
+    rows = []
+    for line in importtime.splitlines():
+        if line.startswith("import time:") and "|" in line and "[us]" not in line:
+            name = line.rsplit("|", 1)[1]
+            rows.append((len(name) - len(name.lstrip()), name.strip()))
+    for i, (depth, name) in enumerate(rows):
+        if name == module:
+            chain = [name]
+            # a module's line comes after its children's, with less indentation
+            for parent_depth, parent in rows[i + 1 :]:
+                if parent_depth < depth:
+                    chain.append(parent)
+                    depth = parent_depth
+            return " <- ".join(chain)
+    return module
+
+
+def test_heavy_modules_are_not_imported_at_startup():
+    probe, importtime = _import_app("-X", "importtime")
+    eager = [m for m in LAZY_MODULES if m in probe["modules"]]
+    assert not eager, "imported eagerly: " + "; ".join(_importers(importtime, m) for m in eager)
+
+
+def test_startup_budget():
+    samples = [_import_app()[0] for _ in range(3)]
+    seconds = min(s["seconds"] for s in samples)
+    rss_mb = min(s["rss_mb"] for s in samples)
+    assert seconds <= STARTUP_MAX_SECONDS, f"import app.main took {seconds:.3f}s"
+    assert rss_mb <= STARTUP_MAX_RSS_MB, f"peak RSS {rss_mb:.1f} MB"
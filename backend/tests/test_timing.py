@@ -0,0 +1,58 @@
+import os
+import re
+import uuid
+
+import pytest
+
+from app.core import profiling
+from app.core.security import create_access_token, hash_password
+from app.models.user import User
+
+ENTRY = re.compile(r"(\w+);dur=([\d.]+)")
+
+
+def _timings(header: str) -> dict:
+    return {name: float(dur) for name, dur in ENTRY.findall(header)}
+
+
+@pytest.fixture
+def user_headers(seeded_db):
+    with seeded_db() as db:
+        db.add(User(username="clinician@example.com", password_hash=hash_password("pw"), role="user"))
+        db.commit()
+    yield {"Authorization": f"Bearer {create_access_token(subject='clinician@example.com', role='user')}"}
+    with seeded_db() as db:
+        db.query(User).filter(User.username == "clinician@example.com").delete()
+        db.commit()
+
+
+def test_server_timing_has_db_and_cbr_entries(client, seeded_db):
+    # a fresh text, so the assessment is not served from the result cache
+    r = client.post("/resources/assessments", json={"problem_text": f"dog bite abroad {uuid.uuid4().hex}"})
+    assert r.status_code == 200
+    timings = _timings(r.headers["server-timing"])
+    assert {"db", "cbr", "app"} <= timings.keys()
+    assert timings["app"] >= timings["cbr"] > 0
+
+
+def test_profile_requires_an_admin(client, user_headers, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    assert client.get("/resources/vaccines", headers={"X-Profile": "1"}).status_code == 401
+    r = client.get("/resources/vaccines", params={"profile": "1"}, headers=user_headers)
+    assert r.status_code == 403
+    assert "x-profile-path" not in r.headers
+    # without the profile flag the same user is served normally
+    assert client.get("/resources/vaccines", headers=user_headers).status_code == 200
+    assert os.listdir(tmp_path) == []
+
+
+def test_profile_writes_a_folded_file(client, admin_headers, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    r = client.get("/resources/vaccines", headers={**admin_headers, "X-Profile": "1"})
+    assert r.status_code == 200
+    path = r.headers["x-profile-path"]
+    assert os.path.dirname(path) == str(tmp_path)
+    assert path.endswith(".folded")
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert all(re.fullmatch(r".+ \d+", line) for line in lines)
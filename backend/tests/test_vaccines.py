@@ -0,0 +1,11 @@
+def test_vaccine_destinations_counts_follow_the_filter(client, seeded_db):
+    body = client.get("/resources/vaccines/2/destinations").json()
+    assert body["counts"] == {"required": 1}
+    assert body["total"] == 1
+
+    body = client.get("/resources/vaccines/2/destinations", params={"requirement_level": "recommended"}).json()
+    assert body == {**body, "counts": {}, "total": 0, "destinations": []}
+
+    body = client.get("/resources/vaccines/2/destinations", params={"requirement_level": "Required"}).json()
+    assert body["total"] == len(body["destinations"]) == 1
+    assert body["destinations"][0]["name"] == "France"
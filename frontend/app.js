@@ -202,10 +202,29 @@ function switchTab(tabName) {
 }
 
 // API Calls
+
+// One cacheable payload (destinations, vaccines with prices, scenario codes)
+// shared by the page-load lookups. `fresh` revalidates after admin edits.
+let bootstrapPromise = null;
+
+function loadBootstrap(fresh = false) {
+    if (!bootstrapPromise || fresh) {
+        bootstrapPromise = fetch(`${API_BASE}/resources/bootstrap`, { cache: fresh ? 'no-cache' : 'default' })
+            .then(response => {
+                if (!response.ok) throw new Error(`bootstrap failed: ${response.status}`);
+                return response.json();
+            })
+            .catch(error => {
+                bootstrapPromise = null;
+                throw error;
+            });
+    }
+    return bootstrapPromise;
+}
+
 async function loadDestinations() {
     try {
-        const response = await fetch(`${API_BASE}/resources/destinations`);
-        const destinations = await response.json();
+        const { destinations } = await loadBootstrap();
         
         destinationSelect.innerHTML = '<option value="">Select a destination...</option>';
         destinations.forEach(dest => {
@@ -400,7 +419,7 @@ async function handleVaccineSubmit(e) {
         if (response.ok) {
             e.target.reset();
             await loadVaccines();
-            await loadVaccinesForSelect();
+            await loadVaccinesForSelect(true);
             alert('Vaccine added successfully!');
         } else {
             alert('Failed to add vaccine');
@@ -426,7 +445,7 @@ async function deleteVaccine(id) {
 
         if (response.ok) {
             await loadVaccines();
-            await loadVaccinesForSelect();
+            await loadVaccinesForSelect(true);
             alert('Vaccine deleted successfully!');
         } else {
             alert('Failed to delete vaccine');
@@ -468,10 +487,9 @@ async function loadCases() {
     }
 }
 
-async function loadVaccinesForSelect() {
+async function loadVaccinesForSelect(fresh = false) {
     try {
-        const response = await fetch(`${API_BASE}/resources/vaccines`);
-        const vaccines = await response.json();
+        const { vaccines } = await loadBootstrap(fresh);
         
         const select = document.getElementById('caseVaccine');
         select.innerHTML = '<option value="">Select vaccine...</option>';